@@ -0,0 +1,69 @@
+"""
+Hash algorithm benchmark: content throughput and Merkle node rate.
+
+For every registered algorithm that is installed, reports:
+
+    GB/s      hashing an in-memory buffer in 1 MB updates (CPU bound)
+    file GB/s hash_file() over a temporary file (warm page cache)
+    nodes/s   internal Merkle nodes per second (compute_merkle_root_digest)
+
+Whether sha256 or blake2b wins depends on the CPU: sha256 is fastest
+where SHA extensions (SHA-NI / ARMv8 SHA2) are available.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from common import best_of
+
+from merklewatch.hashing import available_algorithms, get_algorithm, hash_file
+from merklewatch.merkle import compute_merkle_root_digest
+
+MB = 1024 * 1024
+
+
+def buffer_throughput(algorithm, data: bytes) -> float:
+    view = memoryview(data)
+    hasher = algorithm.new()
+    start = time.perf_counter()
+    for offset in range(0, len(view), MB):
+        hasher.update(view[offset:offset + MB])
+    hasher.digest()
+    return len(data) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--megabytes", type=int, default=512, help="Size of the hashed buffer and file")
+    parser.add_argument("--nodes", type=int, default=200_000, help="Leaves in the Merkle node benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    data = os.urandom(args.megabytes * MB)
+    print(f"{args.megabytes} MB buffer, {args.nodes} Merkle leaves")
+    print(f"{'algorithm':<10} {'digest':>6} {'GB/s':>7} {'file GB/s':>10} {'nodes/s':>12}")
+
+    with tempfile.NamedTemporaryFile(prefix="mw-bench-") as f:
+        f.write(data)
+        f.flush()
+
+        for name in available_algorithms():
+            try:
+                algorithm = get_algorithm(name)
+            except ImportError:
+                print(f"{name:<10} {'(not installed)':>38}")
+                continue
+
+            memory_rate = max(buffer_throughput(algorithm, data) for _ in range(args.repeat))
+            file_time, _ = best_of(lambda: hash_file(f.name, algorithm=name), args.repeat)
+
+            leaves = os.urandom(algorithm.digest_size) * args.nodes
+            node_time, _ = best_of(lambda: compute_merkle_root_digest(leaves, name), args.repeat)
+
+            print(f"{name:<10} {algorithm.digest_size * 8:>6} {memory_rate / 1e9:>7.2f} "
+                  f"{len(data) / file_time / 1e9:>10.2f} {(args.nodes - 1) / node_time:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Latency-hiding scan benchmark: a simulated network filesystem.
+
+Creates --files small files, then injects --latency milliseconds into
+every directory listing, lstat and open (by wrapping os.scandir, the
+returned entries' stat() and the open() used by hash_file), standing in for
+an NFS/SMB/FUSE mount without needing one. Times:
+
+    serial         scan_directory(jobs=1)
+    jobs=N         hashing on N threads, walk still one directory at a time
+    async=N        scan_directory(io_concurrency=N)
+
+All runs must produce the same root hash.
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from common import best_of, make_many_small_files
+
+import merklewatch.hashing as hashing
+from merklewatch.filesystem import scan_directory
+
+
+class _SlowEntry:
+    """A DirEntry whose stat() pays the injected latency."""
+
+    def __init__(self, entry: os.DirEntry, delay: float):
+        self._entry = entry
+        self._delay = delay
+        self.name = entry.name
+        self.path = entry.path
+
+    def is_symlink(self):
+        return self._entry.is_symlink()
+
+    def is_file(self, follow_symlinks=True):
+        return self._entry.is_file(follow_symlinks=follow_symlinks)
+
+    def is_dir(self, follow_symlinks=True):
+        return self._entry.is_dir(follow_symlinks=follow_symlinks)
+
+    def stat(self, follow_symlinks=True):
+        time.sleep(self._delay)
+        return self._entry.stat(follow_symlinks=follow_symlinks)
+
+
+class _SlowScandir:
+    def __init__(self, path, delay: float):
+        time.sleep(delay)
+        with _scandir(path) as it:
+            self._entries = [_SlowEntry(entry, delay) for entry in it]
+
+    def __enter__(self):
+        return iter(self._entries)
+
+    def __exit__(self, *exc):
+        return False
+
+
+_scandir = os.scandir
+_open = open
+
+
+def inject_latency(delay: float):
+    """Make every listing, lstat and open in this process take `delay` seconds longer."""
+    def slow_open(*args, **kwargs):
+        time.sleep(delay)
+        return _open(*args, **kwargs)
+
+    os.scandir = lambda path='.': _SlowScandir(path, delay)
+    hashing.open = slow_open
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=2000, help="Number of small files")
+    parser.add_argument("--per-dir", type=int, default=20, help="Files per directory")
+    parser.add_argument("--latency", type=float, default=2.0, help="Injected latency per call in milliseconds")
+    parser.add_argument("--jobs", type=int, default=8, help="Hashing threads for the jobs run")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[16, 64, 256], help="io_concurrency values to try")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="mw-bench-") as tmp:
+        root = make_many_small_files(Path(tmp) / "tree", args.files, size=1024, per_dir=args.per_dir)
+        inject_latency(args.latency / 1000)
+
+        def run(**kwargs):
+            return scan_directory(root, root, {'files': {}, 'directories': {}}, **kwargs)
+
+        print(f"{args.files} files in {args.files // args.per_dir} directories, {args.latency} ms per listing/lstat/open")
+        print(f"{'mode':<12} {'time (s)':>10} {'files/s':>10} {'speedup':>8}")
+        serial_time, expected = best_of(lambda: run(jobs=1), args.repeat)
+        print(f"{'serial':<12} {serial_time:>10.2f} {args.files / serial_time:>10.0f} {1:>7.1f}x")
+
+        modes = [(f"jobs={args.jobs}", {'jobs': args.jobs})]
+        modes += [(f"async={n}", {'io_concurrency': n}) for n in args.concurrency]
+        for label, kwargs in modes:
+            elapsed, root_hash = best_of(lambda: run(**kwargs), args.repeat)
+            assert root_hash == expected, label
+            print(f"{label:<12} {elapsed:>10.2f} {args.files / elapsed:>10.0f} {serial_time / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
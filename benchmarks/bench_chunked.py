@@ -0,0 +1,56 @@
+"""
+Chunked hashing benchmark: one huge file on 1..N cores.
+
+Hashes a single large file as a whole (one core, whatever --jobs is) and
+as a chunk tree with several chunk sizes and worker counts, reporting
+throughput. Chunked roots must be identical for every worker count.
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+from common import best_of, make_few_huge_files
+
+from merklewatch.filesystem import scan_directory
+from merklewatch.hashing import FileHasher
+
+MB = 1024 * 1024
+
+WORKERS = [1, 2, 4, 8, 16]
+CHUNK_SIZES = [4 * MB, 16 * MB, 64 * MB]
+
+
+def run_scan(root: Path, jobs: int, chunk_size):
+    manifest_data = {'files': {}, 'directories': {}}
+    return scan_directory(root, root, manifest_data, jobs=jobs, file_hasher=FileHasher(chunk_size=chunk_size))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=2048, help="Size of the huge file in MB")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="mw-bench-") as tmp:
+        root = make_few_huge_files(Path(tmp) / "huge", 1, args.size_mb * MB)
+        total = args.size_mb * MB
+
+        print(f"1 file, {args.size_mb} MB")
+        print(f"{'mode':<10} {'jobs':>5} {'seconds':>9} {'MB/s':>9}")
+
+        for jobs in WORKERS:
+            elapsed, _ = best_of(lambda: run_scan(root, jobs, None), args.repeat)
+            print(f"{'whole':<10} {jobs:>5} {elapsed:>9.2f} {total / elapsed / 1e6:>9.0f}")
+
+        for chunk_size in CHUNK_SIZES:
+            label = f"chunk {chunk_size // MB}M"
+            roots = set()
+            for jobs in WORKERS:
+                elapsed, root_hash = best_of(lambda: run_scan(root, jobs, chunk_size), args.repeat)
+                roots.add(root_hash)
+                print(f"{label:<10} {jobs:>5} {elapsed:>9.2f} {total / elapsed / 1e6:>9.0f}")
+            assert len(roots) == 1, f"chunked roots differ across worker counts for {label}"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Manifest compression benchmark: size, write time and load time per codec.
+
+Writes the same synthetic manifest in each format, uncompressed and with
+every available codec at a few levels, and reports the compressed size,
+the ratio to the uncompressed file, and the time to write and fully load
+it. Codecs whose module is missing (zstd without `zstandard` on Python
+< 3.14) are skipped.
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from common import best_of, synthetic_manifest
+
+from merklewatch.compress import CODECS, open_compressed
+from merklewatch.manifest import load_manifest, write_manifest
+
+FORMATS = [("json", ".json"), ("jsonl", ".jsonl"), ("binary", ".mwb")]
+
+LEVELS = {
+    None: [None],
+    "gzip": [1, 6, 9],
+    "xz": [0, 6],
+    "zstd": [1, 3, 10, 19],
+}
+
+
+def codec_available(codec, tmp):
+    try:
+        with open_compressed(Path(tmp) / "probe", 'wb', codec) as f:
+            f.write(b'probe')
+    except ImportError:
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=100_000, help="Number of file entries")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    parser.add_argument("--format", dest="formats", action="append", choices=[f for f, _ in FORMATS], help="Only benchmark this format (repeatable)")
+    args = parser.parse_args()
+
+    manifest = synthetic_manifest(args.files)
+    formats = [(f, s) for f, s in FORMATS if not args.formats or f in args.formats]
+
+    print(f"{args.files} files, {len(manifest['directories'])} directories")
+    print(f"{'format':<8} {'codec':<6} {'level':>5} {'size MB':>9} {'ratio':>7} {'write s':>9} {'load s':>9}")
+
+    with tempfile.TemporaryDirectory(prefix="mw-bench-") as tmp:
+        codecs = [None] + [codec for codec in CODECS if codec_available(codec, tmp)]
+
+        for manifest_format, suffix in formats:
+            plain_size = None
+            for codec in codecs:
+                extension = CODECS[codec][0] if codec else ""
+                for level in LEVELS[codec]:
+                    path = Path(tmp) / f"manifest{suffix}{extension}"
+
+                    start = time.perf_counter()
+                    write_manifest(manifest, path, manifest_format, level)
+                    write_time = time.perf_counter() - start
+
+                    def full_load():
+                        loaded = load_manifest(path)
+                        return sum(1 for _ in loaded['files'].items())
+
+                    load_time, count = best_of(full_load, args.repeat)
+                    assert count == args.files
+
+                    size = path.stat().st_size
+                    if plain_size is None:
+                        plain_size = size
+                    print(f"{manifest_format:<8} {codec or '-':<6} {level if level is not None else '-':>5} "
+                          f"{size / 1e6:>9.2f} {plain_size / size:>7.1f} {write_time:>9.2f} {load_time:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
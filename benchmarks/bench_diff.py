@@ -0,0 +1,69 @@
+"""
+Manifest diff benchmark: tree-aware versus full comparison.
+
+Builds two synthetic manifests of --files entries that differ in
+--changes files (with their directory and root hashes updated to match),
+then times compare_manifests() both ways:
+
+    full   every path compared (compare_manifests(..., full=True))
+    tree   top-down walk skipping subtrees with identical root_hash
+
+for in-memory manifests and for binary manifests opened via mmap, where
+the tree walk reads only the records of the changed subtrees.
+"""
+import argparse
+import copy
+import os
+import random
+import tempfile
+from pathlib import Path
+
+from common import best_of, synthetic_manifest
+
+from merklewatch.binary_manifest import save_binary_manifest
+from merklewatch.manifest import load_manifest
+from merklewatch.verification import compare_manifests
+
+
+def changed_copy(manifest: dict, changes: int) -> dict:
+    new = copy.deepcopy(manifest)
+    rng = random.Random(1)
+    for path in rng.sample(sorted(new['files']), changes):
+        new['files'][path]['content_hash'] = os.urandom(32).hex()
+        new['directories'][path.rpartition('/')[0]]['root_hash'] = os.urandom(32).hex()
+    new['root_hash'] = os.urandom(32).hex()
+    return new
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=1_000_000, help="Files per manifest")
+    parser.add_argument("--per-dir", type=int, default=100, help="Files per directory")
+    parser.add_argument("--changes", type=int, default=1, help="Files that differ")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    old = synthetic_manifest(args.files, per_dir=args.per_dir)
+    new = changed_copy(old, args.changes)
+    print(f"{args.files} files, {args.changes} changed")
+    print(f"{'manifests':<10} {'full (s)':>10} {'tree (s)':>10} {'speedup':>8}")
+
+    with tempfile.TemporaryDirectory(prefix="mw-bench-") as tmp:
+        old_path, new_path = Path(tmp) / "old.mwb", Path(tmp) / "new.mwb"
+        save_binary_manifest(old, old_path)
+        save_binary_manifest(new, new_path)
+
+        pairs = [
+            ("dict", lambda: (old, new)),
+            ("binary", lambda: (load_manifest(old_path), load_manifest(new_path))),
+        ]
+        for label, load in pairs:
+            a, b = load()
+            full_time, expected = best_of(lambda: compare_manifests(a, b, full=True), args.repeat)
+            tree_time, result = best_of(lambda: compare_manifests(a, b), args.repeat)
+            assert result == expected
+            print(f"{label:<10} {full_time:>10.3f} {tree_time:>10.4f} {full_time / tree_time:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+File hashing benchmark: file size class against read strategy.
+
+For each size class, a directory of files totalling roughly --bytes is
+hashed with every strategy and buffer size, and throughput is reported.
+`legacy` is the original buffered 64 KB f.read() loop. The fastest
+strategy per size class is what "auto" should pick.
+
+With --cold, each file's pages are dropped (posix_fadvise DONTNEED)
+before every run, so the measurement includes disk reads.
+"""
+import argparse
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+from common import best_of
+
+from merklewatch.hashing import hash_file
+
+SIZE_CLASSES = [
+    ("4K", 4 * 1024),
+    ("64K", 64 * 1024),
+    ("1M", 1024 * 1024),
+    ("16M", 16 * 1024 * 1024),
+    ("256M", 256 * 1024 * 1024),
+]
+
+KB = 1024
+MB = 1024 * 1024
+
+VARIANTS = [
+    ("legacy", None, None),
+    ("read", "read", 64 * KB),
+    ("readinto", "readinto", 64 * KB),
+    ("readinto", "readinto", 1 * MB),
+    ("mmap", "mmap", 1 * MB),
+    ("mmap", "mmap", 16 * MB),
+    ("auto", "auto", 1 * MB),
+]
+
+
+def legacy_hash_file(filepath):
+    hasher = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        while chunk := f.read(65536):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def drop_pages(paths):
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def make_files(root: Path, size: int, total: int):
+    root.mkdir(parents=True, exist_ok=True)
+    block = os.urandom(min(size, 4 * MB))
+    paths = []
+    for i in range(max(1, total // size)):
+        path = root / f"f{i:06d}.bin"
+        with open(path, "wb") as f:
+            remaining = size
+            while remaining > 0:
+                chunk = block[:min(len(block), remaining)]
+                f.write(chunk)
+                remaining -= len(chunk)
+        paths.append(str(path))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bytes", type=int, default=256 * MB, help="Approximate bytes per size class")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    parser.add_argument("--cold", action="store_true", help="Drop cached pages before each run")
+    parser.add_argument("--classes", default=",".join(label for label, _ in SIZE_CLASSES), help="Comma-separated size classes to run")
+    args = parser.parse_args()
+
+    wanted = set(args.classes.split(","))
+    print(f"{'class':<6} {'files':>6} {'strategy':<9} {'buffer':>7} {'MB/s':>9}")
+
+    with tempfile.TemporaryDirectory(prefix="mw-bench-") as tmp:
+        for label, size in SIZE_CLASSES:
+            if label not in wanted:
+                continue
+            paths = make_files(Path(tmp) / label, size, max(args.bytes, size))
+            total = size * len(paths)
+            expected = [legacy_hash_file(p) for p in paths]
+
+            for name, strategy, buffer_size in VARIANTS:
+                if strategy is None:
+                    run_one = legacy_hash_file
+                else:
+                    def run_one(path, strategy=strategy, buffer_size=buffer_size):
+                        return hash_file(path, buffer_size, strategy)
+
+                def run():
+                    if args.cold:
+                        drop_pages(paths)
+                    return [run_one(p) for p in paths]
+
+                elapsed, digests = best_of(run, args.repeat)
+                assert digests == expected, f"{name} disagrees with legacy"
+                buffer_label = f"{buffer_size // KB}K" if buffer_size else "64K"
+                print(f"{label:<6} {len(paths):>6} {name:<9} {buffer_label:>7} {total / elapsed / 1e6:>9.0f}")
+            print()
+
+
+if __name__ == "__main__":
+    main()
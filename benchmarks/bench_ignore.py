@@ -0,0 +1,91 @@
+"""
+Ignore matching benchmark: compiled PatternMatcher vs the per-pattern loop.
+
+Uses every pattern from common_ignores against a synthetic monorepo-like
+path list, checks both implementations agree on every path, and reports
+paths/s for each.
+"""
+import argparse
+import fnmatch
+import os
+import random
+
+from common import best_of
+
+from merklewatch.common_ignores import get_all_common_patterns
+from merklewatch.ignore import PatternMatcher
+
+
+def legacy_should_ignore(patterns, path_str: str) -> bool:
+    """The pre-compilation IgnoreRules.should_ignore loop."""
+    for pattern in patterns:
+        if pattern.endswith('/'):
+            dir_pattern = pattern.rstrip('/')
+            if path_str == dir_pattern:
+                return True
+            if path_str.startswith(dir_pattern + '/'):
+                return True
+            parts = path_str.split('/')
+            if dir_pattern in parts:
+                return True
+        elif '*' in pattern or '?' in pattern or '[' in pattern:
+            if fnmatch.fnmatch(path_str, pattern):
+                return True
+            if fnmatch.fnmatch(os.path.basename(path_str), pattern):
+                return True
+        else:
+            parts = path_str.split('/')
+            if pattern in parts:
+                return True
+            if path_str == pattern:
+                return True
+    return False
+
+
+def synthetic_paths(count: int, seed: int = 0):
+    """Deterministic monorepo-like relative paths, mostly not ignored."""
+    rng = random.Random(seed)
+    top = ["services", "libs", "apps", "tools", "docs"]
+    mid = ["api", "core", "web", "worker", "shared", "utils", "models", "build", "node_modules", "__pycache__"]
+    exts = [".py", ".ts", ".js", ".go", ".md", ".json", ".yaml", ".pyc", ".log", ".class", ".txt"]
+    paths = []
+    for i in range(count):
+        depth = rng.randint(1, 6)
+        parts = [rng.choice(top)] + [rng.choice(mid) + str(rng.randint(0, 20)) if rng.random() < 0.8 else rng.choice(mid) for _ in range(depth)]
+        parts.append(f"file{i}{rng.choice(exts)}")
+        paths.append('/'.join(parts))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paths", type=int, default=200_000, help="Number of synthetic paths")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per implementation (best is reported)")
+    args = parser.parse_args()
+
+    patterns = get_all_common_patterns()
+    paths = synthetic_paths(args.paths)
+
+    compile_time, _ = best_of(lambda: PatternMatcher(patterns), args.repeat)
+
+    legacy_time, legacy = best_of(lambda: [legacy_should_ignore(patterns, p) for p in paths], args.repeat)
+
+    def compiled_run():
+        # Fresh matcher each run so the directory cache starts cold
+        m = PatternMatcher(patterns)
+        return [m.matches(p) for p in paths]
+
+    compiled_time, compiled = best_of(compiled_run, args.repeat)
+
+    assert legacy == compiled, "compiled matcher disagrees with the legacy loop"
+
+    print(f"{len(patterns)} patterns, {len(paths)} paths ({sum(legacy)} ignored)")
+    print(f"compile time: {compile_time * 1000:.2f} ms")
+    print(f"{'implementation':<20} {'seconds':>10} {'paths/s':>12}")
+    print(f"{'legacy loop':<20} {legacy_time:>10.3f} {len(paths) / legacy_time:>12.0f}")
+    print(f"{'PatternMatcher':<20} {compiled_time:>10.3f} {len(paths) / compiled_time:>12.0f}")
+    print(f"\nspeedup: {legacy_time / compiled_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+`ignore` suggestion benchmark.
+
+Builds a tree of --files small files with a few vendored node_modules
+directories and some files matching common patterns, then times the two
+ways of finding which common ignore patterns match it:
+
+    per-pattern   the previous approach: os.walk into a list of every path,
+                  then fnmatch each common pattern against the paths until
+                  one matches (up to twice per path)
+    indexed       scan_for_suggestions(): one breadth-first pass, each entry
+                  checked against a precompiled index of the patterns not
+                  found yet, without descending into matched directories
+
+The per-pattern run is skipped above --max-old files.
+"""
+import argparse
+import fnmatch
+import os
+import tempfile
+from pathlib import Path
+
+from common import best_of, make_many_small_files
+
+from merklewatch.common_ignores import get_all_common_patterns, scan_for_suggestions
+
+
+def per_pattern(directory: Path):
+    all_paths = []
+    for root, dirs, files in os.walk(directory):
+        if '.git' in dirs:
+            dirs.remove('.git')
+        rel_root = Path(root).relative_to(directory)
+        if rel_root != Path('.'):
+            all_paths.append(str(rel_root) + '/')
+        for name in files:
+            all_paths.append(str(rel_root / name))
+
+    matched = set()
+    for pattern in get_all_common_patterns():
+        for path in all_paths:
+            if pattern.endswith('/'):
+                if path.startswith(pattern) or fnmatch.fnmatch(path, pattern):
+                    matched.add(pattern)
+                    break
+            elif fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(os.path.basename(path), pattern):
+                matched.add(pattern)
+                break
+    return matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=100_000, help="Number of small files")
+    parser.add_argument("--vendored", type=int, default=20_000, help="Files inside node_modules directories")
+    parser.add_argument("--max-old", type=int, default=200_000, help="Largest tree the per-pattern run is timed on")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="mw-bench-") as tmp:
+        root = make_many_small_files(Path(tmp) / "tree", args.files, size=16)
+        make_many_small_files(root / "web" / "node_modules", args.vendored, size=16)
+        for name in ("build.log", "core.o", "archive.tar.gz", ".DS_Store"):
+            (root / name).write_bytes(b"x")
+        total = args.files + args.vendored
+
+        indexed_time, scan = best_of(lambda: scan_for_suggestions(root), args.repeat)
+        print(f"{total} files, {len(get_all_common_patterns())} common patterns")
+        print(f"{'method':<12} {'time (s)':>10} {'paths/s':>12} {'matched':>8}")
+        if total <= args.max_old:
+            old_time, matched = best_of(lambda: per_pattern(root), 1)
+            print(f"{'per-pattern':<12} {old_time:>10.3f} {total / old_time:>12,.0f} {len(matched):>8}")
+        print(f"{'indexed':<12} {indexed_time:>10.3f} {total / indexed_time:>12,.0f} {len(scan.matched):>8}")
+        print(f"indexed visited {scan.entries} entries; matched {', '.join(sorted(scan.matched))}")
+
+
+if __name__ == "__main__":
+    main()
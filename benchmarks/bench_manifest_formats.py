@@ -0,0 +1,57 @@
+"""
+Manifest format benchmark: size, full load time and single-path lookup.
+
+Writes the same synthetic manifest as JSON, JSON Lines and binary, then
+reports file size, the time to load and walk every entry, and the time
+to open the manifest and look up one path.
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from common import best_of, synthetic_manifest
+
+from merklewatch.manifest import load_manifest, write_manifest
+
+FORMATS = [("json", ".json"), ("jsonl", ".jsonl"), ("binary", ".mwb")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=200_000, help="Number of file entries")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    manifest = synthetic_manifest(args.files)
+    probe = sorted(manifest['files'])[len(manifest['files']) // 2]
+
+    print(f"{args.files} files, {len(manifest['directories'])} directories")
+    print(f"{'format':<8} {'size MB':>9} {'write s':>9} {'load s':>9} {'lookup ms':>10}")
+
+    with tempfile.TemporaryDirectory(prefix="mw-bench-") as tmp:
+        for manifest_format, suffix in FORMATS:
+            path = Path(tmp) / f"manifest{suffix}"
+
+            start = time.perf_counter()
+            write_manifest(manifest, path, manifest_format)
+            write_time = time.perf_counter() - start
+
+            def full_load():
+                loaded = load_manifest(path)
+                return sum(1 for _ in loaded['files'].items())
+
+            def single_lookup():
+                return load_manifest(path)['files'][probe]['content_hash']
+
+            load_time, count = best_of(full_load, args.repeat)
+            lookup_time, content_hash = best_of(single_lookup, args.repeat)
+            assert count == args.files
+            assert content_hash == manifest['files'][probe]['content_hash']
+
+            size_mb = path.stat().st_size / 1e6
+            print(f"{manifest_format:<8} {size_mb:>9.1f} {write_time:>9.2f} {load_time:>9.2f} {lookup_time * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Merkle root benchmark for very wide directories.
+
+Computes the root of one flat directory with N children (10^6 by default)
+three ways and reports time and peak traced memory:
+
+    legacy   the original hex implementation (hex round-trip per node,
+             prefix + left + right concatenation, list per level)
+    hex      compute_merkle_root(): hex in and out, bytes in between
+    digest   compute_merkle_root_digest() on a packed buffer of raw digests,
+             as the scanner calls it
+"""
+import argparse
+import hashlib
+import random
+import tracemalloc
+
+from common import best_of
+
+from merklewatch.merkle import compute_merkle_root, compute_merkle_root_digest
+
+
+def legacy_merkle_root(hashes):
+    """The pre-buffer implementation, kept for comparison."""
+    def internal(left_hex, right_hex):
+        return hashlib.sha256(b'\x01' + bytes.fromhex(left_hex) + bytes.fromhex(right_hex)).hexdigest()
+
+    if not hashes:
+        return hashlib.sha256(b'\x01').hexdigest()
+
+    current_level = list(hashes)
+    while len(current_level) > 1:
+        if len(current_level) % 2 != 0:
+            current_level.append(current_level[-1])
+        current_level = [internal(current_level[i], current_level[i + 1]) for i in range(0, len(current_level), 2)]
+    return current_level[0]
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=1_000_000, help="Children in the directory")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    packed = rng.randbytes(32 * args.entries)
+    hex_hashes = [packed[i:i + 32].hex() for i in range(0, len(packed), 32)]
+
+    variants = [
+        ("legacy", lambda: legacy_merkle_root(hex_hashes)),
+        ("hex", lambda: compute_merkle_root(hex_hashes)),
+        ("digest", lambda: compute_merkle_root_digest(packed).hex()),
+    ]
+
+    print(f"{args.entries} entries")
+    print(f"{'variant':<8} {'time s':>8} {'entries/s':>12} {'peak MB':>9}")
+
+    roots = set()
+    for name, fn in variants:
+        elapsed, root = best_of(fn, args.repeat)
+        roots.add(root)
+        peak = peak_memory(fn)
+        print(f"{name:<8} {elapsed:>8.2f} {args.entries / elapsed:>12,.0f} {peak / 1e6:>9.1f}")
+
+    assert len(roots) == 1, "variants disagree on the root"
+    print(f"root: {roots.pop()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Move detection benchmark: a large directory reorganization.
+
+Builds a synthetic manifest of --files entries, then a copy in which
+--moved-dirs directories are moved under archive/ and --moved-files single
+files are moved to another directory. Reports the time of
+compare_manifests() and of detect_moves() on its result, and how many
+report lines each produces:
+
+    compare    added + removed + modified paths
+    moves      remaining paths plus one line per renamed/moved/copied pair
+"""
+import argparse
+import copy
+import os
+import random
+from collections import defaultdict
+
+from common import best_of, synthetic_manifest
+
+from merklewatch.verification import compare_manifests, detect_moves
+
+
+def reorganized(manifest: dict, moved_dirs: int, moved_files: int) -> dict:
+    new = copy.deepcopy(manifest)
+    rng = random.Random(1)
+    directories = sorted(new['directories'])
+    by_directory = defaultdict(list)
+    for path in new['files']:
+        by_directory[path.rpartition('/')[0]].append(path)
+
+    new['directories']['archive'] = {'root_hash': os.urandom(32).hex()}
+    for directory in rng.sample(directories, moved_dirs):
+        target = f"archive/{directory}"
+        new['directories'][target] = new['directories'].pop(directory)
+        for path in by_directory[directory]:
+            new['files'][target + path[len(directory):]] = new['files'].pop(path)
+
+    remaining = sorted(path for path in new['files'] if not path.startswith('archive/'))
+    for path in rng.sample(remaining, moved_files):
+        target = f"{rng.choice(directories)}/moved-{path.rpartition('/')[2]}"
+        if target not in new['files'] and target.rpartition('/')[0] in new['directories']:
+            new['files'][target] = new['files'].pop(path)
+            new['directories'][target.rpartition('/')[0]]['root_hash'] = os.urandom(32).hex()
+            new['directories'][path.rpartition('/')[0]]['root_hash'] = os.urandom(32).hex()
+    new['root_hash'] = os.urandom(32).hex()
+    return new
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=500_000, help="Files per manifest")
+    parser.add_argument("--per-dir", type=int, default=100, help="Files per directory")
+    parser.add_argument("--moved-dirs", type=int, default=1000, help="Directories moved under archive/")
+    parser.add_argument("--moved-files", type=int, default=10_000, help="Single files moved to another directory")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    old = synthetic_manifest(args.files, per_dir=args.per_dir)
+    new = reorganized(old, args.moved_dirs, args.moved_files)
+
+    compare_time, diffs = best_of(lambda: compare_manifests(old, new, full=True), args.repeat)
+    moves_time, moves = best_of(lambda: detect_moves(diffs, old, new), args.repeat)
+
+    print(f"{args.files} files, {args.moved_dirs} directories and {args.moved_files} files moved")
+    print(f"{'stage':<10} {'time (s)':>10} {'lines':>10}")
+    print(f"{'compare':<10} {compare_time:>10.3f} {sum(len(paths) for paths in diffs.values()):>10}")
+    print(f"{'moves':<10} {moves_time:>10.3f} {sum(len(paths) for paths in moves.values()):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Throughput scaling of scan_directory with 1/2/4/8/16 hashing workers.
+
+Two tree shapes are measured: many small files and a few huge files.
+Every run must produce the same root hash as the serial scan.
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+from common import best_of, make_few_huge_files, make_many_small_files, tree_bytes
+
+from merklewatch.filesystem import scan_directory
+
+WORKERS = [1, 2, 4, 8, 16]
+
+
+def run_scan(root: Path, jobs: int) -> str:
+    manifest_data = {'files': {}, 'directories': {}}
+    return scan_directory(root, root, manifest_data, jobs=jobs)
+
+
+def bench_tree(label: str, root: Path, repeat: int):
+    total = tree_bytes(root)
+    print(f"\n{label}: {total / 1e6:.1f} MB")
+    print(f"{'jobs':>6} {'seconds':>10} {'MB/s':>10} {'speedup':>8}")
+
+    baseline_time = None
+    baseline_root = None
+    for jobs in WORKERS:
+        elapsed, root_hash = best_of(lambda: run_scan(root, jobs), repeat)
+        if baseline_root is None:
+            baseline_time, baseline_root = elapsed, root_hash
+        assert root_hash == baseline_root, f"root mismatch with jobs={jobs}"
+        print(f"{jobs:>6} {elapsed:>10.3f} {total / elapsed / 1e6:>10.1f} {baseline_time / elapsed:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--small-files", type=int, default=20000, help="Number of files in the many-small-files tree")
+    parser.add_argument("--huge-files", type=int, default=4, help="Number of files in the few-huge-files tree")
+    parser.add_argument("--huge-size-mb", type=int, default=256, help="Size of each huge file in MB")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per configuration (best is reported)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="mw-bench-") as tmp:
+        tmp_path = Path(tmp)
+        small = make_many_small_files(tmp_path / "small", args.small_files)
+        huge = make_few_huge_files(tmp_path / "huge", args.huge_files, args.huge_size_mb * 1024 * 1024)
+
+        bench_tree(f"Many small files ({args.small_files})", small, args.repeat)
+        bench_tree(f"Few huge files ({args.huge_files} x {args.huge_size_mb} MB)", huge, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
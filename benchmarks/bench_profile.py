@@ -0,0 +1,64 @@
+"""
+Scan instrumentation overhead benchmark.
+
+Scans a synthetic many-file tree with scan_directory() three ways:
+
+    plain      no profile (the unmodified scanner)
+    profiled   with a ScanProfile collecting phase timings and counters
+    reused     profiled, with every hash reused from a baseline, so the
+               per-file instrumentation is a larger share of the work
+
+and prints the profile report of the profiled run.
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+from common import best_of, make_many_small_files
+
+from merklewatch.filesystem import scan_directory
+from merklewatch.incremental import Baseline
+from merklewatch.profiling import ScanProfile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=50_000, help="Number of small files")
+    parser.add_argument("--jobs", type=int, default=1, help="Hashing threads")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="mw-bench-") as tmp:
+        root = make_many_small_files(Path(tmp) / "tree", args.files, size=512)
+
+        def run(profile=None, baseline=None):
+            manifest_data = {'files': {}, 'directories': {}}
+            root_hash = scan_directory(root, root, manifest_data, jobs=args.jobs, baseline=baseline, profile=profile)
+            return root_hash, manifest_data
+
+        def run_profiled(baseline=None):
+            profile = ScanProfile()
+            profile.start()
+            root_hash, _ = run(profile, baseline)
+            profile.stop()
+            return root_hash, profile
+
+        plain_time, (expected, manifest_data) = best_of(run, args.repeat)
+        profiled_time, (root_hash, profile) = best_of(run_profiled, args.repeat)
+        assert root_hash == expected
+
+        baseline = Baseline(dict(manifest_data, root_hash=expected))
+        plain_reused, _ = best_of(lambda: run(baseline=baseline), args.repeat)
+        profiled_reused, _ = best_of(lambda: run_profiled(baseline), args.repeat)
+
+        print(f"{args.files} files, jobs={args.jobs}")
+        print(f"{'run':<10} {'plain (s)':>10} {'profiled (s)':>13} {'overhead':>9}")
+        print(f"{'hashed':<10} {plain_time:>10.3f} {profiled_time:>13.3f} {100 * (profiled_time / plain_time - 1):>8.1f}%")
+        print(f"{'reused':<10} {plain_reused:>10.3f} {profiled_reused:>13.3f} {100 * (profiled_reused / plain_reused - 1):>8.1f}%")
+
+        print()
+        print(profile.format())
+
+
+if __name__ == "__main__":
+    main()
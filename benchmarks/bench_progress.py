@@ -0,0 +1,52 @@
+"""
+Progress reporting overhead benchmark.
+
+Scans a synthetic many-file tree with scan_directory() three ways:
+
+    plain       no progress reporting
+    progress    metadata pre-pass, then per-file progress updates, with
+                the pre-pass listings and lstat results reused by the scan
+    no-reuse    the same with nothing kept from the pre-pass, so every
+                directory is listed and every file stat-ed twice
+
+The bar and JSON lines are rendered to a discarded stderr.
+"""
+import argparse
+import contextlib
+import os
+import tempfile
+from pathlib import Path
+
+from common import best_of, make_many_small_files
+
+from merklewatch.filesystem import scan_directory
+from merklewatch.progress import ScanProgress
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=50_000, help="Number of small files")
+    parser.add_argument("--jobs", type=int, default=1, help="Hashing threads")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="mw-bench-") as tmp, open(os.devnull, "w") as devnull:
+        root = make_many_small_files(Path(tmp) / "tree", args.files, size=512)
+
+        def run(**progress_options):
+            progress = ScanProgress(interval=1.0, **progress_options) if progress_options else None
+            with contextlib.redirect_stderr(devnull):
+                return scan_directory(root, root, {'files': {}, 'directories': {}}, jobs=args.jobs, progress=progress)
+
+        plain_time, expected = best_of(run, args.repeat)
+        print(f"{args.files} files, jobs={args.jobs}")
+        print(f"{'mode':<10} {'time (s)':>10} {'overhead':>9}")
+        print(f"{'plain':<10} {plain_time:>10.3f} {0:>8.1f}%")
+        for label, options in (("progress", {'bar': True}), ("no-reuse", {'bar': True, 'max_cached_entries': 0})):
+            elapsed, root_hash = best_of(lambda: run(**options), args.repeat)
+            assert root_hash == expected, label
+            print(f"{label:<10} {elapsed:>10.3f} {100 * (elapsed / plain_time - 1):>8.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+CLI startup-time benchmark.
+
+Measures, in fresh interpreters:
+
+    import     `python -X importtime -c "import merklewatch.cli"`: total
+               import time and the slowest modules (cumulative, best of
+               --repeat runs)
+    verify     wall time of `python -m merklewatch verify` on a tree of a
+               few files, where startup dominates
+    baseline   wall time of `python -c "import typer"`, the floor any
+               typer CLI pays
+
+and exits with status 1 if the verify startup exceeds --budget
+milliseconds. suite.py runs the same measurements with the same budget.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from common import make_many_small_files
+
+# Cold `merklewatch verify` wall time allowed on a tiny tree (seconds)
+DEFAULT_BUDGET = 0.1
+
+# Modules only some commands need, which must not load at startup
+HEAVY_MODULES = ("questionary", "prompt_toolkit", "sqlite3", "gzip", "cProfile", "ctypes", "asyncio",
+                 "merklewatch.common_ignores", "merklewatch.proof", "merklewatch.watch", "merklewatch.chunking",
+                 "merklewatch.profiling", "merklewatch.progress", "merklewatch.binary_manifest", "merklewatch.async_scan",
+                 "merklewatch.cache", "merklewatch.verification", "random")
+
+# Measure startup as installed, with bytecode cached after the first run
+_ENV = {name: value for name, value in os.environ.items() if name != "PYTHONDONTWRITEBYTECODE"}
+
+
+def import_times(module: str, repeat: int = 5) -> Dict[str, float]:
+    """Cumulative import time in seconds of every module `module` pulls in, best of `repeat` fresh interpreters."""
+    best: Dict[str, float] = {}
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True, env=_ENV)
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, name = line.split("|")
+            if not cumulative.strip().isdigit():
+                continue  # the header line
+            seconds = int(cumulative) / 1e6
+            name = name.strip()
+            best[name] = min(best.get(name, seconds), seconds)
+    return best
+
+
+def wall_time(args: List[str], repeat: int = 5) -> float:
+    """Best wall time of running `args` in a fresh interpreter."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, capture_output=True, check=False, env=_ENV)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def verify_startup(workdir: Path, repeat: int = 5) -> float:
+    """Best wall time of `merklewatch verify` on a tree of a few small files."""
+    root = workdir / "startup-tree"
+    manifest = workdir / "startup.json"
+    if not manifest.exists():
+        make_many_small_files(root, 10, size=64)
+        subprocess.run([sys.executable, "-m", "merklewatch", "snapshot", str(root), "--out", str(manifest)], capture_output=True, check=True, env=_ENV)
+    return wall_time(["-m", "merklewatch", "verify", str(manifest), str(root)], repeat)
+
+
+def slowest_imports(times: Dict[str, float], top: int) -> List[Tuple[str, float]]:
+    """The `top` top-level imports (and merklewatch modules) with the highest cumulative time."""
+    return sorted(times.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="Fresh interpreters per measurement (best is reported)")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET * 1000, help="Allowed verify startup in milliseconds")
+    args = parser.parse_args()
+
+    times = import_times("merklewatch.cli", args.repeat)
+    print(f"import merklewatch.cli: {times['merklewatch.cli'] * 1000:.1f} ms")
+    for name, seconds in slowest_imports(times, args.top):
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+    for heavy in HEAVY_MODULES:
+        if heavy in times:
+            print(f"Warning: {heavy} is imported at startup")
+
+    with tempfile.TemporaryDirectory(prefix="mw-bench-") as tmp:
+        verify = verify_startup(Path(tmp), args.repeat)
+    floor = wall_time(["-c", "import typer"], args.repeat)
+    interpreter = wall_time(["-c", "pass"], args.repeat)
+
+    print()
+    print(f"{'python -c pass':<24} {interpreter * 1000:8.1f} ms")
+    print(f"{'python -c import typer':<24} {floor * 1000:8.1f} ms")
+    print(f"{'merklewatch verify':<24} {verify * 1000:8.1f} ms  (budget {args.budget:.0f} ms, {(verify - floor) * 1000:+.1f} ms over import typer)")
+    if verify * 1000 > args.budget:
+        print(f"\nverify startup is over budget by {verify * 1000 - args.budget:.1f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
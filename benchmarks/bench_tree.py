@@ -0,0 +1,70 @@
+"""
+In-memory MerkleTree benchmark: point updates versus rebuilding.
+
+Builds a MerkleTree from a synthetic manifest (flat directories of
+--per-dir files), then changes one random file's hash at a time and reads
+the new root. Reports:
+
+    build      MerkleTree.from_manifest() for the whole tree
+    update     update_file() + root_hash, per change (O(depth * log k))
+    rebuild    from_manifest() + root_hash after a change, i.e. recomputing
+               everything (best of --rebuilds changes)
+
+Every updated root is checked against a rebuild from the changed manifest.
+"""
+import argparse
+import os
+import random
+import time
+
+from common import best_of, synthetic_manifest
+
+from merklewatch.tree import MerkleTree
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=200_000, help="Files in the synthetic manifest")
+    parser.add_argument("--per-dir", type=int, default=1000, help="Files per directory")
+    parser.add_argument("--updates", type=int, default=10_000, help="Point updates to time")
+    parser.add_argument("--rebuilds", type=int, default=3, help="Full rebuilds to time")
+    args = parser.parse_args()
+
+    manifest = synthetic_manifest(args.files, per_dir=args.per_dir)
+    files = manifest['files']
+    build_time, tree = best_of(lambda: MerkleTree.from_manifest(manifest), 1)
+    root_hash = tree.root_hash
+
+    rng = random.Random(0)
+    paths = sorted(files)
+
+    def change() -> str:
+        """Give one random file a new hash in both the tree and the manifest."""
+        path = rng.choice(paths)
+        files[path]['content_hash'] = os.urandom(32).hex()
+        tree.update_file(path, files[path]['content_hash'])
+        return path
+
+    start = time.perf_counter()
+    for _ in range(args.updates):
+        change()
+        root_hash = tree.root_hash
+    update_time = (time.perf_counter() - start) / args.updates
+    assert root_hash == MerkleTree.from_manifest(manifest).root_hash
+
+    rebuild_time = float("inf")
+    for _ in range(args.rebuilds):
+        change()
+        start = time.perf_counter()
+        rebuilt = MerkleTree.from_manifest(manifest).root_hash
+        rebuild_time = min(rebuild_time, time.perf_counter() - start)
+        assert rebuilt == tree.root_hash
+
+    print(f"{args.files} files, {args.per_dir} per directory")
+    print(f"build    {build_time:9.3f} s")
+    print(f"update   {update_time * 1e6:9.1f} us per change")
+    print(f"rebuild  {rebuild_time * 1e3:9.1f} ms per change ({rebuild_time / update_time:,.0f}x slower)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Directory walk microbenchmark on a synthetic many-file tree.
+
+Compares the metadata cost of the previous walker (os.listdir plus
+Path.is_symlink/is_file/stat and relative_to per entry) against the
+os.scandir walker now used by scan_directory, and times a full
+metadata-only scan_directory run (every hash reused from a baseline).
+"""
+import argparse
+import os
+import tempfile
+from pathlib import Path
+
+from common import best_of, make_many_small_files
+
+from merklewatch.filesystem import scan_directory
+from merklewatch.incremental import Baseline
+
+
+def legacy_walk(current_path: Path, root_path: Path, files: dict) -> dict:
+    """Metadata-only replica of the pre-scandir walker: relative path -> size."""
+    for entry in sorted(os.listdir(current_path)):
+        full_path = current_path / entry
+        if full_path.is_symlink():
+            continue
+        relative_path = full_path.relative_to(root_path).as_posix()
+        if full_path.is_file():
+            files[relative_path] = full_path.stat().st_size
+        elif full_path.is_dir():
+            legacy_walk(full_path, root_path, files)
+    return files
+
+
+def scandir_walk(current_path: str, files: dict, relative_dir: str = '') -> dict:
+    """Metadata-only replica of the os.scandir walker: relative path -> size."""
+    prefix = relative_dir + '/' if relative_dir else ''
+    with os.scandir(current_path) as it:
+        entries = sorted(it, key=lambda e: e.name)
+    for entry in entries:
+        relative_path = prefix + entry.name
+        if entry.is_symlink():
+            continue
+        if entry.is_file(follow_symlinks=False):
+            files[relative_path] = entry.stat(follow_symlinks=False).st_size
+        elif entry.is_dir(follow_symlinks=False):
+            scandir_walk(entry.path, files, relative_path)
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=1_000_000, help="Number of files in the synthetic tree")
+    parser.add_argument("--per-dir", type=int, default=1000, help="Files per directory")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per configuration (best is reported)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="mw-bench-") as tmp:
+        root = make_many_small_files(Path(tmp) / "tree", args.files, size=16, per_dir=args.per_dir)
+
+        legacy_time, legacy_files = best_of(lambda: legacy_walk(root, root, {}), args.repeat)
+        scandir_time, scandir_files = best_of(lambda: scandir_walk(os.fspath(root), {}), args.repeat)
+        assert legacy_files == scandir_files and len(scandir_files) == args.files
+
+        manifest_data = {'files': {}, 'directories': {}}
+        scan_directory(root, root, manifest_data)
+        baseline = Baseline(manifest_data)
+
+        def metadata_scan():
+            return scan_directory(root, root, {'files': {}, 'directories': {}}, baseline=baseline)
+
+        scan_time, _ = best_of(metadata_scan, args.repeat)
+
+        print(f"{args.files} files, {args.per_dir} per directory")
+        print(f"{'walker':<28} {'seconds':>10} {'files/s':>12}")
+        for label, elapsed in [
+            ("listdir + pathlib (legacy)", legacy_time),
+            ("os.scandir", scandir_time),
+            ("scan_directory (baseline)", scan_time),
+        ]:
+            print(f"{label:<28} {elapsed:>10.3f} {args.files / elapsed:>12.0f}")
+        print(f"\nscandir speedup over legacy walk: {legacy_time / scandir_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Deterministic synthetic trees for the benchmark suite.
+
+Every generator takes a root directory, a scale factor and a seed, and
+writes the same names, sizes and bytes for the same arguments on every
+machine, so results from different runs and hosts measure the same work.
+File mtimes are pinned to a fixed date for the same reason.
+
+    wide-flat      one directory with many small files
+    deep-narrow    a long chain of nested directories, a few files each
+    monorepo       packages with sources, tests and vendored node_modules,
+                   a .git directory, build output and a .merkleignore
+    huge-files     a few large files
+    tiny-files     many files of 0-64 bytes spread over many directories
+"""
+import os
+import random
+import shutil
+from pathlib import Path
+from typing import Callable, Dict
+
+# Bump when a generator's output changes, so cached trees are rebuilt
+GENERATOR_VERSION = 1
+
+_MTIME = 1_700_000_000
+
+
+def _write(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    os.utime(path, (_MTIME, _MTIME))
+
+
+def _scaled(count: int, scale: float, minimum: int = 1) -> int:
+    return max(minimum, int(count * scale))
+
+
+def wide_flat(root: Path, scale: float = 1.0, seed: int = 0) -> Path:
+    """`20,000 * scale` files of 256 B - 4 KB in a single directory."""
+    rng = random.Random(seed)
+    for i in range(_scaled(20_000, scale)):
+        _write(root / f"file{i:07d}.dat", rng.randbytes(rng.randint(256, 4096)))
+    return root
+
+
+def deep_narrow(root: Path, scale: float = 1.0, seed: int = 0) -> Path:
+    """A chain of `200 * scale` nested directories (at most 400) with 5 files each."""
+    rng = random.Random(seed)
+    directory = root
+    for depth in range(min(400, _scaled(200, scale))):
+        for i in range(5):
+            _write(directory / f"f{i}.txt", rng.randbytes(rng.randint(64, 2048)))
+        directory = directory / f"d{depth:03d}"
+    directory.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+MONOREPO_IGNORE = """\
+node_modules/
+.git/
+build/
+*.log
+__pycache__/
+"""
+
+
+def monorepo(root: Path, scale: float = 1.0, seed: int = 0) -> Path:
+    """
+    `40 * scale` packages, each with sources, tests, build output, logs and a
+    vendored node_modules of 10 dependencies, plus a .git object store. The
+    .merkleignore excludes node_modules, .git, build output and logs, so
+    about four in five files are ignored.
+    """
+    rng = random.Random(seed)
+    _write(root / ".merkleignore", MONOREPO_IGNORE.encode())
+    _write(root / "package.json", b'{"private": true, "workspaces": ["packages/*"]}\n')
+
+    for i in range(_scaled(256, scale)):
+        _write(root / ".git" / "objects" / f"{i % 256:02x}" / f"{rng.getrandbits(152):038x}", rng.randbytes(rng.randint(100, 4000)))
+
+    for p in range(_scaled(40, scale)):
+        package = root / "packages" / f"pkg{p:03d}"
+        _write(package / "package.json", f'{{"name": "pkg{p:03d}", "version": "1.0.{p}"}}\n'.encode())
+        for module in range(8):
+            _write(package / "src" / f"module{module}.ts", rng.randbytes(rng.randint(500, 8000)))
+            _write(package / "tests" / f"module{module}.test.ts", rng.randbytes(rng.randint(300, 3000)))
+            _write(package / "build" / f"module{module}.js", rng.randbytes(rng.randint(500, 8000)))
+        _write(package / "npm-debug.log", rng.randbytes(200))
+        for dependency in range(10):
+            vendored = package / "node_modules" / f"dep{(p * 7 + dependency) % 50:02d}"
+            _write(vendored / "package.json", b'{"main": "index.js"}\n')
+            _write(vendored / "index.js", rng.randbytes(rng.randint(200, 4000)))
+            for lib in range(4):
+                _write(vendored / "lib" / f"part{lib}.js", rng.randbytes(rng.randint(200, 4000)))
+    return root
+
+
+def huge_files(root: Path, scale: float = 1.0, seed: int = 0) -> Path:
+    """3 files of `64 MB * scale` (at least 1 MB) each."""
+    rng = random.Random(seed)
+    size = max(1 << 20, int((64 << 20) * scale))
+    for i in range(3):
+        block = rng.randbytes(1 << 20)
+        path = root / f"huge{i}.bin"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            for offset in range(0, size, len(block)):
+                # Vary every block so no two chunks hash alike
+                f.write(offset.to_bytes(8, "little") + block[8:min(len(block), size - offset)])
+        os.utime(path, (_MTIME, _MTIME))
+    return root
+
+
+def tiny_files(root: Path, scale: float = 1.0, seed: int = 0) -> Path:
+    """`50,000 * scale` files of 0 - 64 bytes, 100 per directory."""
+    rng = random.Random(seed)
+    for i in range(_scaled(50_000, scale)):
+        _write(root / f"d{i // 100:04d}" / f"t{i:06d}", rng.randbytes(rng.randint(0, 64)))
+    return root
+
+
+TREE_SHAPES: Dict[str, Callable[..., Path]] = {
+    "wide-flat": wide_flat,
+    "deep-narrow": deep_narrow,
+    "monorepo": monorepo,
+    "huge-files": huge_files,
+    "tiny-files": tiny_files,
+}
+
+
+def generate(shape: str, workdir: Path, scale: float = 1.0, seed: int = 0) -> Path:
+    """
+    The tree of `shape` under workdir, generated on first use.
+
+    Trees are reused across runs when the shape, scale, seed and generator
+    version match; a marker file next to the tree records completion.
+    """
+    name = f"{shape}-s{scale:g}-r{seed}-v{GENERATOR_VERSION}"
+    root = workdir / name
+    marker = workdir / f"{name}.done"
+    if not marker.exists():
+        if root.exists():
+            shutil.rmtree(root)
+        TREE_SHAPES[shape](root, scale, seed)
+        marker.touch()
+    return root
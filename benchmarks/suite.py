@@ -0,0 +1,330 @@
+"""
+Reproducible benchmark suite with regression checks.
+
+Generates deterministic trees (see generators.py) and times, for every
+tree shape, the CLI commands end to end:
+
+    e2e/<shape>/snapshot    merklewatch snapshot
+    e2e/<shape>/verify      merklewatch verify against that snapshot
+    e2e/<shape>/diff        merklewatch diff against a snapshot with 1% of files changed
+    e2e/<shape>/ignore      walk the tree and match every path against the common ignore patterns
+    e2e/<shape>/suggest     find the common patterns matching the tree, as `merklewatch ignore` does
+
+the CLI startup (see bench_startup.py):
+
+    startup/import          import time of merklewatch.cli (python -X importtime)
+    startup/verify          wall time of a fresh `merklewatch verify` on a tiny tree
+
+and the core functions in isolation:
+
+    module/compute_merkle_root      root of 100,000 leaves
+    module/hash_file/<size>         4 KB, 1 MB and 64 MB files
+    module/should_ignore            IgnoreRules.should_ignore() over the monorepo paths
+    module/compare_manifests/<mode> 200,000-file manifests differing in 10 files
+
+Everything scales with --scale. Results are written as JSON (--output);
+with --baseline, each timing is compared with a stored run of the same
+scale and seed, and the exit status is 1 if any is slower by more than
+--threshold, so a regression fails a release check. The verify startup
+must also stay within --startup-budget milliseconds, baseline or not:
+
+    python benchmarks/suite.py --output benchmarks/baseline.json        # on the release branch
+    python benchmarks/suite.py --baseline benchmarks/baseline.json      # on the candidate
+
+Generated trees are kept in --workdir between runs (a temporary directory
+by default).
+"""
+import argparse
+import copy
+import fnmatch
+import hashlib
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from bench_startup import DEFAULT_BUDGET, HEAVY_MODULES, import_times, verify_startup
+from common import best_of, synthetic_manifest
+from generators import GENERATOR_VERSION, TREE_SHAPES, generate
+
+from typer.testing import CliRunner
+
+import merklewatch
+from merklewatch.cli import app
+from merklewatch.common_ignores import get_all_common_patterns, scan_for_suggestions
+from merklewatch.hashing import hash_file
+from merklewatch.ignore import IgnoreRules
+from merklewatch.manifest import load_manifest
+from merklewatch.merkle import compute_merkle_root
+from merklewatch.verification import compare_manifests
+
+SCHEMA_VERSION = 1
+
+# Timings below this many seconds are too noisy to flag
+MIN_DELTA = 0.005
+
+
+class Suite:
+    """Runs the selected benchmarks and collects their results."""
+
+    def __init__(self, repeat: int, only: Optional[List[str]] = None):
+        self.repeat = repeat
+        self.only = only
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def selected(self, name: str) -> bool:
+        return not self.only or any(fnmatch.fnmatch(name, pattern) for pattern in self.only)
+
+    def measure(self, name: str, fn: Callable[[], Any], items: Optional[int] = None, size: Optional[int] = None):
+        """Time fn (best of `repeat` runs) and record it under name, with its item and byte counts."""
+        if not self.selected(name):
+            return
+        seconds, _ = best_of(fn, self.repeat)
+        self.record(name, seconds, items, size)
+
+    def record(self, name: str, seconds: float, items: Optional[int] = None, size: Optional[int] = None):
+        result: Dict[str, Any] = {'seconds': seconds}
+        if items is not None:
+            result['items'] = items
+            result['items_per_second'] = items / seconds if seconds else None
+        if size is not None:
+            result['bytes'] = size
+            result['bytes_per_second'] = size / seconds if seconds else None
+        self.results[name] = result
+        rate = f"{items / seconds:>12,.0f}/s" if items and seconds else ''
+        print(f"  {name:<44} {seconds:>9.4f} s {rate}", flush=True)
+
+
+def run_cli(*args: Any, expect: int = 0):
+    result = CliRunner().invoke(app, [str(arg) for arg in args])
+    if result.exit_code != expect:
+        raise RuntimeError(f"merklewatch {' '.join(map(str, args))} exited with {result.exit_code}:\n{result.output}")
+
+
+def tree_stats(root: Path) -> Dict[str, Any]:
+    files = 0
+    size = 0
+    for directory, _, names in os.walk(root):
+        for name in names:
+            files += 1
+            size += os.path.getsize(os.path.join(directory, name))
+    return {'files': files, 'bytes': size}
+
+
+@contextmanager
+def changed_files(root: Path, fraction: float, seed: int) -> Iterator[None]:
+    """Temporarily overwrite the first byte of a deterministic sample of files."""
+    paths = sorted(Path(directory) / name for directory, _, names in os.walk(root) for name in names)
+    rng = random.Random(seed)
+    sample = rng.sample(paths, max(1, int(len(paths) * fraction)))
+    saved = []
+    for path in sample:
+        stat = path.stat()
+        with open(path, 'r+b') as f:
+            first = f.read(1)
+            f.seek(0)
+            f.write(bytes([(first[0] + 1) % 256]) if first else b'x')
+        saved.append((path, first, stat))
+    try:
+        yield
+    finally:
+        for path, first, stat in saved:
+            with open(path, 'r+b') as f:
+                if first:
+                    f.write(first)
+                else:
+                    f.truncate(0)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+def ignore_pass(root: Path) -> int:
+    """Walk a tree and match every relative path against the common ignore patterns."""
+    rules = IgnoreRules(root)
+    for pattern in get_all_common_patterns():
+        rules.add_pattern(pattern)
+    ignored = 0
+    for directory, subdirectories, names in os.walk(root):
+        relative = os.path.relpath(directory, root).replace(os.sep, '/')
+        prefix = '' if relative == '.' else relative + '/'
+        for name in subdirectories + names:
+            ignored += rules.should_ignore_relative(prefix + name)
+    return ignored
+
+
+def bench_trees(suite: Suite, shapes: List[str], workdir: Path, output_dir: Path, scale: float, seed: int) -> Dict[str, Any]:
+    trees = {}
+    for shape in shapes:
+        if not any(suite.selected(f"e2e/{shape}/{step}") for step in ('snapshot', 'verify', 'diff', 'ignore', 'suggest')):
+            continue
+        print(f"{shape}:", flush=True)
+        root = generate(shape, workdir, scale, seed)
+        stats = tree_stats(root)
+        files = stats['files']
+        old = output_dir / f"{shape}.json"
+        new = output_dir / f"{shape}-changed.json"
+
+        run_cli('snapshot', root, '--out', old)
+        trees[shape] = dict(stats, root_hash=load_manifest(old)['root_hash'])
+        with changed_files(root, 0.01, seed):
+            run_cli('snapshot', root, '--out', new)
+
+        suite.measure(f"e2e/{shape}/snapshot", lambda: run_cli('snapshot', root, '--out', old), files, stats['bytes'])
+        suite.measure(f"e2e/{shape}/verify", lambda: run_cli('verify', old, root), files, stats['bytes'])
+        suite.measure(f"e2e/{shape}/diff", lambda: run_cli('diff', old, new, expect=1), files)
+        suite.measure(f"e2e/{shape}/ignore", lambda: ignore_pass(root), files)
+        suite.measure(f"e2e/{shape}/suggest", lambda: scan_for_suggestions(root, IgnoreRules(root)), files)
+    return trees
+
+
+def bench_modules(suite: Suite, workdir: Path, scale: float, seed: int):
+    print("modules:", flush=True)
+    rng = random.Random(seed)
+
+    leaves = [hashlib.sha256(i.to_bytes(8, 'little')).hexdigest() for i in range(max(2, int(100_000 * scale)))]
+    suite.measure("module/compute_merkle_root", lambda: compute_merkle_root(leaves), len(leaves))
+
+    files_dir = workdir / f"module-files-r{seed}"
+    files_dir.mkdir(parents=True, exist_ok=True)
+    for label, size, calls in (("4KB", 4 << 10, 1000), ("1MB", 1 << 20, 50), ("64MB", max(1 << 20, int((64 << 20) * scale)), 1)):
+        path = files_dir / f"{label}.bin"
+        if not path.exists() or path.stat().st_size != size:
+            path.write_bytes(rng.randbytes(size))
+        suite.measure(f"module/hash_file/{label}", lambda: [hash_file(path) for _ in range(calls)], calls, size * calls)
+
+    if suite.selected("module/should_ignore"):
+        root = generate("monorepo", workdir, scale, seed)
+        rules = IgnoreRules(root)
+        for pattern in get_all_common_patterns():
+            rules.add_pattern(pattern)
+        paths = [Path(directory, name).relative_to(root) for directory, subdirectories, names in os.walk(root) for name in subdirectories + names]
+        suite.measure("module/should_ignore", lambda: [rules.should_ignore(path) for path in paths], len(paths))
+
+    if any(suite.selected(f"module/compare_manifests/{mode}") for mode in ('tree', 'full')):
+        old = synthetic_manifest(max(100, int(200_000 * scale)), seed=seed)
+        new = copy.deepcopy(old)
+        for path in random.Random(seed).sample(sorted(new['files']), 10):
+            new['files'][path]['content_hash'] = hashlib.sha256(path.encode()).hexdigest()
+            new['directories'][path.rpartition('/')[0]]['root_hash'] = hashlib.sha256(path.encode() + b'/').hexdigest()
+        new['root_hash'] = hashlib.sha256(b'changed').hexdigest()
+        suite.measure("module/compare_manifests/tree", lambda: compare_manifests(old, new), len(old['files']))
+        suite.measure("module/compare_manifests/full", lambda: compare_manifests(old, new, full=True), len(old['files']))
+
+
+def bench_startup(suite: Suite, workdir: Path):
+    if not any(suite.selected(f"startup/{step}") for step in ('import', 'verify')):
+        return
+    print("startup:", flush=True)
+    # Fresh interpreters are noisier than in-process timings: take more runs
+    repeat = max(5, 3 * suite.repeat)
+    if suite.selected("startup/import"):
+        times = import_times("merklewatch.cli", repeat)
+        suite.record("startup/import", times["merklewatch.cli"])
+        for module in HEAVY_MODULES:
+            if module in times:
+                print(f"Warning: {module} is imported at startup")
+    if suite.selected("startup/verify"):
+        suite.record("startup/verify", verify_startup(workdir, repeat))
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'merklewatch': merklewatch.__version__,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> int:
+    """Print each timing against the baseline; return the number of regressions."""
+    for key in ('scale', 'seed', 'generator_version'):
+        if results['settings'][key] != baseline['settings'].get(key):
+            raise SystemExit(f"Baseline was recorded with {key}={baseline['settings'].get(key)}, this run used {results['settings'][key]}")
+    for shape, tree in results['trees'].items():
+        expected = baseline.get('trees', {}).get(shape)
+        if expected and expected['root_hash'] != tree['root_hash']:
+            print(f"Warning: the {shape} tree differs from the baseline's (root {tree['root_hash'][:12]} vs {expected['root_hash'][:12]})")
+    if baseline['environment'].get('platform') != results['environment']['platform']:
+        print(f"Warning: baseline recorded on {baseline['environment'].get('platform')}")
+
+    regressions = 0
+    print(f"\n{'benchmark':<46} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in results['results'].items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            print(f"{name:<46} {'-':>10} {result['seconds']:>10.4f} {'new':>8}")
+            continue
+        change = result['seconds'] / previous['seconds'] - 1 if previous['seconds'] else 0.0
+        status = ''
+        if change > threshold and result['seconds'] - previous['seconds'] > MIN_DELTA:
+            status = '  REGRESSION'
+            regressions += 1
+        print(f"{name:<46} {previous['seconds']:>10.4f} {result['seconds']:>10.4f} {100 * change:>+7.1f}%{status}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for every tree and input size")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generated trees and samples")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    parser.add_argument("--shapes", nargs="+", choices=list(TREE_SHAPES), default=list(TREE_SHAPES), help="Tree shapes to run")
+    parser.add_argument("--only", nargs="+", help="Run only benchmarks matching these globs, e.g. 'e2e/*/snapshot' 'module/*'")
+    parser.add_argument("--workdir", type=Path, help="Directory to generate trees in and reuse across runs")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON to this path")
+    parser.add_argument("--baseline", type=Path, help="Compare with the results JSON of an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Slowdown (fraction) counted as a regression")
+    parser.add_argument("--startup-budget", type=float, default=DEFAULT_BUDGET * 1000, help="Allowed startup/verify wall time in milliseconds")
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    suite = Suite(args.repeat, args.only)
+
+    with tempfile.TemporaryDirectory(prefix="mw-bench-") as tmp:
+        workdir = args.workdir or Path(tmp) / "trees"
+        output_dir = Path(tmp) / "manifests"
+        output_dir.mkdir()
+        trees = bench_trees(suite, args.shapes, workdir, output_dir, args.scale, args.seed)
+        bench_modules(suite, workdir, args.scale, args.seed)
+        bench_startup(suite, workdir)
+
+    results = {
+        'schema': SCHEMA_VERSION,
+        'environment': environment(),
+        'settings': {'scale': args.scale, 'seed': args.seed, 'repeat': args.repeat, 'generator_version': GENERATOR_VERSION},
+        'trees': trees,
+        'results': suite.results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nResults saved to {args.output}")
+
+    failed = False
+    startup = suite.results.get('startup/verify')
+    if startup is not None and startup['seconds'] * 1000 > args.startup_budget:
+        print(f"\nstartup/verify took {startup['seconds'] * 1000:.1f} ms, over the {args.startup_budget:.0f} ms budget")
+        failed = True
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{regressions} benchmark(s) slower than the baseline by more than {100 * args.threshold:.0f}%")
+            failed = True
+        else:
+            print("\nNo regressions.")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ from .hashing import (
     compute_directory_hash,
 )
 from .merkle import compute_merkle_root
+from .tree import MerkleTree
 from .filesystem import scan_directory
 from .manifest import create_manifest_structure, save_manifest
 
@@ -22,6 +23,7 @@ __all__ = [
     "compute_internal_hash",
     "compute_directory_hash",
     "compute_merkle_root",
+    "MerkleTree",
     "scan_directory",
     "create_manifest_structure",
     "save_manifest",
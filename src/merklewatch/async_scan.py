@@ -0,0 +1,182 @@
+"""
+Latency-hiding directory scans for network and FUSE filesystems.
+
+On NFS, SMB or FUSE mounts every scandir, lstat and open is a round trip,
+so a scan is bound by per-call latency rather than bandwidth or CPU. The
+regular walk lists one directory at a time; here an asyncio event loop
+keeps the listings (each with the lstat of its files) of up to
+`concurrency` of the directories the walk will visit next in flight on one
+thread pool, and up to `concurrency` file reads on another.
+
+The walk itself visits directories in the same sorted depth-first order as
+the regular walk and fills the same `_Directory` structure, queueing
+finished subtrees and assembling them in post-order once more than
+`max_outstanding` files await assembly. Roots and manifest entries, and
+the order in which a streaming ManifestWriter receives them, are identical
+to `scan_directory()` with any `jobs`, and memory stays bounded by the
+depth of the tree rather than its size.
+"""
+import asyncio
+import os
+import typer
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from .filesystem import _Directory, _Scanner
+
+DEFAULT_CONCURRENCY = 64
+
+# A listed child: (name, relative_path, is_dir, lstat result or None for
+# directories and files whose lstat failed)
+_Entry = Tuple[str, str, bool, Optional[os.stat_result]]
+
+
+class _AsyncScanner(_Scanner):
+    """
+    A _Scanner whose discovery runs on an asyncio event loop.
+
+    Listings run on their own thread pool so they never queue behind file
+    reads; files are hashed on `self.executor` as in a parallel scan.
+    Baseline, hash cache and fail-fast checks behave as in the regular walk
+    and run on the event loop thread.
+    """
+
+    def __init__(self, *args, concurrency: int = DEFAULT_CONCURRENCY, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.concurrency = max(1, concurrency)
+        self.max_outstanding = 256 * self.concurrency
+        self.prefetch = 4 * self.concurrency
+        self._list_executor: Optional[ThreadPoolExecutor] = None
+
+    def scan(self, current_path: Path) -> str:
+        relative_path = current_path.relative_to(self.root_path).as_posix()
+        if relative_path == '.':
+            relative_path = ''
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='merklewatch-list') as list_executor, \
+                ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='merklewatch-read') as executor:
+            self._list_executor = list_executor
+            self.executor = executor
+            try:
+                directory = asyncio.run(self._discover(os.fspath(current_path), relative_path))
+                self._flush()
+                root_hash = self._assemble(directory)
+                self._check_failure()
+                return root_hash
+            except BaseException:
+                # Abandon queued hashes (a fail-fast mismatch or an interrupt)
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+            finally:
+                self._list_executor = None
+                self.executor = None
+
+    async def _discover(self, current_path: str, relative_dir: str) -> _Directory:
+        """
+        Walk the tree below current_path in the regular walk's order. While
+        fewer than `max_outstanding` files await assembly, the next
+        `prefetch` known directories are listed ahead of the walk, and their
+        files submitted for hashing, as soon as a listing thread is free.
+        """
+        loop = asyncio.get_running_loop()
+        loads: Dict[str, asyncio.Task] = {}
+        # Known directories not visited yet, the next one to visit last
+        upcoming: List[Tuple[_Directory, str]] = []
+
+        def fill(directory: _Directory, path: str, entries: Optional[List[_Entry]]) -> List[Tuple[_Directory, str]]:
+            """Fill a listed directory in sorted order, submitting its files; returns its subdirectories."""
+            subdirectories: List[Tuple[_Directory, str]] = []
+            if entries is None or self._failure is not None:
+                return subdirectories
+            try:
+                if self.fail_fast is not None:
+                    self.fail_fast.check_listing(directory.relative_path, [(relative_path, is_dir) for _, relative_path, is_dir, _ in entries])
+                for name, relative_path, is_dir, stat in entries:
+                    if is_dir:
+                        subdirectory = _Directory(relative_path, self.algorithm)
+                        directory.fingerprint.add_directory(name, subdirectory.fingerprint)
+                        directory.children.append(subdirectory)
+                        subdirectories.append((subdirectory, os.path.join(path, name)))
+                    elif stat is not None:
+                        directory.fingerprint.add_file(name, stat)
+                        future, store = self._submit_hash(os.path.join(path, name), relative_path, stat)
+                        directory.children.append((relative_path, stat, future, store))
+                        self._outstanding += 1
+            except Exception as e:
+                # May be a directory the walk has not reached: re-raised when it does
+                if self._failure is None:
+                    self._failure = e
+            return subdirectories
+
+        async def load(directory: _Directory, path: str) -> Tuple[Optional[List[_Entry]], Optional[List[Tuple[_Directory, str]]]]:
+            """List a directory, and fill it unless too many files already await assembly."""
+            entries = await loop.run_in_executor(self._list_executor, self._list, path, directory.relative_path)
+            if self._outstanding > self.max_outstanding:
+                return entries, None  # filled when the walk reaches it
+            return entries, fill(directory, path, entries)
+
+        def prefetch():
+            if self._outstanding > self.max_outstanding:
+                return  # resumes once the walk has assembled enough
+            for directory, path in upcoming[-self.prefetch:]:
+                if path not in loads:
+                    loads[path] = loop.create_task(load(directory, path))
+
+        async def visit(directory: _Directory, path: str):
+            task = loads.pop(path, None)
+            entries, subdirectories = await (task if task is not None else load(directory, path))
+            if subdirectories is None:
+                subdirectories = fill(directory, path, entries)
+            self._check_failure()
+
+            upcoming.extend(reversed(subdirectories))
+            prefetch()
+            for subdirectory, subpath in subdirectories:
+                upcoming.pop()
+                prefetch()
+                await visit(subdirectory, subpath)
+                self._pending.append(subdirectory)
+                if self._outstanding > self.max_outstanding:
+                    self._flush()
+
+        root = _Directory(relative_dir, self.algorithm)
+        await visit(root, current_path)
+        return root
+
+    def _list(self, current_path: str, relative_dir: str) -> Optional[List[_Entry]]:
+        """
+        List one directory in sorted order and lstat its files, on a worker
+        thread. Skips ignored entries and symlinks with the same warnings as
+        the regular walk; returns None if the directory cannot be read.
+        """
+        prefix = relative_dir + '/' if relative_dir else ''
+        try:
+            entries = self._list_entries(current_path, relative_dir)
+        except PermissionError:
+            typer.echo(f"Warning: Permission denied accessing {current_path}", err=True)
+            return None
+        except OSError as e:
+            typer.echo(f"Warning: Error accessing {current_path}: {e}", err=True)
+            return None
+
+        listing: List[_Entry] = []
+        for entry in entries:
+            relative_path = prefix + entry.name
+            if self.ignore_rules and self.ignore_rules.should_ignore_relative(relative_path):
+                continue
+            try:
+                if entry.is_symlink():
+                    typer.echo(f"Warning: Skipping symlink {relative_path}", err=True)
+                    continue
+                if entry.is_file(follow_symlinks=False):
+                    try:
+                        listing.append((entry.name, relative_path, False, self._stat(entry, relative_path)))
+                    except OSError as e:
+                        typer.echo(f"Warning: Error processing {relative_path}: {e}", err=True)
+                        # Still part of the listing a fail-fast check compares
+                        listing.append((entry.name, relative_path, False, None))
+                elif entry.is_dir(follow_symlinks=False):
+                    listing.append((entry.name, relative_path, True, None))
+            except OSError as e:
+                typer.echo(f"Warning: Error processing {relative_path}: {e}", err=True)
+        return listing
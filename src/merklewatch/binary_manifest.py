@@ -0,0 +1,347 @@
+"""
+Compact binary manifest format for MerkleWatch.
+
+Layout (little-endian):
+
+    header      32 bytes   magic, version, digest size, table sizes
+    metadata    JSON       top-level manifest fields (root_hash, timestamps...)
+    file table  fixed-width records sorted by path
+    dir table   fixed-width records sorted by path
+    path pool   UTF-8 path bytes referenced by the tables
+
+Digests are stored as raw bytes and sizes/times as packed integers and
+doubles, so a file entry costs a fixed 56 bytes plus two digests plus its
+path. Because the tables are sorted and fixed-width, a manifest opened via
+`mmap` can binary-search a single path without parsing anything else.
+Compressed binary manifests cannot be mapped and are decompressed into
+memory instead.
+"""
+import json
+import mmap
+import math
+import struct
+from collections.abc import ItemsView, Mapping, ValuesView
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Union
+from .compress import detect_codec, codec_for_path, open_compressed
+
+MAGIC = b'MWBM'
+FORMAT_VERSION = 1
+
+# magic, version, digest_size, file_count, dir_count, metadata_len, reserved
+_HEADER = struct.Struct('<4sHHQQII')
+
+# path_offset, path_len, flags, size, mtime, ctime, inode, dev (+ content_hash, leaf_hash)
+_FILE_FIELDS = struct.Struct('<QIIQddQQ')
+
+# path_offset, path_len, flags (+ root_hash, node_hash, fingerprint)
+_DIR_FIELDS = struct.Struct('<QII')
+
+# File record flags
+_HAS_CTIME = 0x1
+_HAS_INODE = 0x2
+_CHUNKED = 0x4  # content_hash is a chunk tree root; the size is in the metadata
+
+# Directory record flags
+_HAS_FINGERPRINT = 0x1
+
+
+def _encode_path(path: str) -> bytes:
+    return path.encode('utf-8', 'surrogateescape')
+
+
+def _decode_path(data: bytes) -> str:
+    return data.decode('utf-8', 'surrogateescape')
+
+
+def _pad8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def is_binary_manifest(manifest_path: Path, codec: Optional[str] = None) -> bool:
+    """Check the magic bytes of a (possibly compressed) file."""
+    with open_compressed(manifest_path, 'rb', codec) as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def save_binary_manifest(manifest: Dict[str, Any], output_path: Path, compression_level: Optional[int] = None):
+    """
+    Save a manifest dictionary in the binary format.
+
+    The output is compressed when `output_path` has a compression extension.
+    """
+    files = manifest.get('files', {})
+    directories = manifest.get('directories', {})
+    metadata = {k: v for k, v in manifest.items() if k not in ('files', 'directories')}
+    digest_size = len(bytes.fromhex(manifest['root_hash'])) if manifest.get('root_hash') else 32
+    chunk_size = manifest.get('chunk_size')
+
+    meta_bytes = json.dumps(metadata, sort_keys=True).encode('utf-8')
+    file_record_size = _FILE_FIELDS.size + 2 * digest_size
+    dir_record_size = _DIR_FIELDS.size + 3 * digest_size
+
+    file_items = sorted((_encode_path(p), e) for p, e in files.items())
+    dir_items = sorted((_encode_path(p), e) for p, e in directories.items())
+
+    pool = bytearray()
+    file_table = bytearray()
+    for encoded, entry in file_items:
+        flags = 0
+        if entry.get('ctime') is not None:
+            flags |= _HAS_CTIME
+        if entry.get('inode') is not None and entry.get('dev') is not None:
+            flags |= _HAS_INODE
+        if entry.get('chunk_size') is not None:
+            if entry['chunk_size'] != chunk_size:
+                raise ValueError(f"Chunk size of {_decode_path(encoded)} differs from the manifest's chunk_size")
+            flags |= _CHUNKED
+        file_table += _FILE_FIELDS.pack(
+            len(pool), len(encoded), flags,
+            entry['size'], entry['mtime'],
+            entry['ctime'] if flags & _HAS_CTIME else math.nan,
+            entry['inode'] if flags & _HAS_INODE else 0,
+            entry['dev'] if flags & _HAS_INODE else 0,
+        )
+        file_table += bytes.fromhex(entry['content_hash'])
+        file_table += bytes.fromhex(entry['leaf_hash'])
+        pool += encoded
+
+    dir_table = bytearray()
+    empty_digest = bytes(digest_size)
+    for encoded, entry in dir_items:
+        flags = _HAS_FINGERPRINT if entry.get('fingerprint') else 0
+        dir_table += _DIR_FIELDS.pack(len(pool), len(encoded), flags)
+        dir_table += bytes.fromhex(entry['root_hash'])
+        dir_table += bytes.fromhex(entry['node_hash'])
+        dir_table += bytes.fromhex(entry['fingerprint']) if flags else empty_digest
+        pool += encoded
+
+    if len(file_table) != file_record_size * len(file_items) or len(dir_table) != dir_record_size * len(dir_items):
+        raise ValueError(f"Corrupt binary manifest {output_path}: entry hashes are not all {digest_size} bytes like the root hash")
+
+    with open_compressed(output_path, 'wb', codec_for_path(output_path), compression_level) as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, digest_size, len(file_items), len(dir_items), len(meta_bytes), 0))
+        f.write(meta_bytes.ljust(_pad8(len(meta_bytes)), b'\x00'))
+        f.write(file_table)
+        f.write(dir_table)
+        f.write(pool)
+
+
+class _ItemsView(ItemsView):
+    def __iter__(self):
+        return self._mapping.iter_items()
+
+
+class _ValuesView(ValuesView):
+    def __iter__(self):
+        return (entry for _, entry in self._mapping.iter_items())
+
+
+class _RecordTable(Mapping):
+    """
+    Read-only mapping over a sorted, fixed-width record table in an mmap.
+
+    Lookups binary-search the table, decoding only the records they touch.
+    """
+
+    def __init__(self, buf: Union[mmap.mmap, bytes], offset: int, count: int, record_size: int, pool_offset: int, decode: Callable[[memoryview], Dict[str, Any]]):
+        self._buf = buf
+        self._view = memoryview(buf)
+        self._offset = offset
+        self._count = count
+        self._record_size = record_size
+        self._pool_offset = pool_offset
+        self._decode = decode
+
+    def _record(self, index: int) -> memoryview:
+        start = self._offset + index * self._record_size
+        return self._view[start:start + self._record_size]
+
+    def _path_bytes(self, record: memoryview) -> bytes:
+        path_offset, path_len = struct.unpack_from('<QI', record)
+        start = self._pool_offset + path_offset
+        return self._buf[start:start + path_len]
+
+    def _find(self, key: str) -> Optional[memoryview]:
+        target = _encode_path(key)
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record = self._record(mid)
+            path = self._path_bytes(record)
+            if path < target:
+                lo = mid + 1
+            elif path > target:
+                hi = mid
+            else:
+                return record
+        return None
+
+    def _lower_bound(self, target: bytes) -> int:
+        """Index of the first record whose path is >= target."""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._path_bytes(self._record(mid)) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def children(self, directory: str) -> Iterator[str]:
+        """
+        Paths directly inside `directory` ('' for the root).
+
+        A directory's descendants are one contiguous range of the sorted
+        table, and each nested subdirectory's range is skipped with a binary
+        search, so this costs O((children + subdirectories) * log n).
+        """
+        prefix = _encode_path(directory) + b'/' if directory else b''
+        index = self._lower_bound(prefix)
+        while index < self._count:
+            path = self._path_bytes(self._record(index))
+            if not path.startswith(prefix):
+                break
+            slash = path.find(b'/', len(prefix))
+            if slash < 0:
+                yield _decode_path(path)
+                index += 1
+            else:
+                # '0' sorts right after '/': jump past everything below this child
+                index = self._lower_bound(path[:slash] + b'0')
+
+    def descendants(self, directory: str) -> Iterator[str]:
+        """All paths below `directory`, in sorted order."""
+        prefix = _encode_path(directory) + b'/' if directory else b''
+        for index in range(self._lower_bound(prefix), self._count):
+            path = self._path_bytes(self._record(index))
+            if not path.startswith(prefix):
+                break
+            yield _decode_path(path)
+
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        record = self._find(key) if isinstance(key, str) else None
+        if record is None:
+            raise KeyError(key)
+        return self._decode(record)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._find(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self._count):
+            yield _decode_path(self._path_bytes(self._record(i)))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def items(self) -> ItemsView:
+        return _ItemsView(self)
+
+    def values(self) -> ValuesView:
+        return _ValuesView(self)
+
+    def iter_items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Linear scan of (path, entry) pairs in sorted order."""
+        for i in range(self._count):
+            record = self._record(i)
+            yield _decode_path(self._path_bytes(record)), self._decode(record)
+
+
+class BinaryManifest:
+    """
+    A binary manifest opened via mmap.
+
+    `files` and `directories` are read-only mappings that binary-search the
+    sorted tables on access, so looking up one path costs O(log n) record
+    reads rather than a full parse.
+    """
+
+    def __init__(self, buf: Union[mmap.mmap, bytes], source: str = "<bytes>"):
+        self._buf = buf
+
+        magic, version, digest_size, file_count, dir_count, meta_len, _ = _HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a binary MerkleWatch manifest: {source}")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported binary manifest version {version}: {source}")
+
+        meta_start = _HEADER.size
+        self.metadata: Dict[str, Any] = json.loads(self._buf[meta_start:meta_start + meta_len])
+        self.digest_size = digest_size
+
+        file_offset = meta_start + _pad8(meta_len)
+        file_record_size = _FILE_FIELDS.size + 2 * digest_size
+        dir_offset = file_offset + file_count * file_record_size
+        dir_record_size = _DIR_FIELDS.size + 3 * digest_size
+        pool_offset = dir_offset + dir_count * dir_record_size
+        if pool_offset > len(self._buf):
+            raise ValueError(f"Corrupt binary manifest (truncated record tables): {source}")
+
+        self.files = _RecordTable(self._buf, file_offset, file_count, file_record_size, pool_offset, self._decode_file)
+        self.directories = _RecordTable(self._buf, dir_offset, dir_count, dir_record_size, pool_offset, self._decode_directory)
+
+    @classmethod
+    def open(cls, manifest_path: Path) -> 'BinaryManifest':
+        """Map a manifest file, decompressing it into memory if needed."""
+        codec = detect_codec(manifest_path)
+        if codec is not None:
+            with open_compressed(manifest_path, 'rb', codec) as f:
+                return cls(f.read(), str(manifest_path))
+
+        with open(manifest_path, 'rb') as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), str(manifest_path))
+
+    def _decode_file(self, record: memoryview) -> Dict[str, Any]:
+        _, _, flags, size, mtime, ctime, inode, dev = _FILE_FIELDS.unpack_from(record)
+        digests = _FILE_FIELDS.size
+        n = self.digest_size
+        entry: Dict[str, Any] = {'size': size, 'mtime': mtime}
+        if flags & _HAS_CTIME:
+            entry['ctime'] = ctime
+        if flags & _HAS_INODE:
+            entry['inode'] = inode
+            entry['dev'] = dev
+        entry['content_hash'] = record[digests:digests + n].hex()
+        entry['leaf_hash'] = record[digests + n:digests + 2 * n].hex()
+        if flags & _CHUNKED:
+            entry['chunk_size'] = self.metadata['chunk_size']
+        return entry
+
+    def _decode_directory(self, record: memoryview) -> Dict[str, Any]:
+        _, _, flags = _DIR_FIELDS.unpack_from(record)
+        digests = _DIR_FIELDS.size
+        n = self.digest_size
+        entry: Dict[str, Any] = {
+            'root_hash': record[digests:digests + n].hex(),
+            'node_hash': record[digests + n:digests + 2 * n].hex(),
+        }
+        if flags & _HAS_FINGERPRINT:
+            entry['fingerprint'] = record[digests + 2 * n:digests + 3 * n].hex()
+        return entry
+
+    def as_manifest(self) -> Dict[str, Any]:
+        """
+        The manifest dictionary structure, with lazy mmap-backed `files` and
+        `directories` mappings.
+        """
+        manifest = dict(self.metadata)
+        manifest['files'] = self.files
+        manifest['directories'] = self.directories
+        return manifest
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Fully decode into plain dictionaries (e.g. for JSON conversion)."""
+        manifest = dict(self.metadata)
+        manifest['files'] = dict(self.files.iter_items())
+        manifest['directories'] = dict(self.directories.iter_items())
+        return manifest
+
+
+def load_binary_manifest(manifest_path: Path) -> Dict[str, Any]:
+    """
+    Open a binary manifest via mmap and return the manifest structure.
+
+    The returned `files` and `directories` are lazy read-only mappings.
+    """
+    return BinaryManifest.open(manifest_path).as_manifest()
@@ -0,0 +1,184 @@
+"""
+Persistent local hash cache for MerkleWatch.
+
+Maps a file's identity and stat signature to its content hash, so repeated
+scans of the same files -- across manifests, directories and runs -- skip
+re-hashing them. Unlike a baseline manifest, the cache is keyed by
+(device, inode) rather than path and is shared by every scan that enables it.
+
+The cache is a SQLite database in WAL mode under ~/.cache/merklewatch (or
+$XDG_CACHE_HOME/merklewatch), so several merklewatch processes can read and
+write it concurrently. A cached hash is only used when the file's size,
+mtime_ns and ctime_ns are all unchanged; ctime cannot be set from user
+space, so rewriting a file and restoring its mtime still invalidates it.
+The least recently used entries are evicted once the cache holds more than
+`max_entries` files.
+"""
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from .defaults import DEFAULT_MAX_ENTRIES
+
+# Writes are batched into one transaction per this many files
+_BATCH_SIZE = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    dev INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    algorithm TEXT NOT NULL,
+    chunk_size INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    ctime_ns INTEGER NOT NULL,
+    content_hash BLOB NOT NULL,
+    last_used INTEGER NOT NULL,
+    UNIQUE (dev, inode, algorithm, chunk_size)
+);
+CREATE INDEX IF NOT EXISTS hashes_last_used ON hashes (last_used);
+"""
+
+
+def default_cache_path() -> Path:
+    """Location of the shared cache database."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return Path(base) / 'merklewatch' / 'hashes.sqlite'
+
+
+class HashCache:
+    """
+    On-disk cache of content hashes keyed by (dev, inode) and stat signature.
+
+    Lookups are immediate; recorded hashes and LRU touches are buffered and
+    written in batches, so `close()` (or use as a context manager) must be
+    called to persist the tail of a run. `hits` and `misses` count lookups.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path) if path is not None else default_cache_path()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._pending: List[Tuple[Any, ...]] = []
+        self._now = time.time_ns()
+
+        import sqlite3  # only commands using the cache pay for it
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=30.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def __enter__(self) -> 'HashCache':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def lookup(self, stat: os.stat_result, algorithm: str, chunk_size: int = 0) -> Optional[str]:
+        """
+        Return the cached content hash for a file if its stat signature is unchanged.
+
+        Args:
+            stat: Current stat result of the file
+            algorithm: Hash algorithm of the scan
+            chunk_size: Chunk size if the file is hashed as a chunk tree, else 0
+        """
+        row = self._db.execute(
+            "SELECT size, mtime_ns, ctime_ns, content_hash FROM hashes "
+            "WHERE dev = ? AND inode = ? AND algorithm = ? AND chunk_size = ?",
+            (stat.st_dev, stat.st_ino, algorithm, chunk_size),
+        ).fetchone()
+
+        if row is None or row[:3] != (stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return row[3].hex()
+
+    def record(self, stat: os.stat_result, algorithm: str, chunk_size: int, content_hash: str):
+        """Store (or refresh the LRU position of) a file's content hash."""
+        self._pending.append((
+            stat.st_dev, stat.st_ino, algorithm, chunk_size,
+            stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns,
+            bytes.fromhex(content_hash), self._now,
+        ))
+        if len(self._pending) >= _BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Write buffered entries in one transaction."""
+        if not self._pending:
+            return
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO hashes "
+                "(dev, inode, algorithm, chunk_size, size, mtime_ns, ctime_ns, content_hash, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                self._pending,
+            )
+        self._pending = []
+
+    def prune(self, max_entries: Optional[int] = None) -> int:
+        """
+        Evict least recently used entries beyond `max_entries`.
+
+        Returns:
+            The number of entries removed
+        """
+        self.flush()
+        limit = self.max_entries if max_entries is None else max_entries
+        with self._db:
+            cursor = self._db.execute(
+                "DELETE FROM hashes WHERE rowid IN ("
+                "SELECT rowid FROM hashes ORDER BY last_used ASC "
+                "LIMIT max(0, (SELECT count(*) FROM hashes) - ?))",
+                (limit,),
+            )
+        return cursor.rowcount
+
+    def clear(self) -> int:
+        """Remove every entry, returning how many there were."""
+        self._pending = []
+        with self._db:
+            cursor = self._db.execute("DELETE FROM hashes")
+        self._db.execute("VACUUM")
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry counts per algorithm, on-disk size and usage range."""
+        self.flush()
+        total, oldest, newest = self._db.execute(
+            "SELECT count(*), min(last_used), max(last_used) FROM hashes"
+        ).fetchone()
+        by_algorithm = dict(self._db.execute(
+            "SELECT algorithm, count(*) FROM hashes GROUP BY algorithm ORDER BY algorithm"
+        ).fetchall())
+        disk_bytes = sum(
+            os.path.getsize(f"{self.path}{suffix}")
+            for suffix in ('', '-wal', '-shm')
+            if os.path.exists(f"{self.path}{suffix}")
+        )
+        return {
+            'path': str(self.path),
+            'entries': total,
+            'max_entries': self.max_entries,
+            'by_algorithm': by_algorithm,
+            'disk_bytes': disk_bytes,
+            'oldest_use': oldest / 1e9 if oldest is not None else None,
+            'newest_use': newest / 1e9 if newest is not None else None,
+        }
+
+    def close(self):
+        """Persist buffered entries, enforce the size bound and close the database."""
+        if self._db is None:
+            return
+        try:
+            self.flush()
+            self.prune()
+        finally:
+            self._db.close()
+            self._db = None
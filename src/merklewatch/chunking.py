@@ -0,0 +1,160 @@
+"""
+Chunked content hashing for very large files.
+
+With a chunk size set, a file larger than one chunk is split into
+fixed-size chunks. Each chunk is read with positional reads (`os.preadv`
+into a per-thread buffer, or `os.pread`), hashed and wrapped as a leaf:
+
+    chunk_leaf    = H(0x00 || H(chunk_bytes))
+    content_hash  = Merkle root of the chunk leaves (same tree as directories)
+
+Positional reads share one file descriptor, so the chunks of a single file
+can be hashed by every worker of a thread pool at once. The file's
+manifest entry records `chunk_size` to mark its content hash as a chunk
+tree root. Files no larger than one chunk keep their plain content hash.
+"""
+import os
+import threading
+from concurrent.futures import CancelledError, Executor, Future
+from pathlib import Path
+from typing import List, Optional
+from .hashing import HashAlgorithm, get_algorithm, _buffer, _HAS_FADVISE, DEFAULT_ALGORITHM
+from .merkle import compute_merkle_root_digest
+
+# Largest single read while hashing a chunk
+_READ_SIZE = 1024 * 1024
+
+_HAS_PREADV = hasattr(os, 'preadv')
+
+
+def chunk_count(size: int, chunk_size: int) -> int:
+    """Number of chunks a file of `size` bytes is split into."""
+    return max(1, -(-size // chunk_size))
+
+
+def hash_chunk(fd: int, offset: int, length: int, algorithm: HashAlgorithm) -> bytes:
+    """
+    Hash `length` bytes of an open file starting at `offset` and wrap the
+    digest as a chunk leaf. Returns the raw leaf digest.
+    """
+    hasher = algorithm.new()
+    end = offset + length
+    buf = _buffer(min(length, _READ_SIZE)) if _HAS_PREADV else None
+
+    while offset < end:
+        want = min(_READ_SIZE, end - offset)
+        if buf is not None:
+            n = os.preadv(fd, [buf[:want]], offset)
+            data = buf[:n]
+        else:
+            data = os.pread(fd, want, offset)
+            n = len(data)
+        if n == 0:
+            # File shrank since it was stat'ed
+            break
+        hasher.update(data)
+        offset += n
+
+    return algorithm.leaf_digest(hasher.digest())
+
+
+def _chunk_ranges(size: int, chunk_size: int) -> List[tuple]:
+    return [(offset, min(chunk_size, size - offset)) for offset in range(0, max(size, 1), chunk_size)]
+
+
+def _drop_cache(fd: int, drop_cache: bool):
+    if drop_cache and _HAS_FADVISE:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def hash_file_chunked(filepath: Path, size: int, chunk_size: int, algorithm: str = DEFAULT_ALGORITHM, drop_cache: bool = False) -> str:
+    """
+    Compute a file's chunk tree root serially.
+
+    Args:
+        filepath: File to hash
+        size: File size in bytes (from the scan's stat)
+        chunk_size: Chunk size in bytes
+        algorithm: Registered hash algorithm name
+        drop_cache: Advise the kernel to drop the file's cached pages afterwards
+
+    Returns:
+        The chunk tree root (hex), used as the file's content hash
+    """
+    hash_algorithm = get_algorithm(algorithm)
+    fd = os.open(filepath, os.O_RDONLY)
+    try:
+        digests = bytearray()
+        for offset, length in _chunk_ranges(size, chunk_size):
+            digests += hash_chunk(fd, offset, length, hash_algorithm)
+        _drop_cache(fd, drop_cache)
+    finally:
+        os.close(fd)
+    return compute_merkle_root_digest(digests, algorithm).hex()
+
+
+def submit_file_chunked(executor: Executor, filepath: Path, size: int, chunk_size: int, algorithm: str = DEFAULT_ALGORITHM, drop_cache: bool = False) -> Future:
+    """
+    Hash a file's chunks in parallel on `executor`.
+
+    Every chunk is a separate task reading through one shared descriptor.
+    The returned future resolves to the same root as hash_file_chunked()
+    once all chunks are done (or to the first error), and the descriptor is
+    closed only after the last chunk finishes. The caller never blocks, so
+    this is safe to use with the pool that also hashes whole files.
+
+    Raises:
+        OSError: If the file cannot be opened
+        RuntimeError: If the executor is shut down; chunks already
+            submitted still close the descriptor when they finish
+    """
+    hash_algorithm = get_algorithm(algorithm)
+    digest_size = hash_algorithm.digest_size
+    ranges = _chunk_ranges(size, chunk_size)
+
+    fd = os.open(filepath, os.O_RDONLY)
+    digests = bytearray(len(ranges) * digest_size)
+    result: Future = Future()
+    lock = threading.Lock()
+    state = {'remaining': len(ranges), 'error': None}
+
+    def settle(count: int, error: Optional[BaseException]):
+        """Count `count` chunks as done; the last one closes the descriptor and resolves the result."""
+        with lock:
+            if error is not None and state['error'] is None:
+                state['error'] = error
+            state['remaining'] -= count
+            finished = state['remaining'] == 0
+
+        if finished:
+            try:
+                if state['error'] is None:
+                    _drop_cache(fd, drop_cache)
+            finally:
+                os.close(fd)
+            if state['error'] is not None:
+                result.set_exception(state['error'])
+            else:
+                result.set_result(compute_merkle_root_digest(digests, algorithm).hex())
+
+    def chunk_done(index: int, future: Future):
+        # Chunks are cancelled when a scan is aborted; the descriptor must still be closed
+        error = CancelledError() if future.cancelled() else future.exception()
+        if error is None:
+            start = index * digest_size
+            digests[start:start + digest_size] = future.result()
+        settle(1, error)
+
+    submitted = 0
+    try:
+        for index, (offset, length) in enumerate(ranges):
+            future = executor.submit(hash_chunk, fd, offset, length, hash_algorithm)
+            submitted += 1
+            future.add_done_callback(lambda f, index=index: chunk_done(index, f))
+    except BaseException as e:
+        # The executor refused a chunk (shut down on fail-fast or Ctrl+C): the
+        # chunks never submitted will not finish, so count them as failed here
+        settle(len(ranges) - submitted, e)
+        raise
+
+    return result
@@ -1,21 +1,109 @@
 import typer
-import questionary
-import os
+import json
+import time
+from contextlib import nullcontext
 from pathlib import Path
+from typing import Any, Optional
 from .filesystem import scan_directory
-from .manifest import create_manifest_structure, save_manifest
-from .verification import verify_directory, load_manifest, compare_manifests
-from .diff import display_verification_diff, display_full_diff
+from .manifest import create_manifest_structure, write_manifest, format_for_path, load_manifest, ManifestWriter, MANIFEST_FORMATS
+from .diff import display_verification_diff, display_full_diff, count_changes
 from .ignore import IgnoreRules
-from .common_ignores import COMMON_IGNORES, get_all_common_patterns
-import fnmatch
+from .hashing import FileHasher, HASH_STRATEGIES, DEFAULT_BUFFER_SIZE, DEFAULT_ALGORITHM, available_algorithms
+from .defaults import DEFAULT_MAX_ENTRIES, DEFAULT_DEBOUNCE, DEFAULT_MAX_DELAY, DEFAULT_POLL_INTERVAL, MIN_CHUNK_SIZE, DEFAULT_INTERVAL, DEFAULT_MAX_PATHS
 
 app = typer.Typer()
+cache_app = typer.Typer(help="Inspect and prune the persistent hash cache.")
+app.add_typer(cache_app, name="cache")
+
+def _load_baseline(baseline_path: Optional[Path], check_ctime: bool, check_inode: bool, paranoid: float) -> Optional[Any]:
+    """Build a Baseline from a manifest path, or None if no baseline was given."""
+    if baseline_path is None:
+        return None
+    from .incremental import Baseline
+    return Baseline(load_manifest(baseline_path), check_ctime=check_ctime, check_inode=check_inode, paranoid_ratio=paranoid)
+
+def _file_hasher(buffer_size: int, hash_strategy: str, drop_cache: bool, algorithm: str = DEFAULT_ALGORITHM, chunk_size: Optional[int] = None) -> FileHasher:
+    """Build the FileHasher for the hashing options shared by snapshot and verify."""
+    if hash_strategy not in HASH_STRATEGIES:
+        raise ValueError(f"Unknown hash strategy: {hash_strategy} (choose from {', '.join(HASH_STRATEGIES)})")
+    return FileHasher(buffer_size=buffer_size, strategy=hash_strategy, drop_cache=drop_cache, algorithm=algorithm, chunk_size=chunk_size)
+
+def _echo_baseline_stats(baseline: Optional[Any]):
+    if baseline is not None:
+        total = baseline.hits + baseline.misses
+        typer.echo(f"Reused {baseline.hits} of {total} file hashes and {baseline.directory_hits} subtree roots from baseline")
+
+def _open_cache(use_cache: bool, cache_path: Optional[Path]) -> Optional[Any]:
+    """Open the persistent hash cache if enabled by --cache or --cache-path."""
+    if not use_cache and cache_path is None:
+        return None
+    from .cache import HashCache
+    return HashCache(cache_path)
+
+def _echo_cache_stats(cache: Optional[Any]):
+    if cache is not None:
+        total = cache.hits + cache.misses
+        rate = 100.0 * cache.hits / total if total else 0.0
+        typer.echo(f"Hash cache: {cache.hits} of {total} lookups hit ({rate:.1f}% hit rate)")
+
+def _start_profile(report: bool, json_path: Optional[Path], dump_path: Optional[Path]) -> Optional[Any]:
+    """A started ScanProfile if any profiling option was given, else None."""
+    if not report and json_path is None and dump_path is None:
+        return None
+    from .profiling import ScanProfile
+    profile = ScanProfile()
+    profile.start()
+    return profile
+
+def _profiler_dump(dump_path: Optional[Path]):
+    """profiling.profiler_dump() into `dump_path` if --profile-dump was given, else a no-op context."""
+    if dump_path is None:
+        return nullcontext()
+    from .profiling import profiler_dump
+    return profiler_dump(dump_path)
+
+def _echo_profile(profile: Optional[Any], report: bool, json_path: Optional[Path]):
+    if profile is None:
+        return
+    profile.stop()
+    if report:
+        typer.echo(profile.format())
+    if json_path is not None:
+        profile.save(json_path)
+        typer.echo(f"Profile saved to: {json_path}")
+
+def _progress(bar: bool, json_lines: bool, interval: float) -> Optional[Any]:
+    """A ScanProgress if --progress or --progress-json was given, else None."""
+    if not bar and not json_lines:
+        return None
+    from .progress import ScanProgress
+    return ScanProgress(bar=bar, interval=interval if json_lines else None)
 
 @app.command()
 def snapshot(
     directory: Path = typer.Argument(..., help="The directory to snapshot", exists=True, file_okay=False, dir_okay=True, resolve_path=True),
-    out: Path = typer.Option(..., "--out", "-o", help="Output path for the manifest JSON file")
+    out: Path = typer.Option(..., "--out", "-o", help="Output path for the manifest JSON file"),
+    algorithm: str = typer.Option(DEFAULT_ALGORITHM, "--algorithm", "-a", help=f"Hash algorithm for file contents and tree nodes: {', '.join(available_algorithms())}"),
+    chunk_size: Optional[int] = typer.Option(None, "--chunk-size", min=MIN_CHUNK_SIZE, help="Hash files larger than this many bytes as a Merkle tree of chunks, read in parallel with --jobs"),
+    manifest_format: str = typer.Option(None, "--format", "-f", help="Manifest format: 'json', 'jsonl' (streams entries with bounded memory) or 'binary' (compact, mmap-able). Defaults from the extension: .jsonl, .mwb, else json. A trailing .gz, .xz or .zst compresses the manifest"),
+    compression_level: Optional[int] = typer.Option(None, "--compression-level", help="Level for compressed outputs (.gz, .xz, .zst); the codec's default when omitted"),
+    jobs: int = typer.Option(1, "--jobs", "-j", min=1, help="Number of worker threads used to hash files"),
+    io_concurrency: int = typer.Option(0, "--io-concurrency", min=0, help="For NFS/SMB/FUSE mounts: keep up to N directory listings and N file reads in flight (asyncio scheduler; replaces --jobs). 0 disables"),
+    baseline_path: Optional[Path] = typer.Option(None, "--baseline", help="Previous manifest whose hashes are reused for files with unchanged size/mtime", exists=True, dir_okay=False, resolve_path=True),
+    check_ctime: bool = typer.Option(False, "--check-ctime", help="With --baseline, also require an unchanged ctime"),
+    check_inode: bool = typer.Option(False, "--check-inode", help="With --baseline, also require an unchanged inode and device"),
+    paranoid: float = typer.Option(0.0, "--paranoid", min=0.0, max=1.0, help="With --baseline, fraction of unchanged files to re-hash anyway"),
+    buffer_size: int = typer.Option(DEFAULT_BUFFER_SIZE, "--buffer-size", min=4096, help="Largest read chunk in bytes when hashing files"),
+    hash_strategy: str = typer.Option("auto", "--hash-strategy", help="How files are read: 'readinto' (reused buffer), 'mmap', 'read', or 'auto' (readinto for small files, mmap for large)"),
+    drop_cache: bool = typer.Option(False, "--drop-cache", help="Advise the kernel to drop hashed files from the page cache (posix_fadvise)"),
+    use_cache: bool = typer.Option(False, "--cache", help="Reuse and record content hashes in the persistent hash cache (~/.cache/merklewatch)"),
+    cache_path: Optional[Path] = typer.Option(None, "--cache-path", help="Hash cache database to use instead of the default (implies --cache)", dir_okay=False, resolve_path=True),
+    profile_report: bool = typer.Option(False, "--profile", help="Print per-phase timings, syscall counts, throughput, the slowest directories and the largest files"),
+    profile_json: Optional[Path] = typer.Option(None, "--profile-json", help="Write the --profile report as JSON to this path", dir_okay=False, resolve_path=True),
+    profile_dump: Optional[Path] = typer.Option(None, "--profile-dump", help="Record the run with cProfile (.pstats) or, for an .html path, pyinstrument", dir_okay=False, resolve_path=True),
+    progress_bar: bool = typer.Option(False, "--progress", help="Count files and bytes first, then show a byte-weighted progress bar with throughput and ETA on stderr"),
+    progress_json: bool = typer.Option(False, "--progress-json", help="Count files and bytes first, then print a JSON progress line on stderr every --progress-interval seconds"),
+    progress_interval: float = typer.Option(DEFAULT_INTERVAL, "--progress-interval", min=0.1, help="Seconds between --progress-json lines")
 ):
     """
     Create a Merkle tree snapshot of a directory.
@@ -38,13 +126,41 @@ def snapshot(
             # output is not inside directory — nothing to do
             pass
         
-        root_hash = scan_directory(directory, directory, manifest_data, ignore_rules)
-        
-        manifest = create_manifest_structure(root_hash, manifest_data)
-        
-        save_manifest(manifest, out)
+        manifest_format = manifest_format or format_for_path(out)
+        if manifest_format not in MANIFEST_FORMATS:
+            raise ValueError(f"Unknown manifest format: {manifest_format}")
+
+        baseline = _load_baseline(baseline_path, check_ctime, check_inode, paranoid)
+        file_hasher = _file_hasher(buffer_size, hash_strategy, drop_cache, algorithm, chunk_size)
+        cache = _open_cache(use_cache, cache_path)
+        profile = _start_profile(profile_report, profile_json, profile_dump)
+        progress = _progress(progress_bar, progress_json, progress_interval)
+
+        try:
+            with _profiler_dump(profile_dump):
+                if manifest_format == 'jsonl':
+                    # Stream entries to disk as directories complete
+                    writer = ManifestWriter(out, compression_level=compression_level, algorithm=file_hasher.algorithm, chunk_size=chunk_size)
+                    try:
+                        root_hash = scan_directory(directory, directory, manifest_data, ignore_rules, jobs=jobs, baseline=baseline, writer=writer, file_hasher=file_hasher, cache=cache, io_concurrency=io_concurrency, profile=profile, progress=progress)
+                    except BaseException:
+                        writer.abort()
+                        raise
+                    writer.close(root_hash)
+                else:
+                    root_hash = scan_directory(directory, directory, manifest_data, ignore_rules, jobs=jobs, baseline=baseline, file_hasher=file_hasher, cache=cache, io_concurrency=io_concurrency, profile=profile, progress=progress)
+
+                    with profile.phase('manifest') if profile else nullcontext():
+                        manifest = create_manifest_structure(root_hash, manifest_data, file_hasher.algorithm, chunk_size)
+                        write_manifest(manifest, out, manifest_format, compression_level)
+        finally:
+            if cache is not None:
+                cache.close()
         
         typer.echo(f"Snapshot created successfully!")
+        _echo_baseline_stats(baseline)
+        _echo_cache_stats(cache)
+        _echo_profile(profile, profile_report, profile_json)
         typer.echo(f"Root Hash: {root_hash}")
         typer.echo(f"Manifest saved to: {out}")
         
@@ -55,15 +171,48 @@ def snapshot(
 @app.command()
 def verify(
     manifest_path: Path = typer.Argument(..., help="Path to the manifest file", exists=True, dir_okay=False, resolve_path=True),
-    directory: Path = typer.Argument(..., help="The directory to verify", exists=True, file_okay=False, dir_okay=True, resolve_path=True)
+    directory: Path = typer.Argument(..., help="The directory to verify", exists=True, file_okay=False, dir_okay=True, resolve_path=True),
+    jobs: int = typer.Option(1, "--jobs", "-j", min=1, help="Number of worker threads used to hash files"),
+    io_concurrency: int = typer.Option(0, "--io-concurrency", min=0, help="For NFS/SMB/FUSE mounts: keep up to N directory listings and N file reads in flight (asyncio scheduler; replaces --jobs). 0 disables"),
+    baseline_path: Optional[Path] = typer.Option(None, "--baseline", help="Previous manifest whose hashes are reused for files with unchanged size/mtime", exists=True, dir_okay=False, resolve_path=True),
+    check_ctime: bool = typer.Option(False, "--check-ctime", help="With --baseline, also require an unchanged ctime"),
+    check_inode: bool = typer.Option(False, "--check-inode", help="With --baseline, also require an unchanged inode and device"),
+    paranoid: float = typer.Option(0.0, "--paranoid", min=0.0, max=1.0, help="With --baseline, fraction of unchanged files to re-hash anyway"),
+    buffer_size: int = typer.Option(DEFAULT_BUFFER_SIZE, "--buffer-size", min=4096, help="Largest read chunk in bytes when hashing files"),
+    hash_strategy: str = typer.Option("auto", "--hash-strategy", help="How files are read: 'readinto' (reused buffer), 'mmap', 'read', or 'auto' (readinto for small files, mmap for large)"),
+    drop_cache: bool = typer.Option(False, "--drop-cache", help="Advise the kernel to drop hashed files from the page cache (posix_fadvise)"),
+    use_cache: bool = typer.Option(False, "--cache", help="Reuse and record content hashes in the persistent hash cache (~/.cache/merklewatch)"),
+    cache_path: Optional[Path] = typer.Option(None, "--cache-path", help="Hash cache database to use instead of the default (implies --cache)", dir_okay=False, resolve_path=True),
+    fail_fast: bool = typer.Option(False, "--fail-fast", help="Stop at the first missing, extra or modified file instead of scanning everything"),
+    quick: bool = typer.Option(False, "--quick", help="Compare paths and sizes before hashing; fail at once on a missing, extra or resized file"),
+    profile_report: bool = typer.Option(False, "--profile", help="Print per-phase timings, syscall counts, throughput, the slowest directories and the largest files"),
+    profile_json: Optional[Path] = typer.Option(None, "--profile-json", help="Write the --profile report as JSON to this path", dir_okay=False, resolve_path=True),
+    profile_dump: Optional[Path] = typer.Option(None, "--profile-dump", help="Record the run with cProfile (.pstats) or, for an .html path, pyinstrument", dir_okay=False, resolve_path=True),
+    progress_bar: bool = typer.Option(False, "--progress", help="Count files and bytes first, then show a byte-weighted progress bar with throughput and ETA on stderr"),
+    progress_json: bool = typer.Option(False, "--progress-json", help="Count files and bytes first, then print a JSON progress line on stderr every --progress-interval seconds"),
+    progress_interval: float = typer.Option(DEFAULT_INTERVAL, "--progress-interval", min=0.1, help="Seconds between --progress-json lines")
 ):
     """
     Verify a directory against a manifest.
     """
+    from .verification import verify_directory
     typer.echo(f"Verifying {directory} against {manifest_path}...")
     
     try:
-        success, expected, actual, diffs, old_files, new_files = verify_directory(manifest_path, directory)
+        baseline = _load_baseline(baseline_path, check_ctime, check_inode, paranoid)
+        file_hasher = _file_hasher(buffer_size, hash_strategy, drop_cache)
+        cache = _open_cache(use_cache, cache_path)
+        profile = _start_profile(profile_report, profile_json, profile_dump)
+        progress = _progress(progress_bar, progress_json, progress_interval)
+        try:
+            with _profiler_dump(profile_dump):
+                success, expected, actual, diffs, old_files, new_files = verify_directory(manifest_path, directory, jobs=jobs, baseline=baseline, file_hasher=file_hasher, cache=cache, fail_fast=fail_fast, quick=quick, io_concurrency=io_concurrency, profile=profile, progress=progress)
+        finally:
+            if cache is not None:
+                cache.close()
+        _echo_baseline_stats(baseline)
+        _echo_cache_stats(cache)
+        _echo_profile(profile, profile_report, profile_json)
         
         if success:
             typer.echo(typer.style("\n✓ Verification SUCCESSFUL!", fg=typer.colors.GREEN, bold=True))
@@ -72,6 +221,8 @@ def verify(
             display_verification_diff(expected, actual, diffs, old_files, new_files)
             raise typer.Exit(code=1)
             
+    except typer.Exit:
+        raise
     except Exception as e:
         typer.echo(f"Error during verification: {e}", err=True)
         raise typer.Exit(code=1)
@@ -79,11 +230,14 @@ def verify(
 @app.command()
 def diff(
     manifest1: Path = typer.Argument(..., help="Path to the first (old) manifest file", exists=True, dir_okay=False, resolve_path=True),
-    manifest2: Path = typer.Argument(..., help="Path to the second (new) manifest file", exists=True, dir_okay=False, resolve_path=True)
+    manifest2: Path = typer.Argument(..., help="Path to the second (new) manifest file", exists=True, dir_okay=False, resolve_path=True),
+    full: bool = typer.Option(False, "--full", help="Compare every file entry instead of skipping subtrees with identical root hashes and fingerprints"),
+    no_moves: bool = typer.Option(False, "--no-moves", help="Report renamed, moved and copied files as added and removed instead of pairing them by content hash (copies are matched against every old file)")
 ):
     """
     Compare two manifest files to see what changed between snapshots.
     """
+    from .verification import compare_manifests, detect_moves
     typer.echo(f"Comparing {manifest1} → {manifest2}...\n")
     
     try:
@@ -98,7 +252,9 @@ def diff(
         typer.echo(f"  Root Hash: {new_manifest.get('root_hash', 'N/A')}")
         
         # Compare manifests
-        diffs = compare_manifests(old_manifest, new_manifest)
+        diffs = compare_manifests(old_manifest, new_manifest, full=full)
+        if not no_moves:
+            diffs = detect_moves(diffs, old_manifest, new_manifest)
         
         # Display diff
         display_full_diff(
@@ -109,71 +265,255 @@ def diff(
         )
         
         # Exit with code 1 if there are differences (similar to diff command convention)
-        total_changes = len(diffs.get('added', [])) + len(diffs.get('removed', [])) + len(diffs.get('modified', []))
-        if total_changes > 0:
+        if count_changes(diffs) > 0:
             raise typer.Exit(code=1)
             
+    except typer.Exit:
+        raise
     except Exception as e:
         typer.echo(f"Error comparing manifests: {e}", err=True)
         raise typer.Exit(code=1)
 
+@app.command()
+def convert(
+    source: Path = typer.Argument(..., help="Manifest to convert", exists=True, dir_okay=False, resolve_path=True),
+    destination: Path = typer.Argument(..., help="Output path for the converted manifest"),
+    manifest_format: str = typer.Option(None, "--format", "-f", help="Target format: 'json', 'jsonl' or 'binary'. Defaults from the extension: .jsonl, .mwb, else json. A trailing .gz, .xz or .zst compresses the manifest"),
+    compression_level: Optional[int] = typer.Option(None, "--compression-level", help="Level for compressed outputs; the codec's default when omitted")
+):
+    """
+    Convert a manifest between the JSON, JSON Lines and binary formats,
+    optionally compressing or decompressing it.
+    """
+    try:
+        manifest_format = manifest_format or format_for_path(destination)
+        if manifest_format not in MANIFEST_FORMATS:
+            raise ValueError(f"Unknown manifest format: {manifest_format}")
+
+        manifest = load_manifest(source)
+        write_manifest(manifest, destination, manifest_format, compression_level)
+
+        typer.echo(f"Converted {source} → {destination} ({manifest_format})")
+        typer.echo(f"  {len(manifest['files'])} files, {len(manifest['directories'])} directories")
+        typer.echo(f"  Size: {source.stat().st_size} → {destination.stat().st_size} bytes")
+
+    except Exception as e:
+        typer.echo(f"Error converting manifest: {e}", err=True)
+        raise typer.Exit(code=1)
+
+@app.command()
+def prove(
+    manifest_path: Path = typer.Argument(..., help="Path to the manifest file", exists=True, dir_okay=False, resolve_path=True),
+    file_path: str = typer.Argument(..., help="Path of the file relative to the snapshot root"),
+    out: Optional[Path] = typer.Option(None, "--out", "-o", help="Write the proof to this file instead of stdout")
+):
+    """
+    Emit a Merkle inclusion proof for a single file of a snapshot.
+    """
+    from .proof import create_proof, save_proof
+
+    try:
+        manifest = load_manifest(manifest_path)
+        relative_path = Path(file_path).as_posix()
+        proof = create_proof(manifest, relative_path)
+
+        if out is None:
+            typer.echo(json.dumps(proof, indent=2, sort_keys=True))
+        else:
+            save_proof(proof, out)
+            hashes = sum(len(step['siblings']) for step in proof['steps'])
+            typer.echo(f"Proof for {relative_path}: {len(proof['steps'])} levels, {hashes} sibling hashes")
+            typer.echo(f"Root Hash: {proof['root_hash']}")
+            typer.echo(f"Proof saved to: {out}")
+
+    except Exception as e:
+        typer.echo(f"Error creating proof: {e}", err=True)
+        raise typer.Exit(code=1)
+
+@app.command("verify-file")
+def verify_file(
+    proof_path: Path = typer.Argument(..., help="Path to the proof file from 'prove'", exists=True, dir_okay=False, resolve_path=True),
+    file_path: Path = typer.Argument(..., help="The file to check", exists=True, file_okay=True, dir_okay=False, resolve_path=True),
+    root: Optional[str] = typer.Option(None, "--root", help="Trusted root hash; defaults to the root recorded in the proof")
+):
+    """
+    Verify a single file against a trusted root hash using an inclusion proof.
+    """
+    from .proof import load_proof, verify_file_proof
+
+    try:
+        proof = load_proof(proof_path)
+        if root is None:
+            typer.echo("Note: checking against the proof's own root hash; pass --root to use a trusted one", err=True)
+            root = proof['root_hash']
+
+        success, content_hash, computed_root = verify_file_proof(proof, file_path, root.lower())
+
+        if success:
+            typer.echo(typer.style(f"\n✓ {proof['path']} belongs to the snapshot", fg=typer.colors.GREEN, bold=True))
+            typer.echo(f"Root Hash matches: {computed_root}")
+        else:
+            typer.echo(typer.style(f"\n✗ {proof['path']} does NOT match the snapshot", fg=typer.colors.RED, bold=True))
+            if content_hash != proof['content_hash']:
+                typer.echo(f"  Content changed: expected {proof['content_hash']}, got {content_hash}")
+            typer.echo(f"  Expected Root: {root}")
+            typer.echo(f"  Computed Root: {computed_root}")
+            raise typer.Exit(code=1)
+
+    except typer.Exit:
+        raise
+    except Exception as e:
+        typer.echo(f"Error verifying file: {e}", err=True)
+        raise typer.Exit(code=1)
+
+_DRIFT_LABELS = {
+    'added': ("A", typer.colors.GREEN),
+    'removed': ("D", typer.colors.RED),
+    'modified': ("M", typer.colors.YELLOW),
+}
+
+def _echo_drift(changes):
+    for path, status in changes:
+        if status is None:
+            typer.echo(typer.style(f"  ✓ {path} matches the manifest again", fg=typer.colors.GREEN))
+        else:
+            label, color = _DRIFT_LABELS[status]
+            typer.echo(typer.style(f"  {label} {path}", fg=color))
+
+def _echo_watch_state(watcher: Any, latency: Optional[float] = None):
+    stamp = time.strftime('%H:%M:%S')
+    timing = f", updated in {latency * 1000:.0f} ms" if latency is not None else ""
+    if watcher.root_hash == watcher.expected_root:
+        typer.echo(typer.style(f"[{stamp}] ✓ Root matches manifest{timing}", fg=typer.colors.GREEN, bold=True))
+    else:
+        typer.echo(typer.style(f"[{stamp}] ✗ Drift: {len(watcher.drift)} files differ{timing}", fg=typer.colors.RED, bold=True))
+        typer.echo(f"  Current Root: {watcher.root_hash}")
+
+@app.command()
+def watch(
+    directory: Path = typer.Argument(..., help="The directory to monitor", exists=True, file_okay=False, dir_okay=True, resolve_path=True),
+    manifest_path: Path = typer.Option(..., "--manifest", "-m", help="Manifest the directory is expected to match", exists=True, dir_okay=False, resolve_path=True),
+    jobs: int = typer.Option(1, "--jobs", "-j", min=1, help="Number of worker threads used to hash files"),
+    debounce: float = typer.Option(DEFAULT_DEBOUNCE, "--debounce", min=0.0, help="Seconds without new events that end a batch of changes"),
+    max_delay: float = typer.Option(DEFAULT_MAX_DELAY, "--max-delay", min=0.0, help="Longest a batch may keep growing under a continuous write storm"),
+    poll: bool = typer.Option(False, "--poll", help="Detect changes by re-stat'ing the tree instead of inotify"),
+    interval: float = typer.Option(DEFAULT_POLL_INTERVAL, "--interval", min=0.05, help="Seconds between polls with --poll")
+):
+    """
+    Continuously monitor a directory and report drift from a manifest.
+    """
+    from .watch import Watcher
+
+    watcher = None
+    try:
+        manifest = load_manifest(manifest_path)
+        watcher = Watcher(directory, manifest, IgnoreRules(directory), jobs=jobs)
+
+        def on_start(changes):
+            typer.echo(f"Watching {directory} against {manifest_path} ({'polling every %gs' % interval if poll else 'inotify'}); Ctrl+C to stop")
+            _echo_drift(changes)
+            _echo_watch_state(watcher)
+
+        def on_batch(changes, latency):
+            _echo_drift(changes)
+            _echo_watch_state(watcher, latency)
+
+        try:
+            watcher.run(on_start, on_batch, poll_interval=interval if poll else None, debounce=debounce, max_delay=max_delay)
+        except OSError as e:
+            if poll:
+                raise
+            typer.echo(f"Warning: inotify unavailable ({e}); falling back to polling every {interval:g}s", err=True)
+            poll = True
+            watcher.run(on_start, on_batch, poll_interval=interval, debounce=debounce, max_delay=max_delay)
+
+    except KeyboardInterrupt:
+        typer.echo("\nStopped watching.")
+        if watcher is not None and watcher.root_hash != watcher.expected_root:
+            raise typer.Exit(code=1)
+    except Exception as e:
+        typer.echo(f"Error watching directory: {e}", err=True)
+        raise typer.Exit(code=1)
+
+@cache_app.command("stats")
+def cache_stats(
+    path: Optional[Path] = typer.Option(None, "--path", help="Hash cache database (defaults to ~/.cache/merklewatch/hashes.sqlite)", dir_okay=False, resolve_path=True)
+):
+    """
+    Show the size and contents of the persistent hash cache.
+    """
+    from .cache import HashCache, default_cache_path
+    try:
+        if not (path or default_cache_path()).exists():
+            typer.echo(f"No hash cache at {path or default_cache_path()}")
+            return
+        with HashCache(path) as cache:
+            stats = cache.stats()
+
+        typer.echo(f"Cache: {stats['path']}")
+        typer.echo(f"  Entries: {stats['entries']} (limit {stats['max_entries']})")
+        for name, count in stats['by_algorithm'].items():
+            typer.echo(f"    {name}: {count}")
+        typer.echo(f"  Size on disk: {stats['disk_bytes']} bytes")
+        if stats['oldest_use'] is not None:
+            typer.echo(f"  Oldest entry last used: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(stats['oldest_use']))}")
+            typer.echo(f"  Newest entry last used: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(stats['newest_use']))}")
+
+    except Exception as e:
+        typer.echo(f"Error reading hash cache: {e}", err=True)
+        raise typer.Exit(code=1)
+
+@cache_app.command("prune")
+def cache_prune(
+    path: Optional[Path] = typer.Option(None, "--path", help="Hash cache database (defaults to ~/.cache/merklewatch/hashes.sqlite)", dir_okay=False, resolve_path=True),
+    max_entries: int = typer.Option(DEFAULT_MAX_ENTRIES, "--max-entries", min=0, help="Keep at most this many entries, evicting the least recently used"),
+    clear: bool = typer.Option(False, "--all", help="Remove every entry")
+):
+    """
+    Evict least recently used entries from the persistent hash cache.
+    """
+    from .cache import HashCache, default_cache_path
+    try:
+        if not (path or default_cache_path()).exists():
+            typer.echo(f"No hash cache at {path or default_cache_path()}")
+            return
+        with HashCache(path, max_entries=max_entries) as cache:
+            removed = cache.clear() if clear else cache.prune()
+            remaining = cache.stats()['entries']
+        typer.echo(f"Removed {removed} entries, {remaining} remaining")
+
+    except Exception as e:
+        typer.echo(f"Error pruning hash cache: {e}", err=True)
+        raise typer.Exit(code=1)
+
 @app.command()
 def ignore(
-    directory: Path = typer.Argument(..., help="The directory to configure ignores for", exists=True, file_okay=False, dir_okay=True, resolve_path=True)
+    directory: Path = typer.Argument(..., help="The directory to configure ignores for", exists=True, file_okay=False, dir_okay=True, resolve_path=True),
+    max_paths: int = typer.Option(DEFAULT_MAX_PATHS, "--max-paths", min=0, help="Most paths offered by the fuzzy finder (the shallowest are kept)")
 ):
     """
     Interactively configure .merkleignore rules.
     """
+    # Interactive-only dependencies: loaded here so other commands start fast
+    import questionary
+    from .common_ignores import COMMON_IGNORES, scan_for_suggestions
+
     typer.echo(f"Scanning {directory} for ignore suggestions...")
     
     ignore_rules = IgnoreRules(directory)
     existing_patterns = set(ignore_rules.patterns)
     
-    # Collect all relative paths for fuzzy finding and pattern matching
-    all_paths = []
+    # One pass over the tree: which common patterns match, and paths for fuzzy finding
     try:
-        for root, dirs, files in os.walk(directory):
-            # Skip .git and other common hidden dirs to speed up and avoid noise
-            if '.git' in dirs:
-                dirs.remove('.git')
-                
-            rel_root = Path(root).relative_to(directory)
-            
-            if rel_root != Path('.'):
-                all_paths.append(str(rel_root) + '/')
-            
-            for f in files:
-                path = rel_root / f
-                all_paths.append(str(path))
+        scan = scan_for_suggestions(directory, ignore_rules, max_paths=max_paths)
     except Exception as e:
         typer.echo(f"Error scanning directory: {e}", err=True)
         raise typer.Exit(code=1)
-
-    # Find relevant common patterns
-    suggested_patterns = []
-    common_patterns = get_all_common_patterns()
-    
-    # Check which common patterns match files in the directory
-    # This is a simple check: does this pattern match ANY file we found?
-    matched_common = set()
-    
-    with typer.progressbar(common_patterns, label="Checking common patterns") as progress:
-        for pattern in progress:
-            # Check if pattern matches any path
-            # We need to handle directory patterns (ending in /) vs file patterns
-            is_match = False
-            for path in all_paths:
-                if pattern.endswith('/'):
-                    if path.startswith(pattern) or fnmatch.fnmatch(path, pattern):
-                        is_match = True
-                        break
-                else:
-                    if fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(os.path.basename(path), pattern):
-                        is_match = True
-                        break
-            
-            if is_match:
-                matched_common.add(pattern)
+    matched_common = scan.matched
+    all_paths = scan.paths
+    typer.echo(f"Checked {scan.entries} entries against the common patterns")
+    if scan.truncated:
+        typer.echo(f"Note: fuzzy find lists the {max_paths} shallowest paths; add deeper ones as a pattern", err=True)
 
     # Group matched patterns by category for display
     choices = []
@@ -1,4 +1,15 @@
 
+"""
+Common ignore patterns and the scan that suggests them for a directory.
+"""
+import os
+import re
+import fnmatch
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set
+from .ignore import GLOB_CHARS, IgnoreRules, PatternMatcher
+from .defaults import DEFAULT_MAX_PATHS
+
 # Common ignore patterns grouped by category
 COMMON_IGNORES = {
     "Operating System": [
@@ -126,3 +137,145 @@ def get_all_common_patterns():
     for category, patterns in COMMON_IGNORES.items():
         all_patterns.extend(patterns)
     return sorted(list(set(all_patterns)))
+
+
+class CommonPatternIndex:
+    """
+    Precompiled patterns for finding which of them match anything in a tree.
+
+    Literal names (and directory patterns, by name) are kept in a dict, and
+    wildcard patterns in one combined regex for basenames plus one for
+    patterns containing a slash, matched against the whole path. Wildcard
+    directory patterns (`*.egg-info/`) keep their trailing slash and only
+    match directories, which are tried with a trailing slash too. A pattern
+    is dropped from the index once it has matched, so later entries only
+    pay for the patterns not found yet; the combined regexes are rebuilt
+    when that happens, which is at most once per pattern.
+
+    `prunes()` tells whether a directory is ignored by any of the patterns,
+    found or not, using the same PatternMatcher as IgnoreRules.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        patterns = list(patterns)
+        self.matched: Set[str] = set()
+        self._names: Dict[str, List[str]] = {}
+        self._paths: Dict[str, List[str]] = {}
+        self._basename_globs: Dict[str, re.Pattern] = {}
+        self._path_globs: Dict[str, re.Pattern] = {}
+        for pattern in patterns:
+            if not any(c in pattern for c in GLOB_CHARS):
+                # Names match any path component; names with or starting with a slash, the whole path
+                literal = pattern.strip('/')
+                bucket = self._paths if '/' in literal or pattern.startswith('/') else self._names
+                bucket.setdefault(literal, []).append(pattern)
+            elif '/' in pattern.rstrip('/'):
+                self._path_globs[pattern] = re.compile(fnmatch.translate(os.path.normcase(pattern)))
+            else:
+                self._basename_globs[pattern] = re.compile(fnmatch.translate(os.path.normcase(pattern)))
+        self._compile()
+        self._all = PatternMatcher(patterns)
+
+    def _compile(self):
+        self._basename_glob = self._combine(self._basename_globs)
+        self._path_glob = self._combine(self._path_globs)
+
+    @staticmethod
+    def _combine(globs: Dict[str, re.Pattern]):
+        return re.compile('|'.join(regex.pattern for regex in globs.values())).match if globs else None
+
+    @property
+    def pending(self) -> int:
+        """Patterns that have not matched yet."""
+        return len(self._names) + len(self._paths) + len(self._basename_globs) + len(self._path_globs)
+
+    def match(self, relative_path: str, name: str, is_dir: bool = False):
+        """Record the patterns that match one entry (a relative POSIX path, its basename and whether it is a directory)."""
+        if name in self._names:
+            self.matched.update(self._names.pop(name))
+        if self._paths and relative_path in self._paths:
+            self.matched.update(self._paths.pop(relative_path))
+        suffixes = ('', '/') if is_dir else ('',)
+        for suffix in suffixes:
+            if self._basename_glob is not None and self._basename_glob(os.path.normcase(name + suffix)):
+                self._take(self._basename_globs, os.path.normcase(name + suffix))
+            if self._path_glob is not None and self._path_glob(os.path.normcase(relative_path + suffix)):
+                self._take(self._path_globs, os.path.normcase(relative_path + suffix))
+
+    def _take(self, globs: Dict[str, re.Pattern], text: str):
+        """Move every glob matching `text` to `matched` and rebuild the combined regexes."""
+        for pattern in [pattern for pattern, regex in globs.items() if regex.match(text)]:
+            del globs[pattern]
+            self.matched.add(pattern)
+        self._compile()
+
+    def prunes(self, relative_path: str) -> bool:
+        """Whether a directory is ignored by any of the patterns."""
+        return self._all.matches(relative_path)
+
+
+class SuggestionScan:
+    """The outcome of scan_for_suggestions()."""
+
+    def __init__(self, matched: Set[str], paths: List[str], entries: int, truncated: bool):
+        self.matched = matched
+        self.paths = paths
+        self.entries = entries
+        self.truncated = truncated
+
+
+def scan_for_suggestions(root_path, ignore_rules: Optional[IgnoreRules] = None, patterns: Optional[Iterable[str]] = None, max_paths: int = DEFAULT_MAX_PATHS) -> SuggestionScan:
+    """
+    Walk a tree once, breadth-first, finding which common patterns match it
+    and collecting paths for the fuzzy finder.
+
+    Directories matched by a common pattern (node_modules/, .git/, ...) or
+    by the existing ignore rules are not descended into: everything below
+    them would be ignored anyway. Symlinks are matched but not followed.
+
+    Args:
+        root_path: Directory to scan.
+        ignore_rules: Optional current rules; paths they ignore are left
+            out of the fuzzy finder list.
+        patterns: Patterns to look for. Defaults to all common patterns.
+        max_paths: Most paths kept for the fuzzy finder (directories end in
+            '/'); the shallowest are kept.
+
+    Returns:
+        A SuggestionScan with the matched patterns, the fuzzy finder paths,
+        the number of entries visited and whether the path list was capped.
+    """
+    index = CommonPatternIndex(get_all_common_patterns() if patterns is None else patterns)
+    paths: List[str] = []
+    entries = 0
+    truncated = False
+    queue = deque([(os.fspath(root_path), '')])
+
+    while queue:
+        current_path, relative_dir = queue.popleft()
+        prefix = relative_dir + '/' if relative_dir else ''
+        try:
+            with os.scandir(current_path) as it:
+                listing = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+
+        for entry in listing:
+            entries += 1
+            relative_path = prefix + entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                is_dir = False
+            index.match(relative_path, entry.name, is_dir)
+
+            ignored = ignore_rules is not None and ignore_rules.should_ignore_relative(relative_path)
+            if not ignored:
+                if len(paths) < max_paths:
+                    paths.append(relative_path + '/' if is_dir else relative_path)
+                else:
+                    truncated = True
+            if is_dir and not ignored and not index.prunes(relative_path):
+                queue.append((entry.path, relative_path))
+
+    return SuggestionScan(index.matched, paths, entries, truncated)
@@ -0,0 +1,96 @@
+"""
+Transparent manifest compression for MerkleWatch.
+
+Compressed manifests are selected by extension when writing (`.gz`, `.xz`,
+`.zst`) and detected by magic bytes when reading. All codecs are used as
+streams, so manifests are (de)compressed incrementally rather than buffered.
+
+gzip and xz come from the standard library; zstd uses `compression.zstd`
+on Python 3.14+ and the optional `zstandard` package otherwise
+(`pip install merklewatch[zstd]`).
+"""
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+# codec -> (extension, magic bytes, default level)
+CODECS = {
+    "gzip": (".gz", b'\x1f\x8b', 6),
+    "xz": (".xz", b'\xfd7zXZ\x00', 6),
+    "zstd": (".zst", b'\x28\xb5\x2f\xfd', 3),
+}
+
+_MAGIC_LENGTH = max(len(magic) for _, magic, _ in CODECS.values())
+
+
+def codec_for_path(path: Path) -> Optional[str]:
+    """Pick a codec from a file extension, or None for uncompressed."""
+    suffix = Path(path).suffix
+    for codec, (extension, _, _) in CODECS.items():
+        if suffix == extension:
+            return codec
+    return None
+
+
+def strip_codec_suffix(path: Path) -> Path:
+    """Drop a compression extension, e.g. `snap.jsonl.gz` -> `snap.jsonl`."""
+    path = Path(path)
+    return path.with_suffix('') if codec_for_path(path) else path
+
+
+def detect_codec(path: Path) -> Optional[str]:
+    """Detect the codec of an existing file from its magic bytes."""
+    with open(path, 'rb') as f:
+        head = f.read(_MAGIC_LENGTH)
+    for codec, (_, magic, _) in CODECS.items():
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+def _zstd_open(path: Path, mode: str, level: int) -> BinaryIO:
+    try:
+        from compression import zstd
+        return zstd.open(path, mode, level=level if 'w' in mode else None)
+    except ImportError:
+        pass
+
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd manifests require the 'zstandard' package: pip install merklewatch[zstd]")
+
+    if 'w' in mode:
+        return zstandard.open(path, mode, cctx=zstandard.ZstdCompressor(level=level))
+    return zstandard.open(path, mode)
+
+
+def open_compressed(path: Path, mode: str = 'rb', codec: Optional[str] = None, level: Optional[int] = None) -> BinaryIO:
+    """
+    Open a file as a binary stream, (de)compressing on the fly.
+
+    Args:
+        path: File to open
+        mode: 'rb' or 'wb'
+        codec: 'gzip', 'xz', 'zstd' or None for a plain file. When reading,
+            pass the result of detect_codec()
+        level: Compression level; the codec's default when omitted
+
+    Returns:
+        A binary file object
+    """
+    if codec is None:
+        return open(path, mode)
+
+    if codec not in CODECS:
+        raise ValueError(f"Unknown compression codec: {codec}")
+
+    if level is None:
+        level = CODECS[codec][2]
+
+    if codec == "gzip":
+        import gzip
+        return gzip.open(path, mode, compresslevel=level)
+    if codec == "xz":
+        import lzma
+        return lzma.open(path, mode, preset=level if 'w' in mode else None)
+    return _zstd_open(path, mode, level)
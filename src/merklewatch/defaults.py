@@ -0,0 +1,30 @@
+"""
+Default values of the settings exposed as CLI options.
+
+They live in this import-free module so the CLI can declare its options
+without loading the modules that use them (sqlite3 for the hash cache,
+the watcher, chunked hashing, progress reporting, ignore suggestions).
+Modules whose own signatures use a default import it from here; the rest
+are only read by the CLI.
+"""
+
+# Default bound on cached files (roughly 100 bytes each on disk)
+DEFAULT_MAX_ENTRIES = 1_000_000
+
+# Default quiet period before a batch of events is processed (seconds)
+DEFAULT_DEBOUNCE = 0.1
+
+# Longest a batch may keep growing under a continuous write storm (seconds)
+DEFAULT_MAX_DELAY = 0.5
+
+# Default interval of the polling fallback (seconds)
+DEFAULT_POLL_INTERVAL = 1.0
+
+# Smallest accepted chunk size
+MIN_CHUNK_SIZE = 64 * 1024
+
+# Seconds between machine-readable progress lines
+DEFAULT_INTERVAL = 10.0
+
+# Paths kept for the `ignore` command's fuzzy finder (shallowest first)
+DEFAULT_MAX_PATHS = 100_000
@@ -2,28 +2,34 @@
 Diff formatting and display utilities for MerkleWatch.
 """
 import typer
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 
+# Categories in display order; the last three hold (old path, new path) pairs
+DIFF_CATEGORIES = ('added', 'removed', 'modified', 'renamed', 'moved', 'copied')
 
-def format_diff_summary(diffs: Dict[str, List[str]]) -> str:
+
+def count_changes(diffs: Dict[str, list]) -> int:
+    """Total number of entries across all diff categories."""
+    return sum(len(diffs.get(kind, [])) for kind in DIFF_CATEGORIES)
+
+
+def format_diff_summary(diffs: Dict[str, list]) -> str:
     """
     Format a summary of the differences.
     
     Args:
-        diffs: Dictionary with 'added', 'removed', 'modified' keys
+        diffs: Dictionary with 'added', 'removed', 'modified' keys and
+            optionally 'renamed', 'moved', 'copied'
         
     Returns:
         Formatted summary string
     """
-    total = len(diffs.get('added', [])) + len(diffs.get('removed', [])) + len(diffs.get('modified', []))
+    total = count_changes(diffs)
     
     parts = []
-    if diffs.get('added'):
-        parts.append(f"{len(diffs['added'])} added")
-    if diffs.get('removed'):
-        parts.append(f"{len(diffs['removed'])} removed")
-    if diffs.get('modified'):
-        parts.append(f"{len(diffs['modified'])} modified")
+    for kind in DIFF_CATEGORIES:
+        if diffs.get(kind):
+            parts.append(f"{len(diffs[kind])} {kind}")
         
     return f"{total} changes: {', '.join(parts)}"
 
@@ -95,8 +101,20 @@ def display_modified_files_detailed(
         typer.echo(f"      New: {typer.style(new_hash, fg=typer.colors.GREEN, dim=True)}")
 
 
+def display_paired_files(pairs: List[Tuple[str, str]], header: str, symbol: str, color: str, show_header: bool = True):
+    """Display (old path, new path) pairs such as renames, moves or copies."""
+    if not pairs:
+        return
+
+    if show_header:
+        typer.echo(typer.style(f"\n{header}", fg=color, bold=True))
+
+    for old_path, new_path in pairs:
+        typer.echo(typer.style(f"  {symbol} {old_path} → {new_path}", fg=color))
+
+
 def display_full_diff(
-    diffs: Dict[str, List[str]], 
+    diffs: Dict[str, list], 
     old_data: Optional[Dict[str, Any]] = None,
     new_data: Optional[Dict[str, Any]] = None,
     show_detailed: bool = True
@@ -105,12 +123,13 @@ def display_full_diff(
     Display a complete diff with all changes.
     
     Args:
-        diffs: Dictionary with 'added', 'removed', 'modified' keys
+        diffs: Dictionary with 'added', 'removed', 'modified' keys and
+            optionally 'renamed', 'moved', 'copied' pairs (see detect_moves())
         old_data: Optional old manifest file data for detailed view
         new_data: Optional new manifest file data for detailed view
         show_detailed: Whether to show hash details for modified files
     """
-    total = len(diffs.get('added', [])) + len(diffs.get('removed', [])) + len(diffs.get('modified', []))
+    total = count_changes(diffs)
     
     if total == 0:
         typer.echo(typer.style("No differences found.", fg=typer.colors.GREEN))
@@ -119,6 +138,9 @@ def display_full_diff(
     typer.echo(f"\n{typer.style('Summary:', bold=True)} {format_diff_summary(diffs)}")
     
     # Display each category
+    display_paired_files(diffs.get('renamed', []), "→ Renamed:", "R", typer.colors.CYAN)
+    display_paired_files(diffs.get('moved', []), "→ Moved:", ">", typer.colors.BLUE)
+    display_paired_files(diffs.get('copied', []), "+ Copied:", "C", typer.colors.MAGENTA)
     display_added_files(diffs.get('added', []))
     display_removed_files(diffs.get('removed', []))
     
@@ -130,7 +152,7 @@ def display_full_diff(
 
 def display_verification_diff(
     expected_root: str,
-    actual_root: str,
+    actual_root: Optional[str],
     diffs: Dict[str, List[str]],
     old_data: Optional[Dict[str, Any]] = None,
     new_data: Optional[Dict[str, Any]] = None
@@ -140,12 +162,19 @@ def display_verification_diff(
     
     Args:
         expected_root: Expected root hash from manifest
-        actual_root: Actual computed root hash
+        actual_root: Actual computed root hash, or None if verification
+            stopped at the first difference
         diffs: Dictionary with 'added', 'removed', 'modified' keys
         old_data: Original manifest file data
         new_data: Current directory file data
     """
     typer.echo(typer.style("\n✗ Verification FAILED!", fg=typer.colors.RED, bold=True))
+    if actual_root is None:
+        typer.echo(f"\nStopped early; root hash not computed")
+        typer.echo(f"  Expected: {typer.style(expected_root, fg=typer.colors.RED, dim=True)}")
+        display_full_diff(diffs, old_data, new_data, show_detailed=True)
+        return
+
     typer.echo(f"\nRoot Hash Mismatch:")
     typer.echo(f"  Expected: {typer.style(expected_root, fg=typer.colors.RED, dim=True)}")
     typer.echo(f"  Actual:   {typer.style(actual_root, fg=typer.colors.GREEN, dim=True)}")
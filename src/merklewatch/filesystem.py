@@ -1,103 +1,451 @@
 import os
 import typer
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Optional
-from .hashing import hash_file, compute_leaf_hash, compute_directory_hash
-from .merkle import compute_merkle_root
+from typing import Dict, Any, List, Optional, Tuple, Union
+from .hashing import FileHasher, get_algorithm
+from .merkle import compute_merkle_root_digest
 from .ignore import IgnoreRules
+from .incremental import Baseline, DirectoryFingerprint
+from .manifest import ManifestWriter
 
-def scan_directory(current_path: Path, root_path: Path, manifest_data: Dict[str, Any], ignore_rules: Optional[IgnoreRules] = None) -> str:
+# A discovered file: (relative_path, stat_result, future of the content hash,
+# whether the resolved hash should be stored in the hash cache)
+_File = Tuple[str, os.stat_result, Future, bool]
+
+
+class _Directory:
     """
-    Recursively scan a directory, computing hashes and building the Merkle tree.
-    
-    Args:
-        current_path: The directory currently being scanned.
-        root_path: The root directory of the snapshot (for relative paths).
-        manifest_data: Dictionary to collect file metadata and directory roots.
-        ignore_rules: Optional IgnoreRules object to filter files.
-        
-    Returns:
-        The Merkle root hash of the current directory.
-        
-    Raises:
-        PermissionError: If directory cannot be accessed
-        OSError: For other filesystem errors
+    A discovered directory whose Merkle root may not be assembled yet.
+
+    `children` holds `_File` tuples and nested `_Directory` objects in sorted
+    order. Once assembled, `root_hash` is set and the children are released.
+    The fingerprint accumulates the listing as children are discovered, and
+    takes in the subdirectories' fingerprints when it is first read.
+    """
+
+    __slots__ = ('relative_path', 'children', 'fingerprint', 'root_hash')
+
+    def __init__(self, relative_path: str, algorithm: str):
+        self.relative_path = relative_path
+        self.children: List[Union[_File, '_Directory']] = []
+        self.fingerprint = DirectoryFingerprint(algorithm)
+        self.root_hash: Optional[str] = None
+
+
+class _Scanner:
     """
-    
-    # Get all children
-    try:
-        entries = sorted(os.listdir(current_path))
-    except PermissionError as e:
-        typer.echo(f"Warning: Permission denied accessing {current_path}", err=True)
-        # Return empty hash for inaccessible directories
-        # This allows the scan to continue but marks the directory as inaccessible
-        return compute_merkle_root([])
-    except OSError as e:
-        typer.echo(f"Warning: Error accessing {current_path}: {e}", err=True)
-        return compute_merkle_root([])
-
-    child_hashes = []
-    
-    # We need to process children in sorted order to ensure deterministic tree
-    for entry in entries:
-        full_path = current_path / entry
-        
-        # Check ignore rules
-        if ignore_rules and ignore_rules.should_ignore(full_path):
-            continue
-        
-        # Skip symlinks to avoid loops and security issues
-        # TODO: Implement symlink handling
-        if full_path.is_symlink():
-            typer.echo(f"Warning: Skipping symlink {full_path.relative_to(root_path)}", err=True)
-            continue
-            
-        relative_path = full_path.relative_to(root_path).as_posix()
-        
+    Walks a directory tree and assembles its Merkle root.
+
+    Discovery and hashing are split: the walk submits every file to a
+    hashing backend and records a placeholder, and the per-directory roots
+    are assembled afterwards in sorted order. With ``jobs > 1`` hashing runs
+    on a thread pool (hashlib releases the GIL on large buffers), so the
+    whole tree is discovered first and assembled once all hashes resolve.
+    The resulting root is identical to the serial path.
+
+    Walked subdirectories are queued in completion (post-order) order and
+    assembled from that queue: immediately in serial mode, and whenever more
+    than `max_outstanding` files are awaiting assembly in parallel mode. This keeps
+    memory bounded and makes entries reach the manifest (or a streaming
+    ManifestWriter) in the same order regardless of `jobs`.
+
+    When a baseline is given, files whose stat signature is unchanged reuse
+    the baseline's content hash and are never submitted for hashing, and
+    directories whose fingerprint and children all match the baseline reuse
+    its stored subtree root instead of rebuilding their Merkle tree. The
+    walk itself is not shortened: in-place writes leave directory mtimes
+    alone, so every descendant is still listed and stat'ed.
+
+    With a HashCache, files not reused from the baseline are looked up by
+    (dev, inode) and stat signature before hashing, and freshly computed
+    hashes are stored back as their directory is assembled.
+
+    With a `fail_fast` checker, every directory listing and resolved file
+    hash is checked against an expected tree as soon as it is known, and the
+    scan aborts (cancelling queued hashes) with the checker's exception at
+    the first difference.
+
+    File contents are read by `file_hasher`, which carries the read strategy,
+    buffer size and page cache settings, and the hash algorithm used for both
+    file contents and Merkle nodes.
+    """
+
+    def __init__(self, root_path: Path, manifest_data: Dict[str, Any], ignore_rules: Optional[IgnoreRules] = None, jobs: int = 1, baseline: Optional[Baseline] = None, writer: Optional[ManifestWriter] = None, file_hasher: Optional[FileHasher] = None, cache: Optional[Any] = None, fail_fast: Optional[Any] = None):
+        self.root_path = root_path
+        self.manifest_data = manifest_data
+        self.ignore_rules = ignore_rules
+        self.jobs = max(1, jobs)
+        self.baseline = baseline
+        self.writer = writer
+        self.cache = cache
+        self.fail_fast = fail_fast
+        self._failure: Optional[BaseException] = None
+        self.file_hasher = file_hasher or FileHasher()
+        self.algorithm = self.file_hasher.algorithm
+        self.hash_algorithm = get_algorithm(self.algorithm)
+        if baseline is not None and baseline.algorithm != self.algorithm:
+            raise ValueError(f"Baseline manifest uses {baseline.algorithm}, but this scan uses {self.algorithm}")
+        if baseline is not None and baseline.chunk_size != self.file_hasher.chunk_size:
+            raise ValueError(f"Baseline manifest uses chunk size {baseline.chunk_size or 'none'}, but this scan uses {self.file_hasher.chunk_size or 'none'}")
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.max_outstanding = 256 * self.jobs
+        self._outstanding = 0
+        self._pending: List[_Directory] = []
+
+    def scan(self, current_path: Path) -> str:
+        relative_path = current_path.relative_to(self.root_path).as_posix()
+        if relative_path == '.':
+            relative_path = ''
+
+        if self.jobs == 1:
+            return self._scan(current_path, relative_path)
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            self.executor = executor
+            try:
+                return self._scan(current_path, relative_path)
+            except BaseException:
+                # Abandon queued hashes (a fail-fast mismatch or an interrupt)
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+            finally:
+                self.executor = None
+
+    def _scan(self, current_path: Path, relative_path: str) -> str:
+        directory = self._walk(os.fspath(current_path), relative_path)
+        self._flush()
+        root_hash = self._assemble(directory)
+        self._check_failure()
+        return root_hash
+
+    def _check_failure(self):
+        if self._failure is not None:
+            raise self._failure
+
+    def _check_hash(self, relative_path: str, future: Future):
+        """Done-callback passing a resolved hash (None if unreadable) to the fail-fast checker."""
+        if future.cancelled() or isinstance(future.exception(), CancelledError):
+            return
+        content_hash = None if future.exception() is not None else future.result()
+        try:
+            self.fail_fast.check_file(relative_path, content_hash)
+        except Exception as e:
+            # May run on a worker thread: re-raised by the walk on the main thread
+            if self._failure is None:
+                self._failure = e
+
+    def _cache_chunk_size(self, size: int) -> int:
+        return self.file_hasher.chunk_size if self.file_hasher.is_chunked(size) else 0
+
+    def _submit_hash(self, full_path: str, relative_path: str, stat: os.stat_result) -> Tuple[Future, bool]:
+        """
+        Resolve a file's content hash from the baseline or the cache, or
+        submit it for hashing. Returns the future and whether its result
+        should be stored in the cache.
+        """
+        future, store = self._resolve_hash(full_path, relative_path, stat)
+        if self.fail_fast is not None:
+            future.add_done_callback(lambda f: self._check_hash(relative_path, f))
+            self._check_failure()
+        return future, store
+
+    def _resolve_hash(self, full_path: str, relative_path: str, stat: os.stat_result) -> Tuple[Future, bool]:
+        future: Future = Future()
+
+        # Unchanged since the baseline: reuse its content hash
+        if self.baseline is not None:
+            previous = self.baseline.lookup(relative_path, stat)
+            if previous is not None:
+                future.set_result(previous['content_hash'])
+                return future, False
+
+        # Same inode with unchanged size, mtime and ctime: reuse the cached hash
+        if self.cache is not None:
+            chunk_size = self._cache_chunk_size(stat.st_size)
+            cached = self.cache.lookup(stat, self.algorithm, chunk_size)
+            if cached is not None:
+                self.cache.record(stat, self.algorithm, chunk_size, cached)
+                future.set_result(cached)
+                return future, False
+
+        store = self.cache is not None
+        try:
+            if self.executor is not None:
+                # Chunked files become one task per chunk
+                return self.file_hasher.submit(self.executor, full_path, stat.st_size), store
+
+            # Serial mode: hash immediately and wrap the outcome in a done future
+            future.set_result(self.file_hasher(full_path, stat.st_size))
+        except OSError as e:
+            future.set_exception(e)
+        return future, store
+
+    def _walk(self, current_path: str, relative_dir: str) -> _Directory:
+        """
+        Discover the children of a directory in sorted order, submitting
+        files for hashing and recursing into subdirectories.
+
+        Uses a single os.scandir pass: entry types come from the cached
+        d_type and each file costs exactly one lstat. Relative paths are
+        built as strings to avoid pathlib overhead on large trees.
+        """
+        directory = _Directory(relative_dir, self.algorithm)
+        prefix = relative_dir + '/' if relative_dir else ''
+
+        # Get all children
         try:
-            if full_path.is_file():
-                # 1. Hash file content
+            entries = self._list_entries(current_path, relative_dir)
+        except PermissionError as e:
+            typer.echo(f"Warning: Permission denied accessing {current_path}", err=True)
+            # Return no children for inaccessible directories (empty hash)
+            # This allows the scan to continue but marks the directory as inaccessible
+            return directory
+        except OSError as e:
+            typer.echo(f"Warning: Error accessing {current_path}: {e}", err=True)
+            return directory
+
+        if self.fail_fast is not None:
+            self.fail_fast.check_listing(relative_dir, self._listing(entries, prefix))
+
+        # We need to process children in sorted order to ensure deterministic tree
+        for entry in entries:
+            relative_path = prefix + entry.name
+
+            # Check ignore rules
+            if self.ignore_rules and self.ignore_rules.should_ignore_relative(relative_path):
+                continue
+
+            try:
+                # Skip symlinks to avoid loops and security issues
+                # TODO: Implement symlink handling
+                if entry.is_symlink():
+                    typer.echo(f"Warning: Skipping symlink {relative_path}", err=True)
+                    continue
+
+                if entry.is_file(follow_symlinks=False):
+                    stat = self._stat(entry, relative_path)
+                    directory.fingerprint.add_file(entry.name, stat)
+                    future, store = self._submit_hash(entry.path, relative_path, stat)
+                    directory.children.append((relative_path, stat, future, store))
+                    self._outstanding += 1
+
+                elif entry.is_dir(follow_symlinks=False):
+                    subdirectory = self._walk(entry.path, relative_path)
+                    directory.fingerprint.add_directory(entry.name, subdirectory.fingerprint)
+                    directory.children.append(subdirectory)
+                    self._pending.append(subdirectory)
+                    if self.executor is None or self._outstanding > self.max_outstanding:
+                        self._flush()
+            except OSError as e:
+                typer.echo(f"Warning: Error processing {relative_path}: {e}", err=True)
+                continue
+
+        return directory
+
+    def _list_entries(self, current_path: str, relative_dir: str) -> List[os.DirEntry]:
+        """A directory's entries sorted by name (one scandir pass)."""
+        with os.scandir(current_path) as it:
+            return sorted(it, key=lambda e: e.name)
+
+    def _stat(self, entry: os.DirEntry, relative_path: str) -> os.stat_result:
+        """lstat a file entry."""
+        return entry.stat(follow_symlinks=False)
+
+    def _merkle_root(self, child_digests: bytearray) -> str:
+        """Merkle root (hex) of a directory's packed child node digests."""
+        return compute_merkle_root_digest(child_digests, self.algorithm).hex()
+
+    def _listing(self, entries: List[os.DirEntry], prefix: str) -> List[Tuple[str, bool]]:
+        """The (relative path, is directory) pairs a walk of these entries will record."""
+        listing = []
+        for entry in entries:
+            relative_path = prefix + entry.name
+            if self.ignore_rules and self.ignore_rules.should_ignore_relative(relative_path):
+                continue
+            try:
+                if entry.is_symlink():
+                    continue
+                if entry.is_file(follow_symlinks=False):
+                    listing.append((relative_path, False))
+                elif entry.is_dir(follow_symlinks=False):
+                    listing.append((relative_path, True))
+            except OSError:
+                continue
+        return listing
+
+    def _flush(self):
+        """Assemble every queued subdirectory, in the order their walks completed."""
+        for subdirectory in self._pending:
+            self._assemble(subdirectory)
+        self._pending = []
+
+    def _record_file(self, relative_path: str, entry: Dict[str, Any]):
+        if self.writer is not None:
+            self.writer.write_file(relative_path, entry)
+        else:
+            self.manifest_data['files'][relative_path] = entry
+
+    def _record_directory(self, relative_path: str, entry: Dict[str, Any]):
+        if self.writer is not None:
+            self.writer.write_directory(relative_path, entry)
+        else:
+            self.manifest_data['directories'][relative_path] = entry
+
+    def _assemble(self, directory: _Directory) -> str:
+        """
+        Resolve the hashes of a directory's children, record their metadata
+        and compute the directory's Merkle root.
+
+        Child node digests are packed into one buffer as raw bytes; hex is
+        only produced for the manifest entries.
+        """
+        if directory.root_hash is not None:
+            return directory.root_hash
+
+        fingerprint = directory.fingerprint.hexdigest()
+
+        # A matching fingerprint only lets us reuse the stored root if every
+        # child also resolves to the hash recorded in the baseline
+        previous = None
+        if self.baseline is not None and directory.relative_path:
+            previous = self.baseline.lookup_directory(directory.relative_path, fingerprint)
+        unchanged = previous is not None
+
+        child_digests = bytearray()
+
+        for child in directory.children:
+            if isinstance(child, tuple):
+                relative_path, stat, future, store = child
+                self._outstanding -= 1
+
+                # 1. Resolve file content hash
                 try:
-                    content_hash = hash_file(full_path)
+                    content_hash = future.result()
                 except (PermissionError, OSError) as e:
+                    self._check_failure()
                     typer.echo(f"Warning: Cannot read file {relative_path}: {e}", err=True)
+                    unchanged = False
                     continue
-                
+                self._check_failure()
+                if store:
+                    self.cache.record(stat, self.algorithm, self._cache_chunk_size(stat.st_size), content_hash)
+
                 # 2. Wrap as leaf node
-                leaf_hash = compute_leaf_hash(content_hash)
-                child_hashes.append(leaf_hash)
-                
+                previous_file = self.baseline.files.get(relative_path) if unchanged else None
+                if previous_file is not None and previous_file['content_hash'] == content_hash:
+                    leaf_hash = previous_file['leaf_hash']
+                    child_digests += bytes.fromhex(leaf_hash)
+                else:
+                    digest = self.hash_algorithm.leaf_digest(bytes.fromhex(content_hash))
+                    child_digests += digest
+                    leaf_hash = digest.hex()
+                    unchanged = False
+
                 # 3. Store metadata
-                stat = full_path.stat()
-                manifest_data['files'][relative_path] = {
+                entry = {
                     'size': stat.st_size,
                     'mtime': stat.st_mtime,
+                    'ctime': stat.st_ctime,
+                    'inode': stat.st_ino,
+                    'dev': stat.st_dev,
                     'content_hash': content_hash,
                     'leaf_hash': leaf_hash
                 }
-                
-            elif full_path.is_dir():
-                # 1. Recurse
-                subdir_root = scan_directory(full_path, root_path, manifest_data, ignore_rules)
-                
+                if self.file_hasher.is_chunked(stat.st_size):
+                    entry['chunk_size'] = self.file_hasher.chunk_size
+                self._record_file(relative_path, entry)
+
+            else:
+                # 1. Subtree root (already assembled from the queue)
+                subdir_root = self._assemble(child)
+
                 # Skip empty or inaccessible directories (empty hash)
                 if not subdir_root:
                     continue
-                
+
                 # 2. Wrap as directory node
-                dir_node_hash = compute_directory_hash(subdir_root)
-                child_hashes.append(dir_node_hash)
-                
+                previous_dir = self.baseline.directories.get(child.relative_path) if unchanged else None
+                if previous_dir is not None and previous_dir['root_hash'] == subdir_root:
+                    dir_node_hash = previous_dir['node_hash']
+                    child_digests += bytes.fromhex(dir_node_hash)
+                else:
+                    digest = self.hash_algorithm.directory_digest(bytes.fromhex(subdir_root))
+                    child_digests += digest
+                    dir_node_hash = digest.hex()
+                    unchanged = False
+
                 # 3. Store directory metadata
-                manifest_data['directories'][relative_path] = {
+                self._record_directory(child.relative_path, {
                     'root_hash': subdir_root,
-                    'node_hash': dir_node_hash
-                }
-        except OSError as e:
-            typer.echo(f"Warning: Error processing {relative_path}: {e}", err=True)
-            continue
-            
-    # Compute Merkle root for this directory
-    dir_merkle_root = compute_merkle_root(child_hashes)
-    
-    return dir_merkle_root
+                    'node_hash': dir_node_hash,
+                    'fingerprint': child.fingerprint.hexdigest()
+                })
+
+        if unchanged:
+            # Same listing, same child hashes: the stored subtree root still holds
+            self.baseline.directory_hits += 1
+            directory.root_hash = previous['root_hash']
+        else:
+            # Compute Merkle root for this directory
+            directory.root_hash = self._merkle_root(child_digests)
+
+        directory.children = []
+        return directory.root_hash
+
+
+def scan_directory(current_path: Path, root_path: Path, manifest_data: Dict[str, Any], ignore_rules: Optional[IgnoreRules] = None, jobs: int = 1, baseline: Optional[Baseline] = None, writer: Optional[ManifestWriter] = None, file_hasher: Optional[FileHasher] = None, cache: Optional[Any] = None, fail_fast: Optional[Any] = None, io_concurrency: int = 0, profile: Optional[Any] = None, progress: Optional[Any] = None) -> str:
+    """
+    Recursively scan a directory, computing hashes and building the Merkle tree.
+
+    Args:
+        current_path: The directory currently being scanned.
+        root_path: The root directory of the snapshot (for relative paths).
+        manifest_data: Dictionary to collect file metadata and directory roots.
+        ignore_rules: Optional IgnoreRules object to filter files.
+        jobs: Number of worker threads used to hash files. 1 hashes serially.
+        baseline: Optional Baseline whose hashes are reused for unchanged files.
+        writer: Optional streaming ManifestWriter. When given, entries are written
+            to it as each directory completes instead of collected in manifest_data.
+        file_hasher: Optional FileHasher with the hash algorithm, read strategy
+            and buffer size used to hash file contents. Defaults to FileHasher()
+            (SHA-256).
+        cache: Optional HashCache consulted before hashing a file and updated
+            with every newly computed hash. The caller closes it.
+        fail_fast: Optional checker with `check_listing(relative_dir, [(path, is_dir)])`
+            and `check_file(relative_path, content_hash or None)`; the first
+            exception either raises aborts the scan.
+        io_concurrency: If set, list directories and read files with up to
+            this many of each in flight, driven by an asyncio event loop
+            (for high-latency network or FUSE filesystems). Replaces `jobs`;
+            roots and entries are the same.
+        profile: Optional ScanProfile (see profiling.py) to record phase
+            timings, syscall counts, and the slowest directories and
+            largest files into. Without one, no instrumentation runs.
+        progress: Optional ScanProgress (see progress.py). The tree is first
+            walked for its file and byte totals, and each file is reported
+            as its hash resolves; the scan reuses the pre-pass listings.
+
+    Returns:
+        The Merkle root hash of the current directory.
+
+    Raises:
+        PermissionError: If directory cannot be accessed
+        OSError: For other filesystem errors
+    """
+    scanner_class = _Scanner
+    options: Dict[str, Any] = {}
+    if io_concurrency:
+        from .async_scan import _AsyncScanner
+        scanner_class = _AsyncScanner
+        options['concurrency'] = io_concurrency
+    if profile is not None:
+        from .profiling import profiled_scanner
+        scanner_class = profiled_scanner(scanner_class)
+        options['profile'] = profile
+    if progress is not None:
+        # Outermost, so listings and stats reused from the pre-pass are not profiled twice
+        from .progress import progress_scanner
+        scanner_class = progress_scanner(scanner_class)
+        options['progress'] = progress
+    return scanner_class(root_path, manifest_data, ignore_rules, jobs, baseline, writer, file_hasher, cache, fail_fast, **options).scan(current_path)
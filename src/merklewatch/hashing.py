@@ -1,68 +1,337 @@
+import functools
 import hashlib
+import mmap
+import os
+import threading
 from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
 
 # Domain separation prefixes
 PREFIX_LEAF = b'\x00'
 PREFIX_INTERNAL = b'\x01'
 PREFIX_DIR = b'\x02'
 
+DEFAULT_ALGORITHM = "sha256"
+
+
+def _blake3() -> Any:
+    try:
+        import blake3
+    except ImportError:
+        raise ImportError("The blake3 algorithm requires the 'blake3' package: pip install merklewatch[blake3]")
+    return blake3.blake3()
+
+
+# Hash constructors by manifest `algorithm` name. Each returns a fresh hasher
+# with update(), digest(), hexdigest() and copy().
+_FACTORIES: Dict[str, Callable[[], Any]] = {
+    "sha256": hashlib.sha256,
+    "sha512": hashlib.sha512,
+    "sha3-256": hashlib.sha3_256,
+    "blake2b": functools.partial(hashlib.blake2b, digest_size=32),
+    "blake2s": hashlib.blake2s,
+    "blake3": _blake3,
+}
+
+_algorithms: Dict[str, 'HashAlgorithm'] = {}
+
+
+class HashAlgorithm:
+    """
+    A hash function together with its domain-separated node hashers.
+
+    The leaf, internal and directory hashers are pre-seeded with their
+    prefix once; node digests copy() them instead of hashing prefix + data.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self.name = name
+        self.new = factory
+        self._leaf_base = factory()
+        self._leaf_base.update(PREFIX_LEAF)
+        self._internal_base = factory()
+        self._internal_base.update(PREFIX_INTERNAL)
+        self._dir_base = factory()
+        self._dir_base.update(PREFIX_DIR)
+        self.digest_size = self._leaf_base.digest_size
+
+    def leaf_digest(self, content_digest: bytes) -> bytes:
+        hasher = self._leaf_base.copy()
+        hasher.update(content_digest)
+        return hasher.digest()
+
+    def internal_digest(self, left: bytes, right: bytes) -> bytes:
+        hasher = self._internal_base.copy()
+        hasher.update(left)
+        hasher.update(right)
+        return hasher.digest()
+
+    def directory_digest(self, subdir_root: bytes) -> bytes:
+        hasher = self._dir_base.copy()
+        hasher.update(subdir_root)
+        return hasher.digest()
+
+    def internal_hasher(self) -> Any:
+        """A fresh hasher already fed the internal-node prefix."""
+        return self._internal_base.copy()
+
+
+def register_algorithm(name: str, factory: Callable[[], Any]):
+    """
+    Make a hash function available under a manifest `algorithm` name.
+
+    `factory` must return a new hasher object with the hashlib interface,
+    including copy().
+    """
+    _FACTORIES[name] = factory
+    _algorithms.pop(name, None)
+
+
+def available_algorithms() -> List[str]:
+    """Names of all registered algorithms, whether or not they are installed."""
+    return sorted(_FACTORIES)
+
+
+def get_algorithm(name: str = DEFAULT_ALGORITHM) -> HashAlgorithm:
+    """
+    Look up a registered algorithm by name.
+
+    Raises:
+        ValueError: If the algorithm is unknown
+        ImportError: If it needs a package that is not installed
+    """
+    algorithm = _algorithms.get(name)
+    if algorithm is None:
+        factory = _FACTORIES.get(name)
+        if factory is None:
+            raise ValueError(f"Unsupported hash algorithm: {name} (available: {', '.join(available_algorithms())})")
+        algorithm = _algorithms[name] = HashAlgorithm(name, factory)
+    return algorithm
+
+
+def check_compatible_manifests(first: Dict[str, Any], second: Dict[str, Any]):
+    """
+    Reject comparing manifests whose content hashes are not comparable:
+    different algorithms, or different chunk sizes for large files.
+
+    Raises:
+        ValueError: If the manifests' `algorithm` or `chunk_size` fields differ
+    """
+    a = first.get('algorithm', DEFAULT_ALGORITHM)
+    b = second.get('algorithm', DEFAULT_ALGORITHM)
+    if a != b:
+        raise ValueError(f"Cannot compare manifests hashed with different algorithms ({a} vs {b})")
+
+    a = first.get('chunk_size')
+    b = second.get('chunk_size')
+    if a != b:
+        raise ValueError(f"Cannot compare manifests hashed with different chunk sizes ({a or 'whole files'} vs {b or 'whole files'})")
+
+
 def sha256_bytes(data: bytes) -> bytes:
     """Compute SHA256 hash of bytes."""
     return hashlib.sha256(data).digest()
 
-def hash_node(prefix: bytes, data: bytes) -> str:
+
+def hash_node(prefix: bytes, data: bytes, algorithm: str = DEFAULT_ALGORITHM) -> str:
     """
     Hash a node with a domain separation prefix.
     Returns the hex string of the hash.
     """
-    return hashlib.sha256(prefix + data).hexdigest()
+    hasher = get_algorithm(algorithm).new()
+    hasher.update(prefix + data)
+    return hasher.hexdigest()
+
+
+# Strategies for reading file contents into the hasher
+HASH_STRATEGIES = ("auto", "read", "readinto", "mmap")
 
-def hash_file(filepath: Path) -> str:
+# Default largest buffer used by readinto/mmap hashing
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+# "auto" hashes files of at least this size through mmap
+MMAP_THRESHOLD = 1024 * 1024
+
+_HAS_FADVISE = hasattr(os, 'posix_fadvise')
+
+_local = threading.local()
+
+
+def _buffer(size: int) -> memoryview:
+    """A per-thread reusable read buffer of at least `size` bytes."""
+    buf = getattr(_local, 'buffer', None)
+    if buf is None or len(buf) < size:
+        buf = _local.buffer = memoryview(bytearray(size))
+    return buf[:size]
+
+
+def _hash_read(f, hasher, size: int, buffer_size: int):
+    # One allocation per chunk; small files are read in a single call
+    while chunk := f.read(buffer_size):
+        hasher.update(chunk)
+
+
+def _hash_readinto(f, hasher, size: int, buffer_size: int):
+    buf = _buffer(max(1, min(buffer_size, size or buffer_size)))
+    while n := f.readinto(buf):
+        hasher.update(buf[:n])
+
+
+def _hash_mmap(f, hasher, size: int, buffer_size: int):
+    if size == 0:
+        return
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if hasattr(mm, 'madvise'):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        view = memoryview(mm)
+        try:
+            for start in range(0, len(view), buffer_size):
+                hasher.update(view[start:start + buffer_size])
+        finally:
+            view.release()
+
+
+_STRATEGIES = {"read": _hash_read, "readinto": _hash_readinto, "mmap": _hash_mmap}
+
+
+def hash_file(filepath: Path, buffer_size: int = DEFAULT_BUFFER_SIZE, strategy: str = "auto", drop_cache: bool = False, algorithm: str = DEFAULT_ALGORITHM) -> str:
     """
     Compute the hash of a file's content using chunked reading.
-    Returns the raw SHA256 hash (hex) of the content.
+    Returns the raw hash (hex) of the content, SHA256 unless another
+    registered algorithm is given.
     Note: This is the raw content hash. The leaf node hash will wrap this.
-    
+
+    The file is opened unbuffered and fed to the hasher without copying:
+    "readinto" fills a reusable per-thread buffer, "mmap" hashes memoryview
+    slices of a read-only mapping. "auto" uses readinto below MMAP_THRESHOLD
+    and mmap above it. With `drop_cache`, the kernel is told the read is
+    sequential and the file's pages are dropped afterwards (posix_fadvise
+    SEQUENTIAL/DONTNEED), so large snapshots do not evict the page cache.
+
+    Args:
+        filepath: File to hash
+        buffer_size: Largest chunk handed to the hasher at once; readinto
+            shrinks it to the file size for small files
+        strategy: One of HASH_STRATEGIES
+        drop_cache: Advise the kernel to drop the file's cached pages
+        algorithm: Registered hash algorithm name
+
     Raises:
         PermissionError: If file cannot be read due to permissions
         OSError: If file cannot be read for other reasons
     """
-    hasher = hashlib.sha256()
-    buffer_size = 65536  # 64kb chunks
+    hasher = get_algorithm(algorithm).new()
+
+    with open(filepath, 'rb', buffering=0) as f:
+        fd = f.fileno()
+        size = os.fstat(fd).st_size
+
+        if strategy == "auto":
+            strategy = "mmap" if size >= MMAP_THRESHOLD else "readinto"
+        try:
+            read = _STRATEGIES[strategy]
+        except KeyError:
+            raise ValueError(f"Unknown hash strategy: {strategy}")
+
+        advise = drop_cache and _HAS_FADVISE
+        if advise:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        try:
+            read(f, hasher, size, buffer_size)
+        finally:
+            if advise:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
 
-    try:
-        with open(filepath, 'rb') as f:
-            while chunk := f.read(buffer_size):
-                hasher.update(chunk)
-    except PermissionError:
-        raise PermissionError(f"Permission denied reading file: {filepath}")
-    except OSError as e:
-        raise OSError(f"Error reading file {filepath}: {e}")
-    
     return hasher.hexdigest()
 
-def compute_leaf_hash(file_hash_hex: str) -> str:
+
+class FileHasher:
+    """
+    Content hashing settings shared by a scan.
+
+    Calling an instance hashes one file using these settings, so it can be
+    handed to a thread pool directly. The algorithm also determines the
+    scan's Merkle node hashes. With `chunk_size`, files larger than one
+    chunk get a chunk tree root as their content hash (see chunking.py).
+    """
+
+    def __init__(self, buffer_size: int = DEFAULT_BUFFER_SIZE, strategy: str = "auto", drop_cache: bool = False, algorithm: str = DEFAULT_ALGORITHM, chunk_size: Optional[int] = None):
+        if strategy not in HASH_STRATEGIES:
+            raise ValueError(f"Unknown hash strategy: {strategy}")
+        if buffer_size <= 0:
+            raise ValueError(f"Buffer size must be positive: {buffer_size}")
+        if chunk_size is not None and chunk_size <= 0:
+            raise ValueError(f"Chunk size must be positive: {chunk_size}")
+        self.buffer_size = buffer_size
+        self.strategy = strategy
+        self.drop_cache = drop_cache
+        self.algorithm = get_algorithm(algorithm).name
+        self.chunk_size = chunk_size
+
+    def for_manifest(self, manifest: Dict[str, Any]) -> 'FileHasher':
+        """The same read settings with a manifest's algorithm and chunk size."""
+        return FileHasher(self.buffer_size, self.strategy, self.drop_cache,
+                          manifest.get('algorithm', DEFAULT_ALGORITHM), manifest.get('chunk_size'))
+
+    def is_chunked(self, size: int) -> bool:
+        """Whether a file of `size` bytes is hashed as a chunk tree."""
+        return self.chunk_size is not None and size > self.chunk_size
+
+    def __call__(self, filepath: Path, size: Optional[int] = None) -> str:
+        if self.chunk_size is not None:
+            if size is None:
+                size = os.stat(filepath).st_size
+            if self.is_chunked(size):
+                from .chunking import hash_file_chunked
+                return hash_file_chunked(filepath, size, self.chunk_size, self.algorithm, self.drop_cache)
+        return hash_file(filepath, self.buffer_size, self.strategy, self.drop_cache, self.algorithm)
+
+    def submit(self, executor, filepath: Path, size: int):
+        """
+        Hash a file on `executor`, returning a Future of its content hash.
+        Chunked files are split into one task per chunk.
+        """
+        if self.is_chunked(size):
+            from .chunking import submit_file_chunked
+            return submit_file_chunked(executor, filepath, size, self.chunk_size, self.algorithm, self.drop_cache)
+        return executor.submit(self, filepath)
+
+
+def leaf_digest(content_digest: bytes, algorithm: str = DEFAULT_ALGORITHM) -> bytes:
+    """Raw-bytes form of compute_leaf_hash."""
+    return get_algorithm(algorithm).leaf_digest(content_digest)
+
+
+def internal_digest(left: bytes, right: bytes, algorithm: str = DEFAULT_ALGORITHM) -> bytes:
+    """Raw-bytes form of compute_internal_hash."""
+    return get_algorithm(algorithm).internal_digest(left, right)
+
+
+def directory_digest(subdir_root: bytes, algorithm: str = DEFAULT_ALGORITHM) -> bytes:
+    """Raw-bytes form of compute_directory_hash."""
+    return get_algorithm(algorithm).directory_digest(subdir_root)
+
+
+def compute_leaf_hash(file_hash_hex: str, algorithm: str = DEFAULT_ALGORITHM) -> str:
     """
     Compute the leaf node hash from a file's content hash.
-    leaf_hash = SHA256(0x00 || file_hash_bytes)
+    leaf_hash = H(0x00 || file_hash_bytes)
     """
     # Convert hex string back to bytes for the inner hash
-    file_hash_bytes = bytes.fromhex(file_hash_hex)
-    return hash_node(PREFIX_LEAF, file_hash_bytes)
+    return leaf_digest(bytes.fromhex(file_hash_hex), algorithm).hex()
 
-def compute_internal_hash(left_hex: str, right_hex: str) -> str:
+
+def compute_internal_hash(left_hex: str, right_hex: str, algorithm: str = DEFAULT_ALGORITHM) -> str:
     """
     Compute hash for an internal Merkle node.
-    internal_hash = SHA256(0x01 || left_bytes || right_bytes)
+    internal_hash = H(0x01 || left_bytes || right_bytes)
     """
-    left_bytes = bytes.fromhex(left_hex)
-    right_bytes = bytes.fromhex(right_hex)
-    return hash_node(PREFIX_INTERNAL, left_bytes + right_bytes)
+    return internal_digest(bytes.fromhex(left_hex), bytes.fromhex(right_hex), algorithm).hex()
+
 
-def compute_directory_hash(subdir_root_hex: str) -> str:
+def compute_directory_hash(subdir_root_hex: str, algorithm: str = DEFAULT_ALGORITHM) -> str:
     """
     Compute hash for a directory node (which represents a subdirectory).
-    dir_node = SHA256(0x02 || subdirectory_root_hash_bytes)
+    dir_node = H(0x02 || subdirectory_root_hash_bytes)
     """
-    root_bytes = bytes.fromhex(subdir_root_hex)
-    return hash_node(PREFIX_DIR, root_bytes)
+    return directory_digest(bytes.fromhex(subdir_root_hex), algorithm).hex()
@@ -2,16 +2,122 @@
 Ignore rules for MerkleWatch.
 """
 import os
+import re
 import fnmatch
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import Iterable, List, Optional
+
+GLOB_CHARS = ('*', '?', '[')
+
+
+class PatternMatcher:
+    """
+    Precompiled form of a list of ignore patterns.
+
+    Patterns are bucketed by kind so a path is checked with a few set
+    lookups and at most two regex matches, instead of looping over every
+    pattern:
+
+    - `names`: literal names matched against any path component
+      (simple names and directory patterns without a slash)
+    - `paths`: literal names containing a slash, or anchored to the root by a
+      leading slash (`/.cache`), matched against the whole path
+    - `prefixes`: directory patterns containing or starting with a slash,
+      matched against the path and every ancestor of it
+    - `glob`: all wildcard patterns combined into one regex, matched against
+      the full path and the basename
+    - `dir_glob`: wildcard directory patterns (`*.egg-info/`) combined into
+      one regex, matched against the path and every ancestor of it, each by
+      its full path and its basename
+
+    Results for directory parts are cached, so files sharing a parent only
+    pay for their own basename.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.names = set()
+        self.paths = set()
+        self.prefixes = set()
+        globs = []
+        dir_globs = []
+
+        for pattern in patterns:
+            # A leading slash anchors a literal pattern to the root
+            anchored = pattern.startswith('/') and len(pattern) > 1
+            if anchored:
+                pattern = pattern.lstrip('/')
+
+            # Directory patterns (ending with /) match the directory and anything inside it
+            if pattern.endswith('/'):
+                dir_pattern = pattern.rstrip('/')
+                if any(c in dir_pattern for c in GLOB_CHARS):
+                    dir_globs.append(fnmatch.translate(os.path.normcase(dir_pattern)))
+                elif '/' in dir_pattern or anchored:
+                    self.prefixes.add(dir_pattern)
+                else:
+                    self.names.add(dir_pattern)
+
+            # Glob patterns with wildcards
+            elif any(c in pattern for c in GLOB_CHARS):
+                globs.append(fnmatch.translate(os.path.normcase(pattern)))
+
+            # Simple name patterns
+            elif '/' in pattern or anchored:
+                self.paths.add(pattern)
+            else:
+                self.names.add(pattern)
+
+        self.glob = re.compile('|'.join(globs)).match if globs else None
+        self.dir_glob = re.compile('|'.join(dir_globs)).match if dir_globs else None
+        self._directory_matches = lru_cache(maxsize=4096)(self._match_directory)
+
+    def matches(self, path_str: str) -> bool:
+        """Check a relative POSIX path string against the compiled patterns."""
+        dir_part, _, name = path_str.rpartition('/')
+
+        if name in self.names or path_str in self.paths or path_str in self.prefixes:
+            return True
+
+        if dir_part and self._directory_matches(dir_part):
+            return True
+
+        if self.dir_glob is not None and self._match_dir_glob(path_str, name):
+            return True
+
+        if self.glob is not None:
+            if self.glob(os.path.normcase(path_str)):
+                return True
+            if dir_part and self.glob(os.path.normcase(name)):
+                return True
+
+        return False
+
+    def _match_directory(self, dir_part: str) -> bool:
+        """Check whether a directory, or any of its ancestors, matches a name, prefix or directory glob."""
+        parent, _, name = dir_part.rpartition('/')
+        if name in self.names or dir_part in self.prefixes:
+            return True
+        if self.dir_glob is not None and self._match_dir_glob(dir_part, name):
+            return True
+        return bool(parent) and self._directory_matches(parent)
+
+    def _match_dir_glob(self, path_str: str, name: str) -> bool:
+        return bool(self.dir_glob(os.path.normcase(path_str)) or (name != path_str and self.dir_glob(os.path.normcase(name))))
+
 
 class IgnoreRules:
-    """Handle ignore patterns for file scanning."""
+    """
+    Handle ignore patterns for file scanning.
+
+    Patterns are compiled into a PatternMatcher on first use; modify them
+    through add_pattern/remove_pattern so the compiled form is refreshed.
+    """
     
     def __init__(self, root_path: Path, ignore_file_name: str = ".merkleignore"):
         self.root_path = root_path
         self.patterns: List[str] = []
+        self._matcher: Optional[PatternMatcher] = None
         self.ignore_file = root_path / ignore_file_name
         self.load_ignore_file()
         # Always ignore the ignore file itself
@@ -30,6 +136,14 @@ class IgnoreRules:
             except Exception as e:
                 print(f"Error Loading Ignore file: {self.ignore_file}: {e}")
                 print("Continuing without ignore patterns.")
+        self._matcher = None
+
+    @property
+    def matcher(self) -> PatternMatcher:
+        """The compiled form of the current patterns."""
+        if self._matcher is None:
+            self._matcher = PatternMatcher(self.patterns)
+        return self._matcher
     
     def should_ignore(self, path: Path) -> bool:
         """
@@ -54,49 +168,29 @@ class IgnoreRules:
                 
             # Convert to string with forward slashes for consistency
             path_str = str(rel_path).replace(os.sep, '/')
-            
-            # Check each pattern
-            for pattern in self.patterns:
-                # Handle directory patterns (ending with /)
-                if pattern.endswith('/'):
-                    dir_pattern = pattern.rstrip('/')
-                    
-                    # Match exact directory name or files inside it
-                    if path_str == dir_pattern:
-                        return True
-                    if path_str.startswith(dir_pattern + '/'):
-                        return True
-                        
-                    # Match if any component of the path matches the pattern
-                    parts = path_str.split('/')
-                    if dir_pattern in parts:
-                        return True
-                        
-                # Glob patterns with wildcards
-                elif '*' in pattern or '?' in pattern or '[' in pattern:
-                    # Standard glob matching
-                    if fnmatch.fnmatch(path_str, pattern):
-                        return True
-                    # Also try matching just the basename
-                    if fnmatch.fnmatch(os.path.basename(path_str), pattern):
-                        return True
-                        
-                # Simple name patterns (no wildcards, no slashes)
-                else:
-                    # Check if this exact name appears in the path
-                    parts = path_str.split('/')
-                    if pattern in parts:
-                        return True
-                    # Also try exact path match
-                    if path_str == pattern:
-                        return True
 
-            return False
+            return self.should_ignore_relative(path_str)
             
         except ValueError:
             # Path is not relative to root
             return False
-        
+
+    def should_ignore_relative(self, path_str: str) -> bool:
+        """
+        Check if a relative POSIX path string should be ignored.
+
+        Args:
+            path_str: Path relative to root, using '/' separators
+
+        Returns:
+            True if path should be ignored
+        """
+        # No patterns means nothing is ignored
+        if not self.patterns:
+            return False
+
+        return self.matcher.matches(path_str)
+    
     def save(self):
         """Save patterns to .merkleignore file."""
         try:
@@ -114,8 +208,10 @@ class IgnoreRules:
         """Add a pattern if it doesn't exist."""
         if pattern not in self.patterns:
             self.patterns.append(pattern)
+            self._matcher = None
             
     def remove_pattern(self, pattern: str):
         """Remove a pattern if it exists."""
         if pattern in self.patterns:
             self.patterns.remove(pattern)
+            self._matcher = None
@@ -0,0 +1,124 @@
+"""
+Incremental scanning support for MerkleWatch.
+
+A baseline manifest lets `scan_directory` skip hashing files whose stat
+signature is unchanged since the baseline was taken, reusing the stored
+`content_hash` instead. Directories whose fingerprint is unchanged reuse
+the stored subtree `root_hash` instead of rebuilding their Merkle tree.
+"""
+import os
+from typing import Dict, Any, List, Optional, Tuple
+from .hashing import get_algorithm, DEFAULT_ALGORITHM
+
+
+class DirectoryFingerprint:
+    """
+    Digest of a directory's listing and the stat signatures below it.
+
+    Files contribute their name, size and mtime (ns); subdirectories their
+    name and their own fingerprint, so a renamed, added or touched entry
+    anywhere below changes the fingerprint of every ancestor. Subdirectory
+    fingerprints are folded in by the first hexdigest() call, once the
+    subtree is complete; until then they may still be filling up.
+
+    This is a change-detection hint, not part of the Merkle tree; it uses the
+    scan's hash algorithm so it has the same digest size as the tree hashes.
+    """
+
+    def __init__(self, algorithm: str = DEFAULT_ALGORITHM):
+        self._hasher = get_algorithm(algorithm).new()
+        self._subdirectories: List[Tuple[str, 'DirectoryFingerprint']] = []
+        self._digest: Optional[str] = None
+
+    def add_file(self, name: str, stat: os.stat_result):
+        self._hasher.update(b'f' + os.fsencode(name) + b'\x00' + f"{stat.st_size}:{stat.st_mtime_ns}".encode() + b'\n')
+
+    def add_directory(self, name: str, fingerprint: 'DirectoryFingerprint'):
+        self._subdirectories.append((name, fingerprint))
+
+    def hexdigest(self) -> str:
+        if self._digest is None:
+            for name, fingerprint in self._subdirectories:
+                self._hasher.update(b'd' + os.fsencode(name) + b'\x00' + fingerprint.hexdigest().encode() + b'\n')
+            self._subdirectories = []
+            self._digest = self._hasher.hexdigest()
+        return self._digest
+
+
+class Baseline:
+    """
+    Reuse file hashes from a previous manifest when metadata is unchanged.
+
+    A file is considered unchanged when its size and mtime match the baseline
+    entry. Optionally the ctime and the inode/device pair must match as well,
+    which catches tools that restore mtimes after rewriting a file.
+
+    Metadata is not cryptographically verified, so `paranoid_ratio` re-hashes
+    a random fraction of the files that would otherwise be reused.
+
+    Hashes can only be reused by a scan with the baseline's `algorithm` and
+    `chunk_size`.
+    """
+
+    def __init__(self, manifest: Dict[str, Any], check_ctime: bool = False, check_inode: bool = False, paranoid_ratio: float = 0.0):
+        self.files: Dict[str, Dict[str, Any]] = manifest.get('files', {})
+        self.directories: Dict[str, Dict[str, Any]] = manifest.get('directories', {})
+        self.algorithm: str = manifest.get('algorithm', DEFAULT_ALGORITHM)
+        self.chunk_size: Optional[int] = manifest.get('chunk_size')
+        self.check_ctime = check_ctime
+        self.check_inode = check_inode
+        self.paranoid_ratio = paranoid_ratio
+        if paranoid_ratio:
+            import random
+            self._random = random.random
+        self.hits = 0
+        self.misses = 0
+        self.directory_hits = 0
+
+    def lookup(self, relative_path: str, stat: os.stat_result) -> Optional[Dict[str, Any]]:
+        """
+        Return the baseline entry for a file if its hash can be reused.
+
+        Args:
+            relative_path: POSIX path of the file relative to the scan root
+            stat: Current stat result of the file
+
+        Returns:
+            The baseline file entry, or None if the file must be hashed
+        """
+        entry = self.files.get(relative_path)
+        if entry is None or not self._matches(entry, stat):
+            self.misses += 1
+            return None
+
+        if self.paranoid_ratio and self._random() < self.paranoid_ratio:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry
+
+    def lookup_directory(self, relative_path: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the baseline entry for a directory if its fingerprint is unchanged.
+
+        A matching fingerprint only covers the directory's own listing; the
+        caller must still confirm that every child resolved to its baseline hash
+        before reusing the stored `root_hash`.
+        """
+        entry = self.directories.get(relative_path)
+        if entry is None or entry.get('fingerprint') != fingerprint:
+            return None
+        return entry
+
+    def _matches(self, entry: Dict[str, Any], stat: os.stat_result) -> bool:
+        if entry.get('size') != stat.st_size or entry.get('mtime') != stat.st_mtime:
+            return False
+
+        if self.check_ctime and entry.get('ctime') != stat.st_ctime:
+            return False
+
+        if self.check_inode and (entry.get('inode') != stat.st_ino or entry.get('dev') != stat.st_dev):
+            return False
+
+        return True
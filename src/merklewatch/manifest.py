@@ -1,25 +1,202 @@
+import io
 import json
+import os
 import time
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Optional, TextIO
+from .compress import codec_for_path, detect_codec, open_compressed, strip_codec_suffix
+from .hashing import DEFAULT_ALGORITHM
 
-def create_manifest_structure(root_hash: str, manifest_data: Dict[str, Any]) -> Dict[str, Any]:
+MANIFEST_VERSION = "1.0.0"
+
+# Marker in the first line of a JSON Lines manifest
+JSONL_FORMAT = "jsonl"
+
+MANIFEST_FORMATS = ("json", "jsonl", "binary")
+
+# Extensions that select a format when none is given explicitly
+_FORMAT_EXTENSIONS = {".jsonl": "jsonl", ".mwb": "binary"}
+
+
+def _header(algorithm: str, chunk_size: Optional[int]) -> Dict[str, Any]:
+    header = {
+        "merklewatch_version": MANIFEST_VERSION,
+        "algorithm": algorithm,
+        "timestamp": time.time(),
+        "timestamp_iso": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    if chunk_size is not None:
+        header["chunk_size"] = chunk_size
+    return header
+
+def create_manifest_structure(root_hash: str, manifest_data: Dict[str, Any], algorithm: str = DEFAULT_ALGORITHM, chunk_size: Optional[int] = None) -> Dict[str, Any]:
     """
     Assemble the final manifest dictionary.
+
+    `chunk_size` is recorded when large files were hashed as chunk trees.
     """
     return {
-        "merklewatch_version": "1.0.0",
-        "algorithm": "sha256",
-        "timestamp": time.time(),
-        "timestamp_iso": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        **_header(algorithm, chunk_size),
         "root_hash": root_hash,
         "files": manifest_data.get('files', {}),
         "directories": manifest_data.get('directories', {})
     }
 
-def save_manifest(manifest: Dict[str, Any], output_path: Path):
+def _open_text(path: Path, mode: str, codec: Optional[str] = None, compression_level: Optional[int] = None) -> TextIO:
+    """Open a (possibly compressed) manifest as a UTF-8 text stream."""
+    return io.TextIOWrapper(open_compressed(path, mode, codec, compression_level), encoding='utf-8')
+
+def save_manifest(manifest: Dict[str, Any], output_path: Path, compression_level: Optional[int] = None):
     """
     Save the manifest to a JSON file.
+
+    The output is compressed when `output_path` has a compression extension
+    (`.gz`, `.xz`, `.zst`).
     """
-    with open(output_path, 'w') as f:
+    with _open_text(output_path, 'wb', codec_for_path(output_path), compression_level) as f:
         json.dump(manifest, f, indent=2, sort_keys=True)
+
+def format_for_path(output_path: Path) -> str:
+    """Pick a manifest format from a file extension, defaulting to JSON."""
+    return _FORMAT_EXTENSIONS.get(strip_codec_suffix(output_path).suffix, "json")
+
+def write_manifest(manifest: Dict[str, Any], output_path: Path, manifest_format: Optional[str] = None, compression_level: Optional[int] = None):
+    """
+    Save a complete manifest in any supported format.
+
+    Args:
+        manifest: Manifest structure (files/directories may be lazy mappings)
+        output_path: Destination file; a `.gz`, `.xz` or `.zst` extension
+            compresses the output
+        manifest_format: 'json', 'jsonl' or 'binary'; detected from the
+            extension when omitted
+        compression_level: Codec-specific level for compressed outputs
+    """
+    manifest_format = manifest_format or format_for_path(output_path)
+
+    if manifest_format == "binary":
+        from .binary_manifest import save_binary_manifest
+        save_binary_manifest(manifest, output_path, compression_level)
+    elif manifest_format == "jsonl":
+        metadata = {k: v for k, v in manifest.items() if k not in ('files', 'directories', 'root_hash')}
+        writer = ManifestWriter(output_path, metadata, compression_level)
+        try:
+            for path in sorted(manifest['directories']):
+                writer.write_directory(path, dict(manifest['directories'][path]))
+            for path in sorted(manifest['files']):
+                writer.write_file(path, dict(manifest['files'][path]))
+        except BaseException:
+            writer.abort()
+            raise
+        writer.close(manifest['root_hash'])
+    elif manifest_format == "json":
+        plain = dict(manifest)
+        plain['files'] = {path: dict(entry) for path, entry in manifest['files'].items()}
+        plain['directories'] = {path: dict(entry) for path, entry in manifest['directories'].items()}
+        save_manifest(plain, output_path, compression_level)
+    else:
+        raise ValueError(f"Unknown manifest format: {manifest_format}")
+
+
+class ManifestWriter:
+    """
+    Streaming JSON Lines manifest writer.
+
+    Entries are written one per line as soon as the scanner finishes a
+    directory, so memory stays bounded by tree depth instead of file count.
+    The first line is a header, followed by `file` and `directory` records
+    in scan order (post-order, sorted within each directory), and a final
+    line carrying the `root_hash`.
+
+    Output goes to a temporary file that replaces `output_path` on close,
+    so an interrupted scan never leaves a truncated manifest behind.
+
+    `metadata` overrides the header fields, e.g. when converting an
+    existing manifest. A compression extension on `output_path` compresses
+    the stream as it is written. `algorithm` and `chunk_size` are recorded in
+    the default header.
+    """
+
+    def __init__(self, output_path: Path, metadata: Optional[Dict[str, Any]] = None, compression_level: Optional[int] = None, algorithm: str = DEFAULT_ALGORITHM, chunk_size: Optional[int] = None):
+        self.output_path = output_path
+        self._tmp_path = Path(f"{output_path}.tmp")
+        self._file = _open_text(self._tmp_path, 'wb', codec_for_path(output_path), compression_level)
+        self.files_written = 0
+        self.directories_written = 0
+        header = metadata if metadata is not None else _header(algorithm, chunk_size)
+        self._write({**header, "merklewatch_format": JSONL_FORMAT})
+
+    def _write(self, record: Dict[str, Any]):
+        self._file.write(json.dumps(record, sort_keys=True))
+        self._file.write('\n')
+
+    def write_file(self, relative_path: str, entry: Dict[str, Any]):
+        self._write({"type": "file", "path": relative_path, **entry})
+        self.files_written += 1
+
+    def write_directory(self, relative_path: str, entry: Dict[str, Any]):
+        self._write({"type": "directory", "path": relative_path, **entry})
+        self.directories_written += 1
+
+    def close(self, root_hash: str):
+        """Write the trailer and atomically move the manifest into place."""
+        self._write({"type": "root", "root_hash": root_hash})
+        self._file.close()
+        os.replace(self._tmp_path, self.output_path)
+
+    def abort(self):
+        """Discard a partially written manifest."""
+        self._file.close()
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+
+def _iter_jsonl(f) -> Iterator[Dict[str, Any]]:
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+
+def load_manifest(manifest_path: Path) -> Dict[str, Any]:
+    """
+    Load a manifest into the standard dictionary structure.
+
+    The indented JSON, streaming JSON Lines and binary formats are accepted,
+    optionally gzip/xz/zstd compressed; the compression and format are
+    detected from the magic bytes or the first line. Compressed manifests
+    are decompressed as a stream. Binary manifests are opened via mmap and
+    their `files`/`directories` are lazy read-only mappings that
+    binary-search on access.
+    """
+    from .binary_manifest import is_binary_manifest, load_binary_manifest
+
+    codec = detect_codec(manifest_path)
+    if is_binary_manifest(manifest_path, codec):
+        return load_binary_manifest(manifest_path)
+
+    with _open_text(manifest_path, 'rb', codec) as f:
+        first_line = f.readline()
+        try:
+            header = json.loads(first_line)
+        except ValueError:
+            header = None
+
+        if not isinstance(header, dict) or header.get("merklewatch_format") != JSONL_FORMAT:
+            return json.loads(first_line + f.read())
+
+        manifest = {key: value for key, value in header.items() if key != "merklewatch_format"}
+        files = manifest["files"] = {}
+        directories = manifest["directories"] = {}
+
+        for record in _iter_jsonl(f):
+            kind = record.pop("type", None)
+            if kind == "file":
+                files[record.pop("path")] = record
+            elif kind == "directory":
+                directories[record.pop("path")] = record
+            elif kind == "root":
+                manifest["root_hash"] = record["root_hash"]
+
+        return manifest
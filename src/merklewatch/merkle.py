@@ -1,31 +1,118 @@
-from typing import List
-from .hashing import compute_internal_hash
+from typing import List, Tuple, Union
+from .hashing import compute_internal_hash, get_algorithm, DEFAULT_ALGORITHM
 
-def compute_merkle_root(hashes: List[str]) -> str:
+def compute_merkle_root_digest(digests: Union[bytes, bytearray, memoryview], algorithm: str = DEFAULT_ALGORITHM) -> bytes:
+    """
+    Compute the Merkle root of raw digests packed back to back in one buffer.
+
+    Each level is hashed in place in a single working copy of the buffer:
+    a pair of siblings is already contiguous, so it is fed to a copy of the
+    prefixed internal-node hasher as one memoryview slice and the parent is
+    written over the start of the buffer. An odd last node is paired with
+    itself. The input buffer is not modified.
+
+    Args:
+        digests: Concatenated child digests, in tree order
+        algorithm: Registered hash algorithm; fixes the digest size
+
+    Returns:
+        The raw root digest
+    """
+    hash_algorithm = get_algorithm(algorithm)
+    digest_size = hash_algorithm.digest_size
+    new_hasher = hash_algorithm.internal_hasher
+
+    count = len(digests) // digest_size
+    if count == 0:
+        # Empty tree case
+        return new_hasher().digest()
+
+    level = bytearray(digests)
+    view = memoryview(level)
+    pair_size = 2 * digest_size
+
+    while count > 1:
+        pairs_end = (count // 2) * pair_size
+
+        for start in range(0, pairs_end, pair_size):
+            hasher = new_hasher()
+            hasher.update(view[start:start + pair_size])
+            parent = start // 2
+            view[parent:parent + digest_size] = hasher.digest()
+
+        # If odd, the last node is hashed with a duplicate of itself
+        if count % 2 != 0:
+            last = view[pairs_end:pairs_end + digest_size]
+            hasher = new_hasher()
+            hasher.update(last)
+            hasher.update(last)
+            parent = pairs_end // 2
+            view[parent:parent + digest_size] = hasher.digest()
+
+        count = (count + 1) // 2
+
+    root = bytes(view[:digest_size])
+    view.release()
+    return root
+
+def compute_merkle_root(hashes: List[str], algorithm: str = DEFAULT_ALGORITHM) -> str:
     """
     Compute the Merkle root for a list of hashes.
     The hashes should already be sorted (e.g., by filename) before calling this.
+
+    The hex digests are decoded into one contiguous buffer and the tree is
+    built by compute_merkle_root_digest; the input list is not modified.
     """
-    if not hashes:
-        # Empty tree case
-        from .hashing import hash_node, PREFIX_INTERNAL
-        return hash_node(PREFIX_INTERNAL, b'')
+    return compute_merkle_root_digest(bytes.fromhex(''.join(hashes)), algorithm).hex()
+
+def compute_merkle_path(hashes: List[str], index: int, algorithm: str = DEFAULT_ALGORITHM) -> List[Tuple[str, str]]:
+    """
+    Compute the sibling path from one leaf up to the Merkle root.
+
+    Mirrors compute_merkle_root level by level (including the odd-level
+    duplication), so folding the path with compute_root_from_path yields the
+    same root. The input list is not modified.
+
+    Args:
+        hashes: The level hashes, in the same order given to compute_merkle_root
+        index: Position of the leaf whose path is wanted
+
+    Returns:
+        One (side, sibling_hash) pair per level, bottom-up. `side` is 'L' when
+        the sibling is the left operand and 'R' when it is the right one.
+    """
+    if not 0 <= index < len(hashes):
+        raise IndexError(f"Leaf index {index} out of range for {len(hashes)} hashes")
 
-    current_level = hashes
+    path = []
+    current_level = list(hashes)
 
     while len(current_level) > 1:
-        next_level = []
-        
-        # If odd, duplicate last
         if len(current_level) % 2 != 0:
             current_level.append(current_level[-1])
-        
-        for i in range(0, len(current_level), 2):
-            left = current_level[i]
-            right = current_level[i+1]
-            parent = compute_internal_hash(left, right)
-            next_level.append(parent)
-        
-        current_level = next_level
-
-    return current_level[0]
+
+        sibling = index ^ 1
+        path.append(('L' if sibling < index else 'R', current_level[sibling]))
+
+        current_level = [
+            compute_internal_hash(current_level[i], current_level[i+1], algorithm)
+            for i in range(0, len(current_level), 2)
+        ]
+        index //= 2
+
+    return path
+
+def compute_root_from_path(leaf_hash: str, path: List[Tuple[str, str]], algorithm: str = DEFAULT_ALGORITHM) -> str:
+    """
+    Fold a sibling path from compute_merkle_path back up to a Merkle root.
+    Costs one internal hash per level.
+    """
+    current = leaf_hash
+    for side, sibling in path:
+        if side == 'L':
+            current = compute_internal_hash(sibling, current, algorithm)
+        elif side == 'R':
+            current = compute_internal_hash(current, sibling, algorithm)
+        else:
+            raise ValueError(f"Invalid sibling side: {side!r}")
+    return current
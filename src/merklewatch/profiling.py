@@ -0,0 +1,299 @@
+"""
+Scan instrumentation for MerkleWatch.
+
+A ScanProfile collects the time spent per phase of a scan (listing,
+lstat, ignore matching, hashing, Merkle building, manifest writing),
+syscall counts, throughput, and the slowest directories and largest
+files. It is filled by a profiled subclass of the scanner that wraps the
+scanner's listing, stat and Merkle steps, its ignore rules and its file
+hasher, so scans without a profile run the unmodified code and pay
+nothing for it.
+
+`profiler_dump()` additionally records a cProfile (`.pstats`) or, with the
+optional `pyinstrument` package (`pip install merklewatch[profile]`), an
+HTML call tree of the whole command.
+"""
+import heapq
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from .hashing import FileHasher
+from .ignore import IgnoreRules
+
+PHASES = ('list', 'stat', 'ignore', 'hash', 'merkle', 'manifest')
+
+# Entries shown in the slowest directory and largest file tables
+DEFAULT_TOP = 10
+
+_PHASE_LABELS = {
+    'list': 'Directory listing (scandir)',
+    'stat': 'File lstat',
+    'ignore': 'Ignore matching',
+    'hash': 'Hashing (summed over threads)',
+    'merkle': 'Merkle building',
+    'manifest': 'Manifest writing',
+}
+
+
+def _format_bytes(size: float) -> str:
+    for unit in ('B', 'KB', 'MB', 'GB', 'TB'):
+        if size < 1024 or unit == 'TB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class ScanProfile:
+    """
+    Timings and counters of one scan and what follows it.
+
+    Hashing runs on worker threads, so its time is summed over threads and
+    can exceed the wall time; every other phase runs on the scanning thread
+    (or, with io_concurrency, on the listing threads). Updates are locked.
+    """
+
+    def __init__(self, top: int = DEFAULT_TOP):
+        self.top = top
+        self.phases: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.counts: Dict[str, int] = dict.fromkeys(('scandir', 'lstat', 'open', 'files', 'directories', 'bytes', 'bytes_hashed'), 0)
+        self.wall = 0.0
+        self.root: Optional[str] = None
+        self._directory_times: Dict[str, float] = defaultdict(float)
+        self._largest: List[Tuple[int, str]] = []
+        self._started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        self._started = time.perf_counter()
+
+    def stop(self):
+        if self._started is not None:
+            self.wall += time.perf_counter() - self._started
+            self._started = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a block as part of a phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, phase: str, seconds: float, count: Optional[str] = None, directory: Optional[str] = None):
+        """Add time to a phase, optionally counting one `count` event and charging `directory`."""
+        with self._lock:
+            self.phases[phase] += seconds
+            if count is not None:
+                self.counts[count] += 1
+            if directory is not None:
+                self._directory_times[directory] += seconds
+
+    def record_file(self, relative_path: str, size: int, seconds: float = 0.0):
+        """Count a file recorded in the manifest, with the time taken to write its entry."""
+        with self._lock:
+            self.phases['manifest'] += seconds
+            self.counts['files'] += 1
+            self.counts['bytes'] += size
+            if len(self._largest) < self.top:
+                heapq.heappush(self._largest, (size, relative_path))
+            elif size > self._largest[0][0]:
+                heapq.heapreplace(self._largest, (size, relative_path))
+
+    def record_hash(self, size: int):
+        with self._lock:
+            self.counts['bytes_hashed'] += size
+
+    def slowest_directories(self) -> List[Tuple[str, float]]:
+        """The directories with the most listing and lstat time, slowest first."""
+        slowest = heapq.nlargest(self.top, self._directory_times.items(), key=lambda item: item[1])
+        if self.root is None:
+            return slowest
+        return [(os.path.relpath(path, self.root), seconds) for path, seconds in slowest]
+
+    def largest_files(self) -> List[Tuple[str, int]]:
+        return [(path, size) for size, path in sorted(self._largest, reverse=True)]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The profile as JSON-serializable data."""
+        return {
+            'wall_seconds': self.wall,
+            'phases': dict(self.phases),
+            'counts': dict(self.counts),
+            'files_per_second': self.counts['files'] / self.wall if self.wall else None,
+            'bytes_hashed_per_second': self.counts['bytes_hashed'] / self.wall if self.wall else None,
+            'slowest_directories': [{'path': path, 'seconds': seconds} for path, seconds in self.slowest_directories()],
+            'largest_files': [{'path': path, 'size': size} for path, size in self.largest_files()],
+        }
+
+    def save(self, output_path: Path):
+        with open(output_path, 'w') as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+    def format(self) -> str:
+        """A human-readable summary."""
+        counts = self.counts
+        hashed = counts['open']
+        lines = [
+            f"Scan profile ({self.wall:.3f} s wall)",
+            f"  Files:       {counts['files']:,} ({hashed:,} hashed, {counts['files'] - hashed:,} reused), {_format_bytes(counts['bytes'])}",
+            f"  Directories: {counts['directories']:,}",
+            f"  Syscalls:    {counts['scandir']:,} scandir, {counts['lstat']:,} lstat, {counts['open']:,} open",
+        ]
+        if self.wall:
+            lines.append(f"  Throughput:  {counts['files'] / self.wall:,.0f} files/s, {_format_bytes(counts['bytes_hashed'] / self.wall)}/s hashed")
+        lines.append("  Phases:")
+        for phase in PHASES:
+            seconds = self.phases[phase]
+            share = f"{100 * seconds / self.wall:5.1f}%" if self.wall else ''
+            lines.append(f"    {_PHASE_LABELS[phase]:<30} {seconds:9.3f} s {share}")
+
+        slowest = self.slowest_directories()
+        if slowest:
+            lines.append("  Slowest directories (listing + lstat):")
+            lines += [f"    {seconds:9.3f} s  {path}" for path, seconds in slowest]
+        largest = self.largest_files()
+        if largest:
+            lines.append("  Largest files:")
+            lines += [f"    {_format_bytes(size):>10}  {path}" for path, size in largest]
+        return "\n".join(lines)
+
+
+class _TimedIgnoreRules:
+    """IgnoreRules proxy timing should_ignore_relative()."""
+
+    def __init__(self, ignore_rules: IgnoreRules, profile: ScanProfile):
+        self._ignore_rules = ignore_rules
+        self._profile = profile
+
+    def should_ignore_relative(self, path_str: str) -> bool:
+        start = time.perf_counter()
+        try:
+            return self._ignore_rules.should_ignore_relative(path_str)
+        finally:
+            self._profile.add('ignore', time.perf_counter() - start)
+
+    def __getattr__(self, name: str):
+        return getattr(self._ignore_rules, name)
+
+
+class _TimedFileHasher(FileHasher):
+    """A FileHasher that counts and times each file it hashes (on the calling thread)."""
+
+    def __init__(self, file_hasher: FileHasher, profile: ScanProfile):
+        super().__init__(file_hasher.buffer_size, file_hasher.strategy, file_hasher.drop_cache, file_hasher.algorithm, file_hasher.chunk_size)
+        self.profile = profile
+
+    def __call__(self, filepath: Path, size: Optional[int] = None) -> str:
+        start = time.perf_counter()
+        try:
+            return super().__call__(filepath, size)
+        finally:
+            self.profile.add('hash', time.perf_counter() - start, count='open')
+            if size is not None:
+                self.profile.record_hash(size)
+
+    def submit(self, executor, filepath: Path, size: int):
+        if not self.is_chunked(size):
+            return executor.submit(self, filepath, size)
+        # Chunks are read on the pool by chunking.py: count the file, not the chunk time
+        self.profile.add('hash', 0.0, count='open')
+        self.profile.record_hash(size)
+        return super().submit(executor, filepath, size)
+
+
+class _ProfiledScanner:
+    """Mixin timing a scanner's steps into a ScanProfile; see profiled_scanner()."""
+
+    def __init__(self, *args, profile: ScanProfile, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.profile = profile
+        profile.root = os.fspath(self.root_path)
+        if self.ignore_rules is not None:
+            self.ignore_rules = _TimedIgnoreRules(self.ignore_rules, profile)
+        self.file_hasher = _TimedFileHasher(self.file_hasher, profile)
+
+    def _list_entries(self, current_path: str, relative_dir: str) -> List[os.DirEntry]:
+        start = time.perf_counter()
+        try:
+            return super()._list_entries(current_path, relative_dir)
+        finally:
+            self.profile.add('list', time.perf_counter() - start, count='scandir', directory=current_path)
+
+    def _stat(self, entry: os.DirEntry, relative_path: str) -> os.stat_result:
+        start = time.perf_counter()
+        try:
+            return super()._stat(entry, relative_path)
+        finally:
+            self.profile.add('stat', time.perf_counter() - start, count='lstat', directory=entry.path.rpartition(os.sep)[0])
+
+    def _merkle_root(self, child_digests: bytearray) -> str:
+        start = time.perf_counter()
+        try:
+            return super()._merkle_root(child_digests)
+        finally:
+            self.profile.add('merkle', time.perf_counter() - start)
+
+    def _record_file(self, relative_path: str, entry: Dict[str, Any]):
+        start = time.perf_counter()
+        super()._record_file(relative_path, entry)
+        self.profile.record_file(relative_path, entry['size'], time.perf_counter() - start)
+
+    def _record_directory(self, relative_path: str, entry: Dict[str, Any]):
+        start = time.perf_counter()
+        try:
+            super()._record_directory(relative_path, entry)
+        finally:
+            self.profile.add('manifest', time.perf_counter() - start, count='directories')
+
+
+_profiled_classes: Dict[type, type] = {}
+
+
+def profiled_scanner(scanner_class: type) -> type:
+    """The subclass of a scanner class that records into the ScanProfile passed as `profile=`."""
+    if scanner_class not in _profiled_classes:
+        _profiled_classes[scanner_class] = type(f"_Profiled{scanner_class.__name__.lstrip('_')}", (_ProfiledScanner, scanner_class), {})
+    return _profiled_classes[scanner_class]
+
+
+@contextmanager
+def profiler_dump(output_path: Optional[Path]) -> Iterator[None]:
+    """
+    Run a block under cProfile, writing `.pstats` data to output_path, or
+    under pyinstrument if output_path ends in `.html`. Does nothing if
+    output_path is None.
+
+    Raises:
+        ImportError: If an HTML profile is requested without pyinstrument
+    """
+    if output_path is None:
+        yield
+        return
+
+    if output_path.suffix == '.html':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise ImportError("HTML profiles require the 'pyinstrument' package: pip install merklewatch[profile]")
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            output_path.write_text(profiler.output_html())
+        return
+
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(output_path)
@@ -0,0 +1,277 @@
+"""
+Progress and ETA reporting for MerkleWatch scans.
+
+Before hashing starts, a metadata pre-pass walks the tree (scandir and
+lstat only, with the scan's ignore rules) to total the files and bytes the
+scan will cover. The scan then reports every file as its hash resolves,
+whether hashed, reused from a baseline or found in the hash cache, and
+progress is measured in bytes so one large file weighs as much as many
+small ones.
+
+The pre-pass keeps the sorted listings it made, keyed by relative path,
+and the scan takes them instead of listing the tree a second time. Its
+lstat results are handed over too when nothing but the manifest depends
+on them. A baseline or hash cache reuses a hash whenever the stat still
+matches, so with either one the scan lstats each file again when it gets
+to it; otherwise a file changed in between is recorded with a stat older
+than its hash, and the next baseline or cache lookup sees the newer mtime
+and hashes it again. At most `DEFAULT_MAX_CACHED_ENTRIES` entries are
+kept; directories beyond that are listed again by the scan.
+
+The progress subclass wraps the profiled one, so a `--profile` report
+counts the pre-pass syscalls once and the reused listings and stats not
+at all.
+
+Progress is reported on stderr as a bar with throughput and ETA, redrawn
+at most every `BAR_INTERVAL` seconds, and/or as one JSON object per line
+every `interval` seconds for job schedulers.
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+import typer
+from .profiling import _format_bytes
+
+# Seconds between redraws of the progress bar
+BAR_INTERVAL = 0.2
+
+# Directory entries the pre-pass keeps for the scan to reuse
+DEFAULT_MAX_CACHED_ENTRIES = 1_000_000
+
+_BAR_WIDTH = 30
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+class ScanProgress:
+    """
+    Totals from the pre-pass and the files and bytes done so far.
+
+    `advance()` is called from hashing threads; updates and rendering are
+    locked, and rendering is skipped until the next interval is due, so a
+    file costs one clock read and a few additions.
+    """
+
+    def __init__(self, bar: bool = True, interval: Optional[float] = None, max_cached_entries: int = DEFAULT_MAX_CACHED_ENTRIES):
+        """
+        Args:
+            bar: Draw a progress bar on stderr.
+            interval: If set, print a JSON progress line on stderr every
+                this many seconds (and one when the scan finishes).
+            max_cached_entries: Directory entries the pre-pass keeps for the
+                scan to reuse.
+        """
+        self.bar = bar
+        self.interval = interval
+        self.max_cached_entries = max_cached_entries
+        self.total_files = 0
+        self.total_bytes = 0
+        self.files = 0
+        self.bytes = 0
+        self.count_seconds = 0.0
+        self._started: Optional[float] = None
+        self._next_bar = 0.0
+        self._next_line = 0.0
+        self._bar_drawn = False
+        self._lock = threading.Lock()
+
+    def counted(self, files: int, size: int, seconds: float):
+        """Record the pre-pass totals and start the clock for throughput and ETA."""
+        self.total_files = files
+        self.total_bytes = size
+        self.count_seconds = seconds
+        self._started = time.monotonic()
+        # The first redraw waits for a meaningful throughput
+        self._next_bar = self._started + BAR_INTERVAL
+        self._next_line = self._started + self.interval if self.interval else 0.0
+        if self.bar:
+            typer.echo(f"Found {files:,} files, {_format_bytes(size)} ({seconds:.1f} s)", err=True)
+        if self.interval:
+            typer.echo(json.dumps(dict(self.as_dict(self._started), event='counted', count_seconds=round(seconds, 3))), err=True)
+
+    def advance(self, size: int):
+        """Count one finished file of `size` bytes."""
+        now = time.monotonic()
+        with self._lock:
+            self.files += 1
+            self.bytes += size
+            if self.bar and now >= self._next_bar:
+                self._next_bar = now + BAR_INTERVAL
+                self._draw_bar(now)
+            if self.interval and now >= self._next_line:
+                self._next_line = now + self.interval
+                self._emit_line(now)
+
+    def finish(self):
+        """Draw the final state and end the bar's line."""
+        now = time.monotonic()
+        with self._lock:
+            if self.bar:
+                self._draw_bar(now)
+                typer.echo(err=True)
+                self._bar_drawn = False
+            if self.interval:
+                self._emit_line(now, done=True)
+
+    def as_dict(self, now: Optional[float] = None, done: bool = False) -> Dict[str, Any]:
+        """The current progress as JSON-serializable data."""
+        elapsed = (now or time.monotonic()) - self._started if self._started is not None else 0.0
+        rate = self.bytes / elapsed if elapsed else None
+        remaining = max(0, self.total_bytes - self.bytes)
+        return {
+            'event': 'done' if done else 'progress',
+            'files_done': self.files,
+            'files_total': self.total_files,
+            'bytes_done': self.bytes,
+            'bytes_total': self.total_bytes,
+            'percent': round(100 * self.fraction(), 2),
+            'elapsed_seconds': round(elapsed, 3),
+            'bytes_per_second': round(rate) if rate is not None else None,
+            'eta_seconds': round(remaining / rate, 1) if rate else None,
+        }
+
+    def fraction(self) -> float:
+        """Share of the work done, by bytes (by files if the tree is empty)."""
+        if self.total_bytes:
+            return min(1.0, self.bytes / self.total_bytes)
+        if self.total_files:
+            return min(1.0, self.files / self.total_files)
+        return 1.0
+
+    def format_bar(self, now: Optional[float] = None) -> str:
+        state = self.as_dict(now)
+        filled = int(_BAR_WIDTH * self.fraction())
+        line = (f"{state['percent']:5.1f}% [{'#' * filled}{'-' * (_BAR_WIDTH - filled)}] "
+                f"{self.files:,}/{self.total_files:,} files  {_format_bytes(self.bytes)}/{_format_bytes(self.total_bytes)}")
+        if state['bytes_per_second'] is not None:
+            line += f"  {_format_bytes(state['bytes_per_second'])}/s"
+        if state['eta_seconds'] is not None:
+            line += f"  ETA {_format_duration(state['eta_seconds'])}"
+        return line
+
+    def _draw_bar(self, now: float):
+        typer.echo(f"\r{self.format_bar(now)}\033[K", err=True, nl=False)
+        self._bar_drawn = True
+
+    def _emit_line(self, now: float, done: bool = False):
+        # Start on a fresh line if the bar is on screen, and redraw it below
+        prefix = "\r\033[K" if self._bar_drawn else ""
+        typer.echo(prefix + json.dumps(self.as_dict(now, done)), err=True)
+        if self._bar_drawn and not done:
+            self._draw_bar(now)
+
+
+class _PathEntry:
+    """
+    The `path` and `stat()` of a DirEntry, without its lstat cache, so a
+    pre-pass stat does not become the one the scan reads from the entry.
+    """
+
+    __slots__ = ('path',)
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def stat(self, follow_symlinks: bool = True) -> os.stat_result:
+        return os.stat(self.path, follow_symlinks=follow_symlinks)
+
+
+class _ProgressScanner:
+    """Mixin running the metadata pre-pass and reporting resolved files; see progress_scanner()."""
+
+    def __init__(self, *args, progress: ScanProgress, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.progress = progress
+        self._listings: Dict[str, List[os.DirEntry]] = {}
+        self._stats: Dict[str, os.stat_result] = {}
+
+    def scan(self, current_path) -> str:
+        relative_path = current_path.relative_to(self.root_path).as_posix()
+        self._precount(os.fspath(current_path), '' if relative_path == '.' else relative_path)
+        try:
+            return super().scan(current_path)
+        finally:
+            self._listings = {}
+            self._stats = {}
+            self.progress.finish()
+
+    def _precount(self, current_path: str, relative_dir: str):
+        """
+        Walk the tree as the scan will (same ignore rules, symlinks skipped)
+        and total its files and bytes, keeping listings (and, without a
+        baseline or cache, stats) for the scan. Errors are left for the scan
+        to report.
+        """
+        start = time.monotonic()
+        keep_stats = self.baseline is None and self.cache is None
+        files = 0
+        size = 0
+        cached = 0
+        stack = [(current_path, relative_dir)]
+        while stack:
+            path, relative = stack.pop()
+            try:
+                entries = self._list_entries(path, relative)
+            except OSError:
+                continue
+            if cached + len(entries) <= self.progress.max_cached_entries:
+                self._listings[relative] = entries
+                cached += len(entries)
+            prefix = relative + '/' if relative else ''
+            for entry in entries:
+                relative_path = prefix + entry.name
+                if self.ignore_rules and self.ignore_rules.should_ignore_relative(relative_path):
+                    continue
+                try:
+                    if entry.is_symlink():
+                        continue
+                    if entry.is_file(follow_symlinks=False):
+                        if keep_stats and relative in self._listings:
+                            stat = self._stats[relative_path] = self._stat(entry, relative_path)
+                        else:
+                            stat = self._stat(_PathEntry(entry.path), relative_path)
+                        size += stat.st_size
+                        files += 1
+                    elif entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, relative_path))
+                except OSError:
+                    continue
+        self.progress.counted(files, size, time.monotonic() - start)
+
+    def _list_entries(self, current_path: str, relative_dir: str) -> List[os.DirEntry]:
+        listing = self._listings.pop(relative_dir, None)
+        if listing is None:
+            return super()._list_entries(current_path, relative_dir)
+        return listing
+
+    def _stat(self, entry: os.DirEntry, relative_path: str) -> os.stat_result:
+        stat = self._stats.pop(relative_path, None)
+        if stat is None:
+            return super()._stat(entry, relative_path)
+        return stat
+
+    def _submit_hash(self, full_path: str, relative_path: str, stat: os.stat_result):
+        future, store = super()._submit_hash(full_path, relative_path, stat)
+        size = stat.st_size
+        if self.executor is None:
+            # Serial scans resolve the hash before returning
+            self.progress.advance(size)
+        else:
+            future.add_done_callback(lambda _: self.progress.advance(size))
+        return future, store
+
+
+_progress_classes: Dict[type, type] = {}
+
+
+def progress_scanner(scanner_class: type) -> type:
+    """The subclass of a scanner class that reports to the ScanProgress passed as `progress=`."""
+    if scanner_class not in _progress_classes:
+        _progress_classes[scanner_class] = type(f"_Progress{scanner_class.__name__.lstrip('_')}", (_ProgressScanner, scanner_class), {})
+    return _progress_classes[scanner_class]
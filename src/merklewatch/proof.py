@@ -0,0 +1,158 @@
+"""
+Merkle inclusion proofs for MerkleWatch.
+
+A proof shows that one file belongs to a snapshot without rescanning the
+tree. It records, for each directory from the file's parent up to the
+snapshot root, the sibling hashes needed to rebuild that directory's
+Merkle root from a single child. Checking a file then costs one file read
+plus O(log n) hashes per directory level.
+"""
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from .hashing import FileHasher, compute_leaf_hash, compute_directory_hash, DEFAULT_ALGORITHM
+from .merkle import compute_merkle_path, compute_root_from_path
+from .verification import _ManifestIndex
+
+# Marker identifying a proof document
+PROOF_FORMAT = "merklewatch-proof"
+PROOF_VERSION = 1
+
+
+def _parent(relative_path: str) -> str:
+    return relative_path.rpartition('/')[0]
+
+
+def _directory_children(manifest: Dict[str, Any], directories: List[str]) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    Collect the (name, node hash) children of each requested directory,
+    sorted by name as the scanner orders them.
+
+    Binary manifests binary-search their tables for the children of just
+    these directories and decode only those records.
+    """
+    index = _ManifestIndex(manifest)
+    children: Dict[str, List[Tuple[str, str]]] = {}
+    for directory in directories:
+        files, subdirectories = index.children(directory)
+        entries = [(path.rpartition('/')[2], index.files[path]['leaf_hash']) for path in files]
+        entries += [(path.rpartition('/')[2], index.directories[path]['node_hash']) for path in subdirectories]
+        entries.sort()
+        children[directory] = entries
+    return children
+
+
+def create_proof(manifest: Dict[str, Any], relative_path: str) -> Dict[str, Any]:
+    """
+    Build an inclusion proof for one file of a manifest.
+
+    Args:
+        manifest: Loaded manifest (any format)
+        relative_path: POSIX path of the file relative to the snapshot root
+
+    Returns:
+        The proof document: the file's hashes, the snapshot root and one
+        step per directory, innermost first, each with its sibling path
+
+    Raises:
+        ValueError: If the file is not in the manifest, or the manifest's
+            hashes do not rebuild its root
+    """
+    files = manifest.get('files', {})
+    if relative_path not in files:
+        raise ValueError(f"File not found in manifest: {relative_path}")
+    entry = files[relative_path]
+
+    # The file's ancestors, innermost first, ending with the root ('')
+    ancestors = []
+    current = relative_path
+    while current:
+        current = _parent(current)
+        ancestors.append(current)
+
+    children = _directory_children(manifest, ancestors)
+    algorithm = manifest.get('algorithm', DEFAULT_ALGORITHM)
+
+    steps = []
+    name = relative_path.rpartition('/')[2]
+    node_hash = entry['leaf_hash']
+    for directory in ancestors:
+        names = [child_name for child_name, _ in children[directory]]
+        index = names.index(name)
+        path = compute_merkle_path([child_hash for _, child_hash in children[directory]], index, algorithm)
+        steps.append({'directory': directory, 'siblings': [list(step) for step in path]})
+
+        directory_root = compute_root_from_path(node_hash, path, algorithm)
+        name = directory.rpartition('/')[2]
+        node_hash = compute_directory_hash(directory_root, algorithm)
+
+    proof = {
+        'merklewatch_format': PROOF_FORMAT,
+        'version': PROOF_VERSION,
+        'algorithm': algorithm,
+        'path': relative_path,
+        'size': entry.get('size'),
+        'chunk_size': entry.get('chunk_size'),
+        'content_hash': entry['content_hash'],
+        'leaf_hash': entry['leaf_hash'],
+        'root_hash': manifest['root_hash'],
+        'steps': steps,
+    }
+
+    if compute_proof_root(proof, entry['content_hash']) != manifest['root_hash']:
+        raise ValueError(f"Manifest hashes do not rebuild its root hash; cannot prove {relative_path}")
+
+    return proof
+
+
+def compute_proof_root(proof: Dict[str, Any], content_hash: str) -> str:
+    """
+    Rebuild the snapshot root implied by a proof for the given content hash.
+
+    Each step folds the sibling path into that directory's root, which is
+    wrapped as a directory node before the next (outer) step.
+    """
+    algorithm = proof.get('algorithm', DEFAULT_ALGORITHM)
+    node_hash = compute_leaf_hash(content_hash, algorithm)
+    steps = proof['steps']
+    for i, step in enumerate(steps):
+        directory_root = compute_root_from_path(node_hash, [tuple(sibling) for sibling in step['siblings']], algorithm)
+        if i == len(steps) - 1:
+            return directory_root
+        node_hash = compute_directory_hash(directory_root, algorithm)
+    return node_hash
+
+
+def verify_file_proof(proof: Dict[str, Any], file_path: Path, trusted_root: str) -> Tuple[bool, str, str]:
+    """
+    Check a file on disk against a trusted root hash using a proof.
+
+    Args:
+        proof: Proof document from create_proof
+        file_path: The file to check (read once)
+        trusted_root: Root hash the file must belong to
+
+    Returns:
+        Tuple of (success, content hash of the file, root hash it implies)
+    """
+    file_hasher = FileHasher(algorithm=proof.get('algorithm', DEFAULT_ALGORITHM), chunk_size=proof.get('chunk_size'))
+    content_hash = file_hasher(file_path)
+    computed_root = compute_proof_root(proof, content_hash)
+    return computed_root == trusted_root, content_hash, computed_root
+
+
+def save_proof(proof: Dict[str, Any], output_path: Path):
+    """Save a proof as indented JSON."""
+    with open(output_path, 'w') as f:
+        json.dump(proof, f, indent=2, sort_keys=True)
+
+
+def load_proof(proof_path: Path) -> Dict[str, Any]:
+    """Load a proof document, checking its format marker."""
+    with open(proof_path, 'r') as f:
+        proof = json.load(f)
+    if not isinstance(proof, dict) or proof.get('merklewatch_format') != PROOF_FORMAT:
+        raise ValueError(f"Not a MerkleWatch proof: {proof_path}")
+    if proof.get('version') != PROOF_VERSION:
+        raise ValueError(f"Unsupported proof version {proof.get('version')}: {proof_path}")
+    return proof
@@ -0,0 +1,292 @@
+"""
+In-memory Merkle tree of a directory snapshot.
+
+A MerkleTree holds, for every directory, its children's node digests in
+name order together with every internal level of the directory's Merkle
+tree. Changing one file's hash therefore recomputes O(log k) internal
+nodes per directory on the way up, O(depth * log k) in total, instead of
+rescanning or rebuilding the whole tree. Adding or removing a child shifts
+its siblings, so that directory's levels are rebuilt once.
+
+Updates are applied lazily: mutations mark directories dirty and the next
+read of root_hash recomputes them deepest first, so a batch of changes in
+one directory rehashes each shared ancestor once. The roots are identical
+to those of scan_directory() for the same files.
+"""
+from bisect import bisect_left
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+from .filesystem import scan_directory
+from .hashing import FileHasher, get_algorithm, DEFAULT_ALGORITHM
+from .ignore import IgnoreRules
+
+
+def _parent(relative_path: str) -> str:
+    return relative_path.rpartition('/')[0]
+
+
+def _name(relative_path: str) -> str:
+    return relative_path.rpartition('/')[2]
+
+
+def _join(directory: str, name: str) -> str:
+    return f"{directory}/{name}" if directory else name
+
+
+def _depth(relative_path: str) -> int:
+    return relative_path.count('/') + 1 if relative_path else 0
+
+
+class _DirectoryNode:
+    """
+    One directory's children and Merkle levels.
+
+    `levels[0]` packs the children's node digests in name order; each
+    following level holds the parents of the one below, ending with the
+    single root digest. `dirty` lists changed child indices to propagate,
+    and `rebuild` forces all levels to be recomputed after an insertion or
+    removal.
+    """
+
+    __slots__ = ('names', 'levels', 'dirty', 'rebuild', 'root')
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.levels: List[bytearray] = [bytearray()]
+        self.dirty: Set[int] = set()
+        self.rebuild = True
+        self.root = b''
+
+
+class MerkleTree:
+    """
+    A directory tree's Merkle structure with O(depth) point updates.
+
+    Paths are POSIX paths relative to the root, as in manifests; the root
+    directory is ''. `files` maps every file to its content hash and must be
+    treated as read-only.
+    """
+
+    def __init__(self, algorithm: str = DEFAULT_ALGORITHM, chunk_size: Optional[int] = None):
+        self.algorithm = algorithm
+        self.chunk_size = chunk_size
+        self.hash_algorithm = get_algorithm(algorithm)
+        self.files: Dict[str, str] = {}
+        self._directories: Dict[str, _DirectoryNode] = {'': _DirectoryNode()}
+        self._dirty: Set[str] = {''}
+
+    @classmethod
+    def from_manifest(cls, manifest: Dict[str, Any]) -> 'MerkleTree':
+        """Build the tree of a loaded manifest (any format) from its content hashes."""
+        tree = cls(manifest.get('algorithm', DEFAULT_ALGORITHM), manifest.get('chunk_size'))
+        tree.load(manifest)
+        return tree
+
+    @classmethod
+    def from_scan(cls, directory: Path, ignore_rules: Optional[IgnoreRules] = None, jobs: int = 1, file_hasher: Optional[FileHasher] = None) -> 'MerkleTree':
+        """Scan a directory with scan_directory() and build its tree."""
+        file_hasher = file_hasher or FileHasher()
+        manifest_data: Dict[str, Any] = {'files': {}, 'directories': {}}
+        scan_directory(directory, directory, manifest_data, ignore_rules, jobs=jobs, file_hasher=file_hasher)
+        tree = cls(file_hasher.algorithm, file_hasher.chunk_size)
+        tree.load(manifest_data)
+        return tree
+
+    def load(self, manifest_data: Dict[str, Any]) -> List[str]:
+        """
+        Add the files and directories of a manifest or scan.
+
+        Returns:
+            The paths of the added files
+        """
+        for path in manifest_data.get('directories', {}):
+            self.add(path)
+        files = manifest_data.get('files', {})
+        for path in files:
+            self.add(path, files[path]['content_hash'])
+        return list(files)
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.files or path in self._directories
+
+    def is_directory(self, path: str) -> bool:
+        return path in self._directories
+
+    def _insert(self, path: str, digest: bytes):
+        node = self._directories[_parent(path)]
+        name = _name(path)
+        index = bisect_left(node.names, name)
+        size = self.hash_algorithm.digest_size
+        node.names.insert(index, name)
+        node.levels[0][index * size:index * size] = digest
+        node.rebuild = True
+        self._dirty.add(_parent(path))
+
+    def _set_child(self, path: str, digest: bytes):
+        node = self._directories[_parent(path)]
+        index = bisect_left(node.names, _name(path))
+        size = self.hash_algorithm.digest_size
+        node.levels[0][index * size:(index + 1) * size] = digest
+        if not node.rebuild:
+            node.dirty.add(index)
+        self._dirty.add(_parent(path))
+
+    def _delete(self, path: str):
+        node = self._directories[_parent(path)]
+        index = bisect_left(node.names, _name(path))
+        size = self.hash_algorithm.digest_size
+        del node.names[index]
+        del node.levels[0][index * size:(index + 1) * size]
+        node.rebuild = True
+        self._dirty.add(_parent(path))
+
+    def _ensure_directory(self, path: str):
+        if path in self._directories:
+            return
+        if path in self.files:
+            raise ValueError(f"Cannot add a directory over the file {path}")
+        self._ensure_directory(_parent(path))
+        self._directories[path] = _DirectoryNode()
+        # Placeholder digest; the real node is set when the directory is recomputed
+        self._insert(path, bytes(self.hash_algorithm.digest_size))
+        self._dirty.add(path)
+
+    def add(self, path: str, content_hash: Optional[str] = None):
+        """
+        Add a file (with its content hash) or, without one, a directory.
+
+        Missing parent directories are created. Adding an existing file
+        replaces its hash; adding an existing directory does nothing.
+
+        Raises:
+            ValueError: If the path (or a parent) exists as the other kind
+        """
+        if content_hash is None:
+            self._ensure_directory(path)
+            return
+
+        if path in self._directories:
+            raise ValueError(f"Cannot add a file over the directory {path}")
+        self._ensure_directory(_parent(path))
+        digest = self.hash_algorithm.leaf_digest(bytes.fromhex(content_hash))
+        if path in self.files:
+            self._set_child(path, digest)
+        else:
+            self._insert(path, digest)
+        self.files[path] = content_hash
+
+    def update_file(self, path: str, content_hash: str):
+        """
+        Change the content hash of an existing file.
+
+        Raises:
+            KeyError: If the file is not in the tree
+        """
+        if path not in self.files:
+            raise KeyError(f"File not found in tree: {path}")
+        self._set_child(path, self.hash_algorithm.leaf_digest(bytes.fromhex(content_hash)))
+        self.files[path] = content_hash
+
+    def remove(self, path: str) -> List[str]:
+        """
+        Remove a file or a directory with everything below it. Removing the
+        root ('') empties the tree. Unknown paths are ignored.
+
+        Returns:
+            The paths of the removed files
+        """
+        if path in self.files:
+            del self.files[path]
+            self._delete(path)
+            return [path]
+
+        node = self._directories.get(path)
+        if node is None:
+            return []
+
+        removed: List[str] = []
+        for name in list(node.names):
+            removed += self.remove(_join(path, name))
+        if path:
+            del self._directories[path]
+            self._dirty.discard(path)
+            self._delete(path)
+        return removed
+
+    def _recompute(self, node: _DirectoryNode) -> bytes:
+        """Bring a directory's levels up to date and return its root digest."""
+        size = self.hash_algorithm.digest_size
+        internal_digest = self.hash_algorithm.internal_digest
+
+        if node.rebuild:
+            levels = [node.levels[0]]
+            count = len(node.names)
+            while count > 1:
+                below = levels[-1]
+                above = bytearray()
+                for i in range(0, count, 2):
+                    left = below[i * size:(i + 1) * size]
+                    right = below[(i + 1) * size:(i + 2) * size] if i + 1 < count else left
+                    above += internal_digest(left, right)
+                levels.append(above)
+                count = (count + 1) // 2
+            node.levels = levels
+
+        elif node.dirty:
+            indices = node.dirty
+            for below, above in zip(node.levels, node.levels[1:]):
+                count = len(below) // size
+                parents = {i // 2 for i in indices}
+                for p in parents:
+                    left = below[2 * p * size:(2 * p + 1) * size]
+                    right = below[(2 * p + 1) * size:(2 * p + 2) * size] if 2 * p + 1 < count else left
+                    above[p * size:(p + 1) * size] = internal_digest(left, right)
+                indices = parents
+
+        node.rebuild = False
+        node.dirty = set()
+        if node.names:
+            node.root = bytes(node.levels[-1][:size])
+        else:
+            # Empty tree case
+            node.root = self.hash_algorithm.internal_hasher().digest()
+        return node.root
+
+    def _refresh(self):
+        """Recompute dirty directories deepest first, propagating each new root to its parent."""
+        if not self._dirty:
+            return
+        buckets: Dict[int, Set[str]] = defaultdict(set)
+        for path in self._dirty:
+            buckets[_depth(path)].add(path)
+        self._dirty = set()
+
+        for depth in range(max(buckets), -1, -1):
+            for path in buckets.get(depth, ()):
+                root = self._recompute(self._directories[path])
+                if path:
+                    self._set_child(path, self.hash_algorithm.directory_digest(root))
+                    buckets[depth - 1].add(_parent(path))
+        self._dirty = set()
+
+    @property
+    def root_hash(self) -> str:
+        """The Merkle root of the whole tree."""
+        self._refresh()
+        return self._directories[''].root.hex()
+
+    def directory_root(self, path: str) -> str:
+        """
+        The Merkle root of one directory's subtree.
+
+        Raises:
+            KeyError: If the directory is not in the tree
+        """
+        if path not in self._directories:
+            raise KeyError(f"Directory not found in tree: {path}")
+        self._refresh()
+        return self._directories[path].root.hex()
@@ -1,20 +1,61 @@
-import json
+import os
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, Iterator, List, Set, Tuple, Optional
 from .filesystem import scan_directory
+from .hashing import FileHasher, check_compatible_manifests
 from .ignore import IgnoreRules
+from .incremental import Baseline
+from .manifest import load_manifest
 
-def load_manifest(manifest_path: Path) -> Dict[str, Any]:
-    with open(manifest_path, 'r') as f:
-        return json.load(f)
-
-def compare_manifests(old_manifest: Dict[str, Any], new_manifest_data: Dict[str, Any]) -> Dict[str, List[str]]:
+class _ManifestIndex:
     """
-    Compare two manifest data structures to find added, removed, and modified files.
+    Lists the files and subdirectories directly inside each directory of a
+    manifest.
+
+    Binary manifests answer from their sorted tables. In-memory manifests
+    are grouped by parent directory in one pass over their paths, on the
+    first query.
     """
-    old_files = old_manifest.get('files', {})
-    new_files = new_manifest_data.get('files', {})
-    
+
+    def __init__(self, manifest: Dict[str, Any]):
+        self.files = manifest.get('files', {})
+        self.directories = manifest.get('directories', {})
+        self._lazy = hasattr(self.files, 'children') and hasattr(self.directories, 'children')
+        self._child_files: Optional[Dict[str, List[str]]] = None
+        self._child_directories: Dict[str, List[str]] = {}
+
+    def _group(self):
+        self._child_files = defaultdict(list)
+        self._child_directories = defaultdict(list)
+        for path in self.files:
+            self._child_files[path.rpartition('/')[0]].append(path)
+        for path in self.directories:
+            if path:
+                self._child_directories[path.rpartition('/')[0]].append(path)
+
+    def children(self, directory: str) -> Tuple[List[str], List[str]]:
+        """(files, subdirectories) directly inside a directory."""
+        if self._lazy:
+            return list(self.files.children(directory)), list(self.directories.children(directory))
+        if self._child_files is None:
+            self._group()
+        return self._child_files.get(directory, []), self._child_directories.get(directory, [])
+
+    def subtree_files(self, directory: str) -> Iterator[str]:
+        """Every file below a directory."""
+        if self._lazy:
+            yield from self.files.descendants(directory)
+            return
+        files, subdirectories = self.children(directory)
+        yield from files
+        for subdirectory in subdirectories:
+            yield from self.subtree_files(subdirectory)
+
+def _compare_all_files(old_files: Mapping, new_files: Mapping) -> Dict[str, List[str]]:
+    """Path-by-path comparison of every file entry."""
     added = []
     removed = []
     modified = []
@@ -41,35 +82,455 @@ def compare_manifests(old_manifest: Dict[str, Any], new_manifest_data: Dict[str,
         'modified': sorted(modified)
     }
 
-def verify_directory(manifest_path: Path, target_directory: Path) -> Tuple[bool, Optional[str], str, Dict[str, List[str]], Dict[str, Any], Dict[str, Any]]:
+def compare_manifests(old_manifest: Dict[str, Any], new_manifest_data: Dict[str, Any], full: bool = False) -> Dict[str, List[str]]:
+    """
+    Compare two manifest data structures to find added, removed, and modified files.
+
+    The comparison walks both trees from the root and descends only into
+    directories whose stored `root_hash` or `fingerprint` differs, so its
+    cost grows with the size of the change rather than the size of the tree.
+    Entry names are not part of the hashes, but a fingerprint covers the
+    names and stat signatures of everything below its directory, so a
+    rename that keeps the hashes still leads the walk down to it.
+
+    Without fingerprints (manifests written before they existed) unchanged
+    hashes cannot rule out a rename, so once the walk reaches a directory
+    missing one it falls back to comparing every path, as `full` does.
+
+    Args:
+        old_manifest: The reference manifest
+        new_manifest_data: The manifest (or scan data) to compare with it
+        full: Compare every file entry instead of skipping identical subtrees
+
+    Raises:
+        ValueError: If the manifests were hashed with different algorithms
+            or chunk sizes
+    """
+    check_compatible_manifests(old_manifest, new_manifest_data)
+
+    old_files = old_manifest.get('files', {})
+    new_files = new_manifest_data.get('files', {})
+
+    old_root = old_manifest.get('root_hash')
+    new_root = new_manifest_data.get('root_hash')
+    if full or old_root is None or new_root is None:
+        return _compare_all_files(old_files, new_files)
+
+    diffs: Dict[str, List[str]] = {'added': [], 'removed': [], 'modified': []}
+    old_index = _ManifestIndex(old_manifest)
+    new_index = _ManifestIndex(new_manifest_data)
+    old_directories = old_index.directories
+    new_directories = new_index.directories
+
+    # The root has no stored fingerprint: its listing is always compared
+    pending = ['']
+    while pending:
+        directory = pending.pop()
+        old_child_files, old_subdirectories = old_index.children(directory)
+        new_child_files, new_subdirectories = new_index.children(directory)
+
+        old_names = set(old_child_files)
+        for path in new_child_files:
+            if path not in old_names:
+                diffs['added'].append(path)
+            elif old_files[path]['content_hash'] != new_files[path]['content_hash']:
+                diffs['modified'].append(path)
+        new_names = set(new_child_files)
+        diffs['removed'] += [path for path in old_child_files if path not in new_names]
+
+        old_names = set(old_subdirectories)
+        for path in new_subdirectories:
+            if path not in old_names:
+                diffs['added'] += new_index.subtree_files(path)
+                continue
+            old_entry = old_directories[path]
+            new_entry = new_directories[path]
+            old_fingerprint = old_entry.get('fingerprint')
+            new_fingerprint = new_entry.get('fingerprint')
+            if old_fingerprint is None or new_fingerprint is None:
+                return _compare_all_files(old_files, new_files)
+            if old_entry['root_hash'] != new_entry['root_hash'] or old_fingerprint != new_fingerprint:
+                pending.append(path)
+        new_names = set(new_subdirectories)
+        for path in old_subdirectories:
+            if path not in new_names:
+                diffs['removed'] += old_index.subtree_files(path)
+
+    return {kind: sorted(paths) for kind, paths in diffs.items()}
+
+def _parent(path: str) -> str:
+    return path.rpartition('/')[0]
+
+def _new_directories(paths: List[str], other_directories: Mapping) -> Set[str]:
+    """Directories above the given files that do not exist on the other side."""
+    directories: Set[str] = set()
+    for path in paths:
+        parent = _parent(path)
+        while parent and parent not in directories and parent not in other_directories:
+            directories.add(parent)
+            parent = _parent(parent)
+    return directories
+
+def _subtree_range(paths: List[str], directory: str) -> List[str]:
+    """The paths below a directory, relative to it, from a sorted list."""
+    prefix = directory + '/'
+    start = bisect_left(paths, prefix)
+    end = bisect_left(paths, prefix[:-1] + '0', start)
+    return [path[len(prefix):] for path in paths[start:end]]
+
+def _match_directories(added: List[str], removed: List[str], old_manifest: Dict[str, Any], new_manifest_data: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """
+    Pair directories that exist only in the old manifest with directories
+    that exist only in the new one and hold the same files.
+
+    Candidates are indexed by `root_hash`; a hash match is confirmed by
+    comparing the relative paths and hashes of the files below both, since
+    names are not part of the root. Only the topmost directory of a moved
+    subtree is reported.
+    """
+    old_files = old_manifest.get('files', {})
+    new_files = new_manifest_data.get('files', {})
+    old_directories = old_manifest.get('directories', {})
+    new_directories = new_manifest_data.get('directories', {})
+
+    by_root: Dict[str, List[str]] = defaultdict(list)
+    for path in sorted(_new_directories(added, old_directories)):
+        by_root[new_directories[path]['root_hash']].append(path)
+    if not by_root:
+        return []
+
+    pairs: List[Tuple[str, str]] = []
+    matched_old: Set[str] = set()
+    matched_new: Set[str] = set()
+    gone = sorted(_new_directories(removed, new_directories), key=lambda path: (path.count('/'), path))
+    for old_path in gone:
+        if _parent(old_path) in matched_old:
+            # Inside a directory that already moved as a whole
+            matched_old.add(old_path)
+            continue
+        candidates = by_root.get(old_directories[old_path]['root_hash'])
+        if not candidates:
+            continue
+
+        old_subtree = _subtree_range(removed, old_path)
+        old_hashes = [old_files[f"{old_path}/{path}"]['content_hash'] for path in old_subtree]
+        name = old_path.rpartition('/')[2]
+        # Prefer a directory with the same name, then the first in path order
+        for new_path in sorted(candidates, key=lambda path: path.rpartition('/')[2] != name):
+            parent = _parent(new_path)
+            while parent and parent not in matched_new:
+                parent = _parent(parent)
+            if parent or new_path in matched_new:
+                continue
+            new_subtree = _subtree_range(added, new_path)
+            if new_subtree != old_subtree:
+                continue
+            if [new_files[f"{new_path}/{path}"]['content_hash'] for path in new_subtree] != old_hashes:
+                continue
+            pairs.append((old_path, new_path))
+            matched_old.add(old_path)
+            matched_new.add(new_path)
+            break
+    return pairs
+
+def detect_moves(diffs: Dict[str, List[str]], old_manifest: Dict[str, Any], new_manifest_data: Dict[str, Any]) -> Dict[str, list]:
+    """
+    Turn added/removed pairs with identical content into renames, moves and
+    copies.
+
+    Whole directories are matched first, by `root_hash`, so a moved subtree
+    is reported once instead of file by file. The remaining added files are
+    then looked up in a `content_hash` index of the removed ones, preferring
+    a source with the same name, then one in the same directory. Added
+    files left over are copies if any file in the old manifest, unchanged
+    or not, had their content. Empty files are not paired, since they all
+    share one hash. Every step is a hash lookup, so the cost is linear in
+    the number of added and removed files, plus one pass over the old
+    manifest's files when some added file is left unpaired.
+
+    Args:
+        diffs: The result of compare_manifests() for the two manifests
+        old_manifest: The reference manifest
+        new_manifest_data: The manifest (or scan data) compared with it
+
+    Returns:
+        The diffs with 'renamed' (same parent directory), 'moved' and
+        'copied' lists of (old path, new path) pairs added, and the paired
+        paths taken out of 'added' and 'removed'. Directories are reported
+        with a trailing '/'.
+    """
+    added = sorted(diffs.get('added', []))
+    removed = sorted(diffs.get('removed', []))
+    result: Dict[str, list] = dict(diffs)
+    result.update(renamed=[], moved=[], copied=[])
+    if not added:
+        return result
+
+    old_files = old_manifest.get('files', {})
+    new_files = new_manifest_data.get('files', {})
+    pairs: List[Tuple[str, str, str]] = []
+    used_old: Set[str] = set()
+    used_new: Set[str] = set()
+
+    for old_path, new_path in _match_directories(added, removed, old_manifest, new_manifest_data):
+        pairs.append((old_path + '/', new_path + '/', 'renamed' if _parent(old_path) == _parent(new_path) else 'moved'))
+        used_old.update(f"{old_path}/{path}" for path in _subtree_range(removed, old_path))
+        used_new.update(f"{new_path}/{path}" for path in _subtree_range(added, new_path))
+
+    # Sources keyed by (hash, name), (hash, parent) and hash, in order of preference
+    by_name: Dict[Tuple[str, str], List[str]] = defaultdict(list)
+    by_parent: Dict[Tuple[str, str], List[str]] = defaultdict(list)
+    by_hash: Dict[str, List[str]] = defaultdict(list)
+    for path in reversed(removed):
+        entry = old_files[path]
+        if path in used_old or entry.get('size') == 0:
+            continue
+        content_hash = entry['content_hash']
+        by_name[content_hash, path.rpartition('/')[2]].append(path)
+        by_parent[content_hash, _parent(path)].append(path)
+        by_hash[content_hash].append(path)
+
+    def take(sources: Optional[List[str]]) -> Optional[str]:
+        while sources:
+            path = sources.pop()
+            if path not in used_old:
+                used_old.add(path)
+                return path
+        return None
+
+    remaining = []
+    for path in added:
+        entry = new_files[path]
+        if path in used_new or entry.get('size') == 0:
+            continue
+        content_hash = entry['content_hash']
+        if content_hash not in by_hash:
+            continue
+        source = take(by_name.get((content_hash, path.rpartition('/')[2])))
+        if source is None:
+            remaining.append(path)
+            continue
+        pairs.append((source, path, 'renamed' if _parent(source) == _parent(path) else 'moved'))
+        used_new.add(path)
+
+    for path in remaining:
+        content_hash = new_files[path]['content_hash']
+        source = take(by_parent.get((content_hash, _parent(path)))) or take(by_hash.get(content_hash))
+        if source is not None:
+            pairs.append((source, path, 'renamed' if _parent(source) == _parent(path) else 'moved'))
+            used_new.add(path)
+
+    # Added files still unpaired are copies of any old file with their content:
+    # a paired source first, then the first old path in sorted order
+    unpaired = [path for path in added if path not in used_new and new_files[path].get('size') != 0]
+    if unpaired:
+        copy_sources: Dict[str, str] = {}
+        for source, path, kind in pairs:
+            if not source.endswith('/'):
+                copy_sources.setdefault(old_files[source]['content_hash'], source)
+        wanted = {new_files[path]['content_hash'] for path in unpaired} - copy_sources.keys()
+        if wanted:
+            for source, entry in old_files.items():
+                content_hash = entry['content_hash']
+                if content_hash in wanted and (content_hash not in copy_sources or source < copy_sources[content_hash]):
+                    copy_sources[content_hash] = source
+        for path in unpaired:
+            source = copy_sources.get(new_files[path]['content_hash'])
+            if source is not None:
+                pairs.append((source, path, 'copied'))
+                used_new.add(path)
+
+    for source, path, kind in pairs:
+        result[kind].append((source, path))
+    for kind in ('renamed', 'moved', 'copied'):
+        result[kind].sort()
+    result['added'] = [path for path in added if path not in used_new]
+    result['removed'] = [path for path in removed if path not in used_old]
+    return result
+
+class VerificationMismatch(Exception):
+    """
+    The first difference found by a fail-fast or quick verification.
+
+    `kind` is 'added', 'removed' or 'modified'; directories are reported
+    with a trailing '/'.
+    """
+
+    def __init__(self, kind: str, path: str, content_hash: Optional[str] = None):
+        super().__init__(f"{kind}: {path}")
+        self.kind = kind
+        self.path = path
+        self.content_hash = content_hash
+
+    def as_diffs(self) -> Dict[str, List[str]]:
+        diffs: Dict[str, List[str]] = {'added': [], 'removed': [], 'modified': []}
+        diffs[self.kind].append(self.path)
+        return diffs
+
+class _FailFastChecker:
+    """Checks a scan against a manifest as it runs, raising VerificationMismatch at the first difference."""
+
+    def __init__(self, manifest: Dict[str, Any]):
+        self.files = manifest.get('files', {})
+        self.index = _ManifestIndex(manifest)
+
+    def check_listing(self, relative_dir: str, listing: List[Tuple[str, bool]]):
+        expected_files, expected_directories = self.index.children(relative_dir)
+        expected = {path: False for path in expected_files}
+        expected.update((path, True) for path in expected_directories)
+
+        for path, is_dir in listing:
+            if expected.pop(path, None) != is_dir:
+                raise VerificationMismatch('added', path + '/' if is_dir else path)
+        for path, is_dir in expected.items():
+            raise VerificationMismatch('removed', path + '/' if is_dir else path)
+
+    def check_file(self, relative_path: str, content_hash: Optional[str]):
+        if content_hash is None:
+            # Unreadable files are left out of a scan, as if removed
+            raise VerificationMismatch('removed', relative_path)
+        if self.files[relative_path]['content_hash'] != content_hash:
+            raise VerificationMismatch('modified', relative_path, content_hash)
+
+def quick_check(manifest: Dict[str, Any], target_directory: Path, ignore_rules: Optional[IgnoreRules] = None) -> Tuple[Dict[str, List[str]], List[Tuple[str, int]]]:
+    """
+    Compare a directory with a manifest by metadata alone, without hashing.
+
+    Walks the tree the way a scan does (same ignore rules, symlinks
+    skipped) and compares paths and sizes, which can only prove a
+    difference. Files whose mtime changed may or may not differ.
+
+    Returns:
+        Tuple of the definite differences (added, removed, and modified
+        files whose size changed; directories with a trailing '/') and the
+        (path, size) of files with an unchanged size but a different mtime
+    """
+    files = manifest.get('files', {})
+    directories = manifest.get('directories', {})
+    diffs: Dict[str, List[str]] = {'added': [], 'removed': [], 'modified': []}
+    suspicious: List[Tuple[str, int]] = []
+    seen_files: Set[str] = set()
+    seen_directories: Set[str] = set()
+
+    pending = ['']
+    while pending:
+        relative_dir = pending.pop()
+        prefix = relative_dir + '/' if relative_dir else ''
+        try:
+            with os.scandir(target_directory / relative_dir if relative_dir else target_directory) as it:
+                entries = list(it)
+        except OSError:
+            continue
+
+        for entry in entries:
+            relative_path = prefix + entry.name
+            if ignore_rules and ignore_rules.should_ignore_relative(relative_path):
+                continue
+            try:
+                if entry.is_symlink():
+                    continue
+                if entry.is_file(follow_symlinks=False):
+                    expected = files.get(relative_path)
+                    if expected is None:
+                        diffs['added'].append(relative_path)
+                        continue
+                    seen_files.add(relative_path)
+                    stat = entry.stat(follow_symlinks=False)
+                    if stat.st_size != expected['size']:
+                        diffs['modified'].append(relative_path)
+                    elif stat.st_mtime != expected['mtime']:
+                        suspicious.append((relative_path, stat.st_size))
+                elif entry.is_dir(follow_symlinks=False):
+                    if relative_path not in directories:
+                        diffs['added'].append(relative_path + '/')
+                        continue
+                    seen_directories.add(relative_path)
+                    pending.append(relative_path)
+            except OSError:
+                continue
+
+    # Everything seen was in the manifest, so equal counts mean nothing is missing
+    if len(seen_files) != len(files):
+        diffs['removed'] += [path for path in files if path not in seen_files]
+    if len(seen_directories) != len(directories):
+        diffs['removed'] += [path + '/' for path in directories if path not in seen_directories]
+
+    return {kind: sorted(paths) for kind, paths in diffs.items()}, suspicious
+
+def verify_directory(manifest_path: Path, target_directory: Path, jobs: int = 1, baseline: Optional[Baseline] = None, file_hasher: Optional[FileHasher] = None, cache: Optional[Any] = None, fail_fast: bool = False, quick: bool = False, io_concurrency: int = 0, profile: Optional[Any] = None, progress: Optional[Any] = None) -> Tuple[bool, Optional[str], Optional[str], Dict[str, List[str]], Dict[str, Any], Dict[str, Any]]:
     """
     Verify a directory against a manifest.
     
+    Args:
+        manifest_path: Path to the manifest file.
+        target_directory: Directory to verify.
+        jobs: Number of worker threads used to hash files.
+        baseline: Optional Baseline whose hashes are reused for unchanged files.
+        file_hasher: Optional FileHasher with the file read settings. Files
+            are always hashed with the manifest's algorithm and chunk size.
+        cache: Optional HashCache of content hashes shared across runs.
+        fail_fast: Check every listing and hash against the manifest as the
+            scan runs and stop at the first missing, extra or changed file.
+        quick: Compare paths, sizes and mtimes before hashing anything. A
+            missing, extra or resized file fails at once; with fail_fast,
+            files whose mtime changed are hashed before the rest of the scan.
+        io_concurrency: If set, scan with up to this many directory listings
+            and file reads in flight (see scan_directory).
+        profile: Optional ScanProfile recording the scan's timings and counters.
+        progress: Optional ScanProgress reporting the scan's progress and ETA.
+    
     Returns:
         Tuple containing:
         - success (bool): True if verification passed (hashes match)
         - expected_root (str): The root hash from the manifest
-        - actual_root (str): The computed root hash
-        - diffs (dict): Dictionary of added, removed, modified files
+        - actual_root (str): The computed root hash, or None if verification
+          stopped early; diffs then holds only the differences found so far
+        - diffs (dict): Dictionary of added, removed, modified files, and
+          of renamed, moved and copied (old, new) pairs
         - old_files (dict): Original manifest file data
         - new_files (dict): Current directory file data
     """
     # 1. Load Manifest
     manifest = load_manifest(manifest_path)
     expected_root = manifest.get('root_hash')
+
+    # Hash with the manifest's algorithm and chunking, whatever the caller's read settings
+    file_hasher = (file_hasher or FileHasher()).for_manifest(manifest)
     
     # 2. Scan Directory
     # Initialize ignore rules
     ignore_rules = IgnoreRules(target_directory)
+    old_files = manifest.get('files', {})
+
+    if quick:
+        diffs, suspicious = quick_check(manifest, target_directory, ignore_rules)
+        if any(diffs.values()):
+            return False, expected_root, None, diffs, old_files, {}
+
+        # Files with a new mtime are the likeliest to differ: hash them first
+        for relative_path, size in (suspicious if fail_fast else []):
+            try:
+                content_hash = file_hasher(target_directory / relative_path, size)
+            except OSError:
+                continue
+            if content_hash != old_files[relative_path]['content_hash']:
+                mismatch = VerificationMismatch('modified', relative_path, content_hash)
+                return False, expected_root, None, mismatch.as_diffs(), old_files, {relative_path: {'content_hash': content_hash}}
     
-    new_manifest_data = {'files': {}, 'directories': {}}
-    actual_root = scan_directory(target_directory, target_directory, new_manifest_data, ignore_rules)
+    new_manifest_data = {'files': {}, 'directories': {}, 'algorithm': file_hasher.algorithm, 'chunk_size': file_hasher.chunk_size}
+    checker = _FailFastChecker(manifest) if fail_fast else None
+    try:
+        actual_root = scan_directory(target_directory, target_directory, new_manifest_data, ignore_rules, jobs=jobs, baseline=baseline, file_hasher=file_hasher, cache=cache, fail_fast=checker, io_concurrency=io_concurrency, profile=profile, progress=progress)
+    except VerificationMismatch as mismatch:
+        new_files = {mismatch.path: {'content_hash': mismatch.content_hash}} if mismatch.content_hash else {}
+        return False, expected_root, None, mismatch.as_diffs(), old_files, new_files
+    new_manifest_data['root_hash'] = actual_root
     
     # 3. Compare
     success = (expected_root == actual_root)
     
     diffs = {}
     if not success:
-        diffs = compare_manifests(manifest, new_manifest_data)
+        diffs = detect_moves(compare_manifests(manifest, new_manifest_data), manifest, new_manifest_data)
         
-    return success, expected_root, actual_root, diffs, manifest.get('files', {}), new_manifest_data.get('files', {})
+    return success, expected_root, actual_root, diffs, old_files, new_manifest_data.get('files', {})
@@ -0,0 +1,399 @@
+"""
+Continuous integrity monitoring for MerkleWatch.
+
+A Watcher scans a directory once, keeps its MerkleTree in memory and then
+follows filesystem events: inotify on Linux, or periodic stat polling
+elsewhere. Events are debounced and coalesced into batches; each batch
+re-hashes only the touched files (or rescans a touched subdirectory) and
+recomputes only the directory roots on the path from them to the root.
+Drift against the reference manifest is reported per batch.
+"""
+import errno
+import os
+import select
+import stat as stat_module
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from .filesystem import scan_directory
+from .hashing import FileHasher
+from .ignore import IgnoreRules
+from .tree import MerkleTree
+from .defaults import DEFAULT_DEBOUNCE, DEFAULT_MAX_DELAY, DEFAULT_POLL_INTERVAL
+
+# A drift transition: (relative path, new status or None once it matches again)
+Change = Tuple[str, Optional[str]]
+
+
+def _join(directory: str, name: str) -> str:
+    return f"{directory}/{name}" if directory else name
+
+
+# inotify(7) constants
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_DONT_FOLLOW = 0x02000000
+_IN_ISDIR = 0x40000000
+
+_WATCH_MASK = (_IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE
+               | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF | _IN_ONLYDIR | _IN_DONT_FOLLOW)
+
+_EVENT = struct.Struct('iIII')
+
+
+def _walk_directories(root_path: Path, relative_dir: str, ignore_rules: Optional[IgnoreRules]) -> Iterable[str]:
+    """Yield a directory and every non-ignored subdirectory below it, without following symlinks."""
+    yield relative_dir
+    try:
+        with os.scandir(root_path / relative_dir if relative_dir else root_path) as it:
+            entries = list(it)
+    except OSError:
+        return
+    for entry in entries:
+        path = _join(relative_dir, entry.name)
+        if ignore_rules and ignore_rules.should_ignore_relative(path):
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            yield from _walk_directories(root_path, path, ignore_rules)
+
+
+class InotifyEvents:
+    """
+    Filesystem events from Linux inotify, one watch per directory.
+
+    New and moved-in directories are watched as their events arrive. A
+    queue overflow reports the root ('') so the whole tree is rescanned.
+
+    Raises:
+        OSError: If inotify is unavailable or the watch limit is reached
+    """
+
+    def __init__(self, root_path: Path, ignore_rules: Optional[IgnoreRules] = None):
+        self.root_path = root_path
+        self.ignore_rules = ignore_rules
+
+        # Loaded here so importing the module (e.g. for the CLI) stays cheap
+        import ctypes
+        import ctypes.util
+        libc_name = ctypes.util.find_library('c')
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, 'inotify_init1'):
+            raise OSError(errno.ENOSYS, "inotify is not available on this platform")
+
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, f"inotify_init1 failed: {os.strerror(error)}")
+
+        self._paths: Dict[int, str] = {}
+        self._watches: Dict[str, int] = {}
+        self.add_tree('')
+
+    def add_tree(self, relative_dir: str):
+        import ctypes
+        for path in _walk_directories(self.root_path, relative_dir, self.ignore_rules):
+            full_path = os.fsencode(self.root_path / path if path else self.root_path)
+            wd = self._libc.inotify_add_watch(self.fd, full_path, _WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                if error in (errno.ENOENT, errno.ENOTDIR):
+                    # Removed again before we got to it
+                    continue
+                hint = " (raise fs.inotify.max_user_watches or use --poll)" if error == errno.ENOSPC else ""
+                raise OSError(error, f"Cannot watch {path or '.'}: {os.strerror(error)}{hint}")
+            self._paths[wd] = path
+            self._watches[path] = wd
+
+    def remove_tree(self, relative_dir: str):
+        prefix = relative_dir + '/'
+        for path in [p for p in self._watches if p == relative_dir or p.startswith(prefix)]:
+            wd = self._watches.pop(path)
+            self._paths.pop(wd, None)
+            self._libc.inotify_rm_watch(self.fd, wd)
+
+    def wait(self, timeout: Optional[float]) -> Set[str]:
+        """Block up to `timeout` seconds (forever if None) and return touched paths."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        touched: Set[str] = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                raw_name = data[offset + _EVENT.size:offset + _EVENT.size + length].split(b'\0', 1)[0]
+                offset += _EVENT.size + length
+                self._handle(wd, mask, os.fsdecode(raw_name), touched)
+        return touched
+
+    def _handle(self, wd: int, mask: int, name: str, touched: Set[str]):
+        if mask & _IN_Q_OVERFLOW:
+            touched.add('')
+            return
+
+        directory = self._paths.get(wd)
+        if directory is None:
+            return
+        if mask & _IN_IGNORED:
+            self._paths.pop(wd, None)
+            if self._watches.get(directory) == wd:
+                del self._watches[directory]
+            return
+        if mask & (_IN_DELETE_SELF | _IN_MOVE_SELF):
+            touched.add(directory)
+            return
+
+        path = _join(directory, name)
+        if self.ignore_rules and self.ignore_rules.should_ignore_relative(path):
+            return
+        touched.add(path)
+
+        if mask & _IN_ISDIR:
+            if mask & (_IN_MOVED_FROM | _IN_DELETE):
+                self.remove_tree(path)
+            elif mask & (_IN_CREATE | _IN_MOVED_TO):
+                self.add_tree(path)
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingEvents:
+    """
+    Filesystem events found by re-stat'ing the tree every `interval` seconds.
+
+    Costs one lstat per entry per interval but no reads; a file counts as
+    touched when its size, mtime, ctime or inode change.
+    """
+
+    def __init__(self, root_path: Path, ignore_rules: Optional[IgnoreRules] = None, interval: float = DEFAULT_POLL_INTERVAL):
+        self.root_path = root_path
+        self.ignore_rules = ignore_rules
+        self.interval = interval
+        self._state = self._stat_tree()
+        self._next_poll = time.monotonic() + interval
+
+    def _stat_tree(self) -> Dict[str, Tuple[int, ...]]:
+        state: Dict[str, Tuple[int, ...]] = {}
+        pending = ['']
+        while pending:
+            relative_dir = pending.pop()
+            try:
+                with os.scandir(self.root_path / relative_dir if relative_dir else self.root_path) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            for entry in entries:
+                path = _join(relative_dir, entry.name)
+                if self.ignore_rules and self.ignore_rules.should_ignore_relative(path):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        state[path] = ()
+                        pending.append(path)
+                    elif entry.is_file(follow_symlinks=False):
+                        st = entry.stat(follow_symlinks=False)
+                        state[path] = (st.st_size, st.st_mtime_ns, st.st_ctime_ns, st.st_ino)
+                except OSError:
+                    continue
+        return state
+
+    def wait(self, timeout: Optional[float]) -> Set[str]:
+        """Sleep until the next poll (or `timeout`) and return touched paths."""
+        now = time.monotonic()
+        if timeout is not None and now + timeout < self._next_poll:
+            time.sleep(timeout)
+            return set()
+        time.sleep(max(0.0, self._next_poll - now))
+        self._next_poll = time.monotonic() + self.interval
+
+        previous, self._state = self._state, self._stat_tree()
+        return {path for path in previous.keys() | self._state.keys() if previous.get(path) != self._state.get(path)}
+
+    def close(self):
+        pass
+
+
+class Watcher:
+    """
+    Keeps a directory's Merkle root current and tracks drift from a manifest.
+
+    `drift` maps every file that differs from the manifest to 'added',
+    'removed' or 'modified'. Each processed batch returns the transitions
+    it caused, a path mapping to None once it matches the manifest again.
+    """
+
+    def __init__(self, root_path: Path, manifest: Dict[str, Any], ignore_rules: Optional[IgnoreRules] = None, file_hasher: Optional[FileHasher] = None, jobs: int = 1):
+        self.root_path = root_path
+        self.manifest = manifest
+        self.expected_files = manifest.get('files', {})
+        self.ignore_rules = ignore_rules
+        self.file_hasher = (file_hasher or FileHasher()).for_manifest(manifest)
+        self.jobs = max(1, jobs)
+        self.tree = MerkleTree(self.file_hasher.algorithm, self.file_hasher.chunk_size)
+        self.drift: Dict[str, str] = {}
+        self.root_hash: Optional[str] = None
+
+    @property
+    def expected_root(self) -> Optional[str]:
+        return self.manifest.get('root_hash')
+
+    def start(self) -> List[Change]:
+        """Scan the whole tree and compute the initial drift."""
+        self.root_hash = None
+        changes = self.apply({''})
+        for path in self.expected_files:
+            if path not in self.tree.files and path not in self.drift:
+                self.drift[path] = 'removed'
+                changes.append((path, 'removed'))
+        return changes
+
+    def _status(self, path: str) -> Optional[str]:
+        expected = self.expected_files.get(path)
+        current = self.tree.files.get(path)
+        if expected is None:
+            return 'added' if current is not None else None
+        if current is None:
+            return 'removed'
+        return 'modified' if current != expected['content_hash'] else None
+
+    def _rescan(self, relative_dir: str) -> List[str]:
+        touched = self.tree.remove(relative_dir)
+        manifest_data: Dict[str, Any] = {'files': {}, 'directories': {}}
+        full_path = self.root_path / relative_dir if relative_dir else self.root_path
+        scan_directory(full_path, self.root_path, manifest_data, self.ignore_rules, jobs=self.jobs, file_hasher=self.file_hasher)
+        self.tree.add(relative_dir)
+        return touched + self.tree.load(manifest_data)
+
+    def apply(self, paths: Set[str]) -> List[Change]:
+        """
+        Bring the tree up to date for a batch of touched paths.
+
+        Touched directories are rescanned (covering any touched paths inside
+        them), touched files are re-hashed and vanished paths are removed.
+        Returns the drift transitions of the batch.
+        """
+        touched: List[str] = []
+        files: List[Tuple[str, int]] = []
+        rescanned: List[str] = []
+
+        for path in sorted(paths):
+            if any(path == d or path.startswith(d + '/') or d == '' for d in rescanned):
+                continue
+            try:
+                st = os.lstat(self.root_path / path if path else self.root_path)
+            except FileNotFoundError:
+                touched += self.tree.remove(path)
+                continue
+            except OSError:
+                continue
+
+            if stat_module.S_ISDIR(st.st_mode):
+                rescanned.append(path)
+                touched += self._rescan(path)
+            elif stat_module.S_ISREG(st.st_mode):
+                if self.tree.is_directory(path):
+                    touched += self.tree.remove(path)
+                files.append((path, st.st_size))
+            else:
+                # Symlinks and special files are skipped, as in a scan
+                touched += self.tree.remove(path)
+
+        for path, content_hash in self._hash_files(files):
+            if content_hash is None:
+                touched += self.tree.remove(path)
+            else:
+                self.tree.add(path, content_hash)
+                touched.append(path)
+
+        self.root_hash = self.tree.root_hash
+
+        changes: List[Change] = []
+        for path in dict.fromkeys(touched):
+            status = self._status(path)
+            if self.drift.get(path) != status:
+                if status is None:
+                    del self.drift[path]
+                else:
+                    self.drift[path] = status
+                changes.append((path, status))
+        return changes
+
+    def _hash_files(self, files: List[Tuple[str, int]]) -> List[Tuple[str, Optional[str]]]:
+        """Hash touched files; None marks a file that vanished or cannot be read."""
+        results: List[Tuple[str, Optional[str]]] = []
+        if self.jobs > 1 and len(files) > 1:
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                futures = [(path, self.file_hasher.submit(executor, self.root_path / path, size)) for path, size in files]
+                for path, future in futures:
+                    try:
+                        results.append((path, future.result()))
+                    except OSError:
+                        results.append((path, None))
+            return results
+
+        for path, size in files:
+            try:
+                results.append((path, self.file_hasher(self.root_path / path, size)))
+            except OSError:
+                results.append((path, None))
+        return results
+
+    def run(self, on_start: Callable[[List[Change]], None], on_batch: Callable[[List[Change], float], None], poll_interval: Optional[float] = None, debounce: float = DEFAULT_DEBOUNCE, max_delay: float = DEFAULT_MAX_DELAY):
+        """
+        Scan the tree, then follow filesystem events until interrupted.
+
+        Watches are registered before the initial scan, so changes made
+        while it runs are picked up by the first batch.
+
+        Args:
+            on_start: Called with the drift found by the initial scan
+            on_batch: Called after every batch with its drift transitions and
+                the seconds between its first event and the updated root
+            poll_interval: Poll every this many seconds instead of using inotify
+            debounce: Quiet period that ends a batch
+            max_delay: Longest a batch may grow under a continuous write storm
+
+        Raises:
+            OSError: If inotify cannot watch the tree (use polling instead)
+        """
+        if poll_interval is None:
+            events = InotifyEvents(self.root_path, self.ignore_rules)
+        else:
+            events = PollingEvents(self.root_path, self.ignore_rules, poll_interval)
+
+        try:
+            on_start(self.start())
+            while True:
+                paths = events.wait(None)
+                if not paths:
+                    continue
+                first_event = time.monotonic()
+
+                # Coalesce until the tree has been quiet for `debounce` seconds
+                while time.monotonic() - first_event < max_delay:
+                    more = events.wait(debounce)
+                    if not more:
+                        break
+                    paths |= more
+
+                changes = self.apply(paths)
+                on_batch(changes, time.monotonic() - first_event)
+        finally:
+            events.close()
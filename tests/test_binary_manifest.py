@@ -0,0 +1,41 @@
+"""
+Binary manifests must round-trip and reject inconsistent or truncated data.
+"""
+import pytest
+
+from merklewatch.binary_manifest import load_binary_manifest, save_binary_manifest
+from merklewatch.filesystem import scan_directory
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    root = tmp_path / 'tree'
+    for relative_path in ('top.txt', 'a/one.txt', 'a/b/two.txt'):
+        path = root / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(relative_path.encode())
+    data = {'files': {}, 'directories': {}, 'algorithm': 'sha256'}
+    data['root_hash'] = scan_directory(root, root, data)
+    return data
+
+
+def test_round_trip(tmp_path, manifest):
+    save_binary_manifest(manifest, tmp_path / 'm.mwb')
+    loaded = load_binary_manifest(tmp_path / 'm.mwb')
+    assert loaded['root_hash'] == manifest['root_hash']
+    assert dict(loaded['files']) == manifest['files']
+    assert dict(loaded['directories']) == manifest['directories']
+
+
+def test_mismatched_hash_length_is_a_value_error(tmp_path, manifest):
+    manifest['files']['top.txt'] = dict(manifest['files']['top.txt'], content_hash='ab' * 64)
+    with pytest.raises(ValueError, match="Corrupt binary manifest"):
+        save_binary_manifest(manifest, tmp_path / 'm.mwb')
+
+
+def test_truncated_file_is_a_value_error(tmp_path, manifest):
+    save_binary_manifest(manifest, tmp_path / 'm.mwb')
+    data = (tmp_path / 'm.mwb').read_bytes()
+    (tmp_path / 'm.mwb').write_bytes(data[:len(data) // 2])
+    with pytest.raises(ValueError, match="Corrupt binary manifest"):
+        load_binary_manifest(tmp_path / 'm.mwb')
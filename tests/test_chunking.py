@@ -0,0 +1,54 @@
+"""
+Chunked hashing must close the shared descriptor however a file's chunks end.
+"""
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+import pytest
+
+from merklewatch.chunking import hash_file_chunked, submit_file_chunked
+
+CHUNK_SIZE = 64 * 1024
+
+pytestmark = pytest.mark.skipif(not os.path.isdir('/proc/self/fd'), reason="needs /proc/self/fd")
+
+
+def _open_descriptors() -> int:
+    return len(os.listdir('/proc/self/fd'))
+
+
+class _FailingExecutor(Executor):
+    """Passes the first `accept` tasks to a pool, then refuses like a shut-down one."""
+
+    def __init__(self, accept: int):
+        self.accept = accept
+        self.pool = ThreadPoolExecutor(max_workers=2)
+
+    def submit(self, fn, *args, **kwargs):
+        if self.accept == 0:
+            raise RuntimeError("cannot schedule new futures after shutdown")
+        self.accept -= 1
+        return self.pool.submit(fn, *args, **kwargs)
+
+
+@pytest.fixture
+def large_file(tmp_path):
+    path = tmp_path / 'large.bin'
+    path.write_bytes(os.urandom(5 * CHUNK_SIZE + 123))
+    return path
+
+
+def test_parallel_root_matches_serial(large_file):
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        future = submit_file_chunked(executor, large_file, large_file.stat().st_size, CHUNK_SIZE)
+        assert future.result() == hash_file_chunked(large_file, large_file.stat().st_size, CHUNK_SIZE)
+
+
+@pytest.mark.parametrize("accept", [0, 2])
+def test_refused_submit_closes_descriptor(large_file, accept):
+    before = _open_descriptors()
+    executor = _FailingExecutor(accept)
+    with pytest.raises(RuntimeError):
+        submit_file_chunked(executor, large_file, large_file.stat().st_size, CHUNK_SIZE)
+    executor.pool.shutdown(wait=True)
+    assert _open_descriptors() == before
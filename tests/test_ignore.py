@@ -0,0 +1,77 @@
+"""
+Suggested ignore patterns must ignore the paths they were suggested for.
+
+`merklewatch ignore` finds patterns with CommonPatternIndex and saves them
+to .merkleignore, where PatternMatcher applies them; the two must agree.
+"""
+import os
+import re
+from pathlib import Path
+
+import pytest
+
+from merklewatch.common_ignores import CommonPatternIndex, get_all_common_patterns, scan_for_suggestions
+from merklewatch.ignore import PatternMatcher
+
+PATTERNS = get_all_common_patterns()
+
+
+def _example(pattern: str) -> str:
+    """A name the pattern matches: wildcards and character classes filled in."""
+    name = re.sub(r'\[(.)[^\]]*\]', r'\1', pattern.strip('/'))
+    return name.replace('*', 'x').replace('?', 'x')
+
+
+def _populate(root: Path) -> Path:
+    """One example of every common pattern, at the top level and nested."""
+    for parent in (root, root / 'pkg' / 'sub'):
+        for pattern in PATTERNS:
+            path = parent / _example(pattern)
+            if pattern.endswith('/'):
+                path.mkdir(parents=True, exist_ok=True)
+                (path / 'inner.txt').write_bytes(b'inner')
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(b'file')
+    (root / 'pkg' / 'keep.txt').write_bytes(b'keep')
+    return root
+
+
+def _entries(root: Path):
+    """(relative path, basename, is directory) of everything below root."""
+    for directory, directories, files in os.walk(root):
+        prefix = Path(directory).relative_to(root).as_posix()
+        prefix = '' if prefix == '.' else prefix + '/'
+        for name in directories:
+            yield prefix + name, name, True
+        for name in files:
+            yield prefix + name, name, False
+
+
+def test_every_common_pattern_is_suggested(tmp_path):
+    suggestions = scan_for_suggestions(_populate(tmp_path))
+    assert suggestions.matched == set(PATTERNS)
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_suggested_pattern_ignores_its_path(tmp_path, pattern):
+    root = _populate(tmp_path)
+    matcher = PatternMatcher([pattern])
+    suggested = []
+    for relative_path, name, is_dir in _entries(root):
+        index = CommonPatternIndex([pattern])
+        index.match(relative_path, name, is_dir)
+        if index.matched:
+            suggested.append(relative_path)
+            assert matcher.matches(relative_path), relative_path
+            if is_dir:
+                assert matcher.matches(relative_path + '/inner.txt'), relative_path
+    assert suggested
+
+
+def test_wildcard_directory_pattern_ignores_contents():
+    matcher = PatternMatcher(['*.egg-info/'])
+    assert matcher.matches('foo.egg-info')
+    assert matcher.matches('src/foo.egg-info/PKG-INFO')
+    assert not matcher.matches('foo.egg')
+    assert not matcher.matches('src/egg-info/PKG-INFO')
@@ -0,0 +1,54 @@
+"""
+detect_moves() must pair added files with the old files they came from.
+"""
+from merklewatch.filesystem import scan_directory
+from merklewatch.verification import compare_manifests, detect_moves
+
+
+def _scan(root) -> dict:
+    manifest = {'files': {}, 'directories': {}}
+    manifest['root_hash'] = scan_directory(root, root, manifest)
+    return manifest
+
+
+def _write(root, files: dict):
+    for relative_path, content in files.items():
+        path = root / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+
+
+def _moves(tmp_path, old_files: dict, new_files: dict) -> dict:
+    _write(tmp_path / 'old', old_files)
+    _write(tmp_path / 'new', new_files)
+    old, new = _scan(tmp_path / 'old'), _scan(tmp_path / 'new')
+    return detect_moves(compare_manifests(old, new, full=True), old, new)
+
+
+def test_copy_of_unchanged_file(tmp_path):
+    result = _moves(tmp_path, {'a/x': b'1', 'a/y': b'2'}, {'a/x': b'1', 'a/y': b'2', 'b/x': b'1'})
+    assert result['copied'] == [('a/x', 'b/x')]
+    assert result['added'] == [] and result['removed'] == []
+
+
+def test_copy_of_modified_file(tmp_path):
+    result = _moves(tmp_path, {'a/x': b'1'}, {'a/x': b'3', 'b/x': b'1'})
+    assert result['copied'] == [('a/x', 'b/x')]
+    assert result['modified'] == ['a/x']
+
+
+def test_copy_prefers_moved_source(tmp_path):
+    result = _moves(tmp_path, {'a/x': b'1', 'a/k': b'2', 'c/x': b'1'}, {'a/k': b'2', 'c/x': b'1', 'b/x': b'1', 'd/x': b'1'})
+    assert result['moved'] == [('a/x', 'b/x')]
+    assert result['copied'] == [('a/x', 'd/x')]
+
+
+def test_copy_source_is_first_old_path(tmp_path):
+    result = _moves(tmp_path, {'z/x': b'1', 'c/x': b'1'}, {'z/x': b'1', 'c/x': b'1', 'b/x': b'1'})
+    assert result['copied'] == [('c/x', 'b/x')]
+
+
+def test_empty_files_are_not_copies(tmp_path):
+    result = _moves(tmp_path, {'a/x': b''}, {'a/x': b'', 'b/x': b''})
+    assert result['copied'] == []
+    assert result['added'] == ['b/x']
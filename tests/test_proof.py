@@ -0,0 +1,39 @@
+"""
+Inclusion proofs must rebuild the snapshot root from a single file.
+"""
+import pytest
+
+from merklewatch.filesystem import scan_directory
+from merklewatch.proof import create_proof, verify_file_proof
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    for relative_path in ('top.txt', 'a/one.txt', 'a/b/two.txt', 'a/b/three.txt', 'c/four.txt'):
+        path = tmp_path / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(relative_path.encode())
+    manifest = {'files': {}, 'directories': {}}
+    manifest['root_hash'] = scan_directory(tmp_path, tmp_path, manifest)
+    return tmp_path, manifest
+
+
+@pytest.mark.parametrize("relative_path", ['top.txt', 'a/one.txt', 'a/b/two.txt', 'c/four.txt'])
+def test_proof_rebuilds_root(snapshot, relative_path):
+    root, manifest = snapshot
+    proof = create_proof(manifest, relative_path)
+    success, _, computed_root = verify_file_proof(proof, root / relative_path, manifest['root_hash'])
+    assert success and computed_root == manifest['root_hash']
+
+
+def test_proof_rejects_modified_file(snapshot):
+    root, manifest = snapshot
+    proof = create_proof(manifest, 'a/b/two.txt')
+    (root / 'a/b/two.txt').write_bytes(b'changed')
+    assert not verify_file_proof(proof, root / 'a/b/two.txt', manifest['root_hash'])[0]
+
+
+def test_missing_file_is_a_value_error(snapshot):
+    _, manifest = snapshot
+    with pytest.raises(ValueError, match="^File not found in manifest: nope.txt$"):
+        create_proof(manifest, 'nope.txt')
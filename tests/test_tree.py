@@ -0,0 +1,160 @@
+"""
+MerkleTree point updates must give the same root as a full rescan.
+
+Each test applies a random sequence of adds, modifications, removals and
+renames to a directory on disk and mirrors it on a MerkleTree, checking
+the tree's root against scan_directory() after every step.
+"""
+import os
+import random
+import shutil
+from pathlib import Path
+
+import pytest
+
+from merklewatch.filesystem import scan_directory
+from merklewatch.hashing import FileHasher
+from merklewatch.tree import MerkleTree
+
+SEEDS = range(8)
+STEPS = 40
+
+
+def _rescan(root: Path) -> str:
+    return scan_directory(root, root, {'files': {}, 'directories': {}})
+
+
+def _relative(root: Path, path: Path) -> str:
+    return path.relative_to(root).as_posix()
+
+
+class _Mirror:
+    """A directory on disk and the MerkleTree kept in step with it."""
+
+    def __init__(self, root: Path, rng: random.Random):
+        self.root = root
+        self.rng = rng
+        self.hasher = FileHasher()
+        self.tree = MerkleTree.from_scan(root)
+
+    def files(self):
+        return sorted(self.tree.files)
+
+    def directories(self):
+        return sorted(_relative(self.root, Path(path)) for path, _, _ in os.walk(self.root) if Path(path) != self.root)
+
+    def write(self, relative_path: str):
+        path = self.root / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(os.urandom(self.rng.randrange(0, 64)))
+        return self.hasher(path)
+
+    def add(self):
+        directory = self.rng.choice([''] + self.directories())
+        if self.rng.random() < 0.3:
+            directory = f"{directory}/d{self.rng.randrange(1000)}".lstrip('/')
+        relative_path = f"{directory}/f{self.rng.randrange(1000)}.bin".lstrip('/')
+        if relative_path in self.tree:
+            return
+        self.tree.add(relative_path, self.write(relative_path))
+
+    def modify(self):
+        if self.tree.files:
+            relative_path = self.rng.choice(self.files())
+            self.tree.update_file(relative_path, self.write(relative_path))
+
+    def remove(self):
+        if self.tree.files:
+            relative_path = self.rng.choice(self.files())
+            (self.root / relative_path).unlink()
+            assert self.tree.remove(relative_path) == [relative_path]
+
+    def remove_directory(self):
+        directories = self.directories()
+        if directories:
+            relative_path = self.rng.choice(directories)
+            shutil.rmtree(self.root / relative_path)
+            self.tree.remove(relative_path)
+
+    def rename(self):
+        if self.tree.files:
+            source = self.rng.choice(self.files())
+            target = f"{source.rpartition('/')[0]}/r{self.rng.randrange(1000)}.bin".lstrip('/')
+            if target in self.tree:
+                return
+            os.rename(self.root / source, self.root / target)
+            content_hash = self.tree.files[source]
+            self.tree.remove(source)
+            self.tree.add(target, content_hash)
+
+    def rename_directory(self):
+        directories = self.directories()
+        if not directories:
+            return
+        source = self.rng.choice(directories)
+        target = f"{source.rpartition('/')[0]}/m{self.rng.randrange(1000)}".lstrip('/')
+        if target in self.tree or target.startswith(source + '/'):
+            return
+        moved = [path for path in directories if path == source or path.startswith(source + '/')]
+        before = dict(self.tree.files)
+        hashes = {path: before[path] for path in self.tree.remove(source)}
+        os.rename(self.root / source, self.root / target)
+        for path in moved:
+            self.tree.add(target + path[len(source):])
+        for path, content_hash in hashes.items():
+            self.tree.add(target + path[len(source):], content_hash)
+
+
+def _populate(root: Path, rng: random.Random, count: int = 30):
+    for i in range(count):
+        directory = rng.choice(['', 'a', 'a/b', 'a/b/c', 'd', 'd/e'])
+        path = root / directory / f"f{i}.bin"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(os.urandom(rng.randrange(0, 64)))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_random_updates_match_rescan(tmp_path, seed):
+    rng = random.Random(seed)
+    _populate(tmp_path, rng)
+    mirror = _Mirror(tmp_path, rng)
+    assert mirror.tree.root_hash == _rescan(tmp_path)
+
+    operations = [mirror.add, mirror.modify, mirror.remove, mirror.rename, mirror.remove_directory, mirror.rename_directory]
+    weights = [4, 4, 3, 3, 1, 1]
+    for _ in range(STEPS):
+        operation = rng.choices(operations, weights)[0]
+        operation()
+        assert mirror.tree.root_hash == _rescan(tmp_path), operation.__name__
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_batched_updates_match_rescan(tmp_path, seed):
+    """Several mutations between reads of root_hash are recomputed together."""
+    rng = random.Random(seed)
+    _populate(tmp_path, rng)
+    mirror = _Mirror(tmp_path, rng)
+    operations = [mirror.add, mirror.modify, mirror.remove, mirror.rename]
+    for _ in range(STEPS // 4):
+        for _ in range(rng.randrange(1, 8)):
+            rng.choice(operations)()
+        assert mirror.tree.root_hash == _rescan(tmp_path)
+
+
+def test_from_manifest_matches_scan(tmp_path):
+    _populate(tmp_path, random.Random(0))
+    manifest = {'files': {}, 'directories': {}}
+    root_hash = scan_directory(tmp_path, tmp_path, manifest)
+    assert MerkleTree.from_manifest(manifest).root_hash == root_hash
+
+
+def test_emptied_tree_matches_empty_scan(tmp_path):
+    _populate(tmp_path, random.Random(0))
+    tree = MerkleTree.from_scan(tmp_path)
+    tree.remove('')
+    for entry in tmp_path.iterdir():
+        if entry.is_dir():
+            shutil.rmtree(entry)
+        else:
+            entry.unlink()
+    assert tree.root_hash == _rescan(tmp_path)